@@ -0,0 +1,166 @@
+"""Measure the CPU one poll spends turning the per-lock auth list into models.
+
+Compares, for 1k and 10k keypad auths on the lock (one in ten ours, half of
+those expired):
+
+* ``stdlib``: ``response.json()`` (decode to ``str``, stdlib parser), then
+  separate passes to filter by prefix, build ``AuthCode`` models and drop
+  expired codes, as the client and coordinator used to do;
+* ``stream``: the incremental parser with the prefix filter, then the model
+  and expiry passes (the previous per-lock path);
+* ``orjson``: what a poll does now: the bytes decoded with ``json_loads``,
+  filtered and built in one pass by ``fetch_auth_codes()``, then the
+  coordinator's expiry filter.
+
+``saved`` is the CPU time per poll saved compared with ``stdlib``.
+
+Run from the repository root::
+
+    python benchmarks/bench_auth_decode.py
+
+Uses the Home Assistant stubs from the test suite, so no HA install is needed.
+Home Assistant's ``json_loads`` is ``orjson.loads``; install orjson to get
+representative numbers, otherwise the stdlib parser stands in for it.
+"""
+import asyncio
+import json
+import sys
+import time
+import timeit
+from datetime import datetime, timezone
+from pathlib import Path
+
+_REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(_REPO_ROOT / "tests"))
+
+from test_make_request_retry import (  # noqa: E402
+    _FakeResponse,
+    _FakeSession,
+    _FakeStream,
+    _make_client,
+    helpers,
+)
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+else:
+    helpers.json_loads = orjson.loads
+
+PREFIX = "otpuser"
+SIZES = (1000, 10000)
+NOW = datetime(2026, 1, 1, 12, 0, tzinfo=timezone.utc)
+LOCK_ID = 17179869184
+
+
+def _auth(i: int) -> dict:
+    """Return a record shaped like a Web API keypad auth."""
+    ours = i % 10 == 0
+    until = "2026-01-01T06:00:00.000Z" if i % 20 == 0 else "2026-01-02T00:00:00.000Z"
+    return {
+        "id": f"{i:024x}",
+        "smartlockId": LOCK_ID,
+        "authId": 1000 + i,
+        "code": 0,
+        "type": 13,
+        "name": f"{PREFIX}_code_{i:04x}" if ours else f"Guest {i}",
+        "enabled": True,
+        "remoteAllowed": True,
+        "lockCount": i % 7,
+        "allowedFromDate": "2026-01-01T00:00:00.000Z",
+        "allowedUntilDate": until,
+        "allowedWeekDays": 127,
+        "allowedFromTime": 0,
+        "allowedUntilTime": 0,
+        "creationDate": "2026-01-01T00:00:00.000Z",
+        "updateDate": "2026-01-01T00:00:00.000Z",
+    }
+
+
+class _BodyResponse(_FakeResponse):
+    """A 200 response serving a prebuilt body, buffered or streamed."""
+
+    def __init__(self, body: bytes):
+        super().__init__(status=200)
+        self._body = body
+
+    @property
+    def content(self):
+        return _FakeStream(self._body)
+
+    async def read(self):
+        return self._body
+
+
+def _ours(auth: dict) -> bool:
+    name = auth.get("name")
+    return isinstance(name, str) and name.startswith(PREFIX)
+
+
+def _models(records: list, client) -> list:
+    """The model and expiry passes that followed the parse before."""
+    lifetime = client.config.otp_lifetime_hours
+    codes = [
+        helpers.AuthCode.from_api(r, lifetime, client._code_cache.get(r["name"]))
+        for r in records
+    ]
+    return [c for c in codes if c.expiry is None or c.expiry > NOW]
+
+
+def _variants(body: bytes):
+    client = _make_client(_FakeSession([_BodyResponse(body)]))
+    client._smartlock_id = LOCK_ID
+    endpoint = f"smartlock/{LOCK_ID}/auth?types=13"
+
+    async def stdlib():
+        records = json.loads(body.decode("utf-8"))
+        return _models([r for r in records if _ours(r)], client)
+
+    async def stream():
+        return _models(await client._make_request("GET", endpoint, keep=_ours), client)
+
+    async def single_pass():
+        codes = await client.fetch_auth_codes()
+        return [c for c in codes if c.expiry is None or c.expiry > NOW]
+
+    return {"stdlib": stdlib, "stream": stream, "orjson": single_pass}
+
+
+def _cpu_ms(loop, variant, number: int) -> float:
+    seconds = timeit.timeit(
+        lambda: loop.run_until_complete(variant()),
+        number=number,
+        timer=time.process_time,
+    )
+    return seconds / number * 1000
+
+
+def main() -> None:
+    loader = "orjson" if orjson is not None else "stdlib json (orjson missing)"
+    print(f"json_loads backed by {loader}")
+    print(f"{'auths':>6} {'bytes':>10} {'path':>8} {'cpu ms':>9} {'saved':>8}")
+    loop = asyncio.new_event_loop()
+    try:
+        for total in SIZES:
+            body = json.dumps([_auth(i) for i in range(total)]).encode()
+            variants = _variants(body)
+            results = {
+                name: loop.run_until_complete(variant())
+                for name, variant in variants.items()
+            }
+            assert len({len(codes) for codes in results.values()}) == 1
+            number = max(10, 50000 // total)
+            timings = {
+                name: _cpu_ms(loop, variant, number)
+                for name, variant in variants.items()
+            }
+            for name, ms in timings.items():
+                saved = timings["stdlib"] - ms
+                print(f"{total:>6} {len(body):>10} {name:>8} {ms:>9.3f} {saved:>+8.3f}")
+    finally:
+        loop.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Compare poll payload size and parse time: account-wide vs per-lock auths.
+
+Synthesizes a Nuki account whose keypad auths are spread over ``LOCKS`` locks,
+with one OTP code belonging to our entry, and measures for 10/100/1000 auths
+on the account:
+
+* the JSON bytes each endpoint would return (``smartlock/auth`` returns every
+  lock's auths, ``smartlock/{id}/auth`` only ours), and
+* the time ``_collect_json_array`` needs to parse that body and keep our
+  record.
+
+Run from the repository root::
+
+    python benchmarks/bench_auth_endpoints.py
+
+Uses the Home Assistant stubs from the test suite, so no HA install is needed.
+"""
+import asyncio
+import json
+import sys
+import timeit
+from pathlib import Path
+
+_REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(_REPO_ROOT / "tests"))
+
+from test_make_request_retry import _FakeStream, helpers  # noqa: E402
+
+LOCKS = 10
+OUR_LOCK = 0
+PREFIX = "OTP"
+SIZES = (10, 100, 1000)
+
+
+def _auth(i: int, lock: int, name: str) -> dict:
+    """Return a record shaped like a Web API keypad auth."""
+    return {
+        "id": f"{i:024x}",
+        "smartlockId": 17179869184 + lock,
+        "authId": 1000 + i,
+        "code": 0,
+        "type": 13,
+        "name": name,
+        "enabled": True,
+        "remoteAllowed": True,
+        "lockCount": i % 7,
+        "allowedFromDate": "2026-01-01T00:00:00.000Z",
+        "allowedUntilDate": "2026-01-01T12:00:00.000Z",
+        "allowedWeekDays": 127,
+        "allowedFromTime": 0,
+        "allowedUntilTime": 0,
+        "creationDate": "2026-01-01T00:00:00.000Z",
+        "updateDate": "2026-01-01T00:00:00.000Z",
+    }
+
+
+def _account(total: int) -> list:
+    auths = [_auth(0, OUR_LOCK, f"{PREFIX}_code")]
+    auths += [_auth(i, i % LOCKS, f"Guest {i}") for i in range(1, total)]
+    return auths
+
+
+def _parse_seconds(body: bytes, number: int) -> float:
+    keep = lambda auth: auth.get("name", "").startswith(PREFIX)  # noqa: E731
+
+    async def _once():
+        return await helpers._collect_json_array(_FakeStream(body), keep)
+
+    loop = asyncio.new_event_loop()
+    try:
+        return timeit.timeit(lambda: loop.run_until_complete(_once()), number=number) / number
+    finally:
+        loop.close()
+
+
+def main() -> None:
+    print(f"{'auths':>6} {'mode':>12} {'bytes':>10} {'parse ms':>10}")
+    for total in SIZES:
+        account = _account(total)
+        per_lock = [a for a in account if a["smartlockId"] == account[0]["smartlockId"]]
+        number = max(20, 20000 // total)
+        for mode, records in (("account", account), ("per-lock", per_lock)):
+            body = json.dumps(records).encode()
+            ms = _parse_seconds(body, number) * 1000
+            print(f"{total:>6} {mode:>12} {len(body):>10} {ms:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
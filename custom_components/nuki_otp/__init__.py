@@ -3,35 +3,51 @@ from typing import Any
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.storage import Store
 
 from .const import (
+    BACKEND_CLOUD,
+    DEFAULT_BRIDGE_PORT,
+    DEFAULT_LATENCY_SLO_SECONDS,
+    DEFAULT_OPERATION_TIMEOUT_SECONDS,
     DEFAULT_OTP_LIFETIME_HOURS,
     DEFAULT_OTP_USERNAME,
     DOMAIN,
+    SIGNAL_ENTRY_LOADED,
+    SIGNAL_ENTRY_UNLOADED,
 )
 from .coordinator import NukiOTPDataCoordinator
 from .frontend import async_register_card
-from .helpers import NukiAPIClient, NukiConfig
+from .helpers import IssuedCodeIndex, NukiAPIClient, NukiConfig
+from .outbox import OUTBOX_STORAGE_VERSION, Outbox
+from .services import async_setup_services
+from .watcher import UsageWatcher
+from .websocket_api import async_register_websocket_commands
 
 PLATFORMS = ["sensor", "switch"]
 
+# Set up from config entries only; async_setup exists to register services
+# and websocket commands.
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+# hass.data key of the keypad codes issued by all entries, see IssuedCodeIndex.
+_ISSUED_CODES_KEY = f"{DOMAIN}_issued_codes"
+
 
 async def async_setup(hass: HomeAssistant, config: dict[str, Any]) -> bool:
     """Set up the Nuki OTP component."""
     hass.data.setdefault(DOMAIN, {})
+    async_setup_services(hass)
+    async_register_websocket_commands(hass)
     return True
 
 
-async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
-    """Set up Nuki OTP from a config entry."""
-    hass.data.setdefault(DOMAIN, {})
-
-    # Serve and auto-load the bundled Lovelace card so HACS users get it
-    # without copying files into config/www or adding dashboard resources.
-    await async_register_card(hass)
-
+def _build_config(entry: ConfigEntry) -> NukiConfig:
+    """Build the client config from an entry's data and options."""
     # Options (set via the OptionsFlow) override the original setup data so
-    # editable fields like OTP username/lifetime take effect on reload.
+    # editable fields like OTP username/lifetime take effect.
     otp_username = entry.options.get(
         "otp_username", entry.data.get("otp_username", DEFAULT_OTP_USERNAME)
     )
@@ -40,22 +56,71 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         entry.data.get("otp_lifetime_hours", DEFAULT_OTP_LIFETIME_HOURS),
     )
 
-    config = NukiConfig(
+    return NukiConfig(
         api_token=entry.data["api_token"],
         api_url=entry.data["api_url"],
         otp_username=otp_username,
         nuki_name=entry.data["nuki_name"],
         otp_lifetime_hours=int(otp_lifetime_hours),
+        backend=entry.options.get("backend", BACKEND_CLOUD),
+        bridge_host=entry.options.get("bridge_host"),
+        bridge_port=int(entry.options.get("bridge_port", DEFAULT_BRIDGE_PORT)),
+        bridge_token=entry.options.get("bridge_token"),
+        smartlock_id=entry.data.get("smartlock_id"),
+        operation_timeout=int(
+            entry.options.get(
+                "operation_timeout_seconds", DEFAULT_OPERATION_TIMEOUT_SECONDS
+            )
+        ),
+    )
+
+
+def _outbox_store(hass: HomeAssistant, entry: ConfigEntry) -> Store:
+    """Return the store that persists the entry's outbox."""
+    return Store(hass, OUTBOX_STORAGE_VERSION, f"{DOMAIN}.outbox.{entry.entry_id}")
+
+
+def _latency_slo(entry: ConfigEntry) -> float:
+    """Return the entry's code-latency SLO in seconds."""
+    return float(
+        entry.options.get("latency_slo_seconds", DEFAULT_LATENCY_SLO_SECONDS)
     )
 
-    api_client = NukiAPIClient(hass, config)
-    coordinator = NukiOTPDataCoordinator(hass, api_client, entry)
+
+async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Set up Nuki OTP from a config entry."""
+    hass.data.setdefault(DOMAIN, {})
+
+    # Serve and auto-load the bundled Lovelace card so HACS users get it
+    # without copying files into config/www or adding dashboard resources.
+    await async_register_card(hass)
+
+    config = _build_config(entry)
+    issued_codes = hass.data.setdefault(_ISSUED_CODES_KEY, IssuedCodeIndex())
+    api_client = NukiAPIClient(hass, config, issued_codes, entry.entry_id)
+    # Deletes that failed while the cloud was unreachable survive restarts
+    # here until they are sent.
+    outbox = Outbox(_outbox_store(hass, entry))
+    await outbox.async_load()
+    api_client.attach_outbox(outbox)
+    coordinator = NukiOTPDataCoordinator(
+        hass, api_client, entry, latency_slo=_latency_slo(entry)
+    )
     await coordinator.async_config_entry_first_refresh()
 
     # Expired/used code cleanup runs on its own schedule, separate from the
     # read poll, so deletion never blocks or fails the data refresh. Register
     # the unsubscribe so the interval is cancelled when the entry unloads.
     entry.async_on_unload(coordinator.async_start_cleanup())
+    # Codes are evicted the moment they expire by a single point-in-time
+    # timer; make sure it does not outlive the entry.
+    entry.async_on_unload(coordinator.async_cancel_expiry)
+    # One-time codes are revoked within seconds of first use by watching the
+    # lock log delta; the hourly sweep above remains the backstop.
+    entry.async_on_unload(UsageWatcher(hass, coordinator).async_start())
+    # Queued mutations are sent in the background with backoff once the
+    # cloud is reachable again.
+    entry.async_on_unload(coordinator.async_start_outbox())
 
     hass.data[DOMAIN][entry.entry_id] = {
         "coordinator": coordinator,
@@ -64,7 +129,8 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     }
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
-    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+    entry.async_on_unload(entry.add_update_listener(async_update_options))
+    async_dispatcher_send(hass, SIGNAL_ENTRY_LOADED, entry.entry_id)
     return True
 
 
@@ -74,10 +140,26 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     if unload_ok:
         hass.data[DOMAIN].pop(entry.entry_id)
+        # The coordinator is gone; end the websocket subscriptions bound to it.
+        async_dispatcher_send(hass, SIGNAL_ENTRY_UNLOADED, entry.entry_id)
 
     return unload_ok
 
 
-async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
-    """Reload a config entry."""
-    await hass.config_entries.async_reload(entry.entry_id)
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Delete the removed entry's persisted outbox and issued codes."""
+    if (issued_codes := hass.data.get(_ISSUED_CODES_KEY)) is not None:
+        issued_codes.remove_entry(entry.entry_id)
+    await _outbox_store(hass, entry).async_remove()
+
+
+async def async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply changed options to the running entry without a reload.
+
+    The live config, client and coordinator are updated in place, so cached
+    codes and the resolved lock survive and no setup round trip is needed.
+    """
+    if (data := hass.data[DOMAIN].get(entry.entry_id)) is None:
+        return
+    coordinator: NukiOTPDataCoordinator = data["coordinator"]
+    await coordinator.async_apply_options(_build_config(entry), _latency_slo(entry))
@@ -0,0 +1,97 @@
+"""Build the compressed, content-hashed variant of the bundled Lovelace card.
+
+The card is served from a URL containing a hash of its contents, so browsers
+can cache it forever (``immutable``) and a changed card is simply a new URL.
+The body is minified once and compressed once (gzip, plus brotli when the
+``brotli`` module is available) when the integration sets up, in an executor.
+Each request then only picks the best pre-built encoding.
+
+Kept free of Home Assistant imports so it can be unit tested on its own.
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+try:  # Optional: Home Assistant installs usually ship it, but do not require it.
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+# A year, the conventional "forever" for immutable assets.
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+CONTENT_TYPE = "application/javascript"
+
+
+def minify_js(source: str) -> str:
+    """Strip comments and indentation from the card source.
+
+    Deliberately conservative: it only drops whole comment lines (``//`` and
+    ``/* ... */`` blocks that start a line), leading whitespace and blank
+    lines. Line breaks are kept, so automatic semicolon insertion and the
+    HTML/CSS inside template literals behave exactly as in the source.
+    """
+    out: List[str] = []
+    in_block = False
+    for line in source.splitlines():
+        stripped = line.strip()
+        if in_block:
+            if "*/" in stripped:
+                in_block = False
+            continue
+        if stripped.startswith("/*"):
+            in_block = "*/" not in stripped
+            continue
+        if not stripped or stripped.startswith("//"):
+            continue
+        out.append(stripped)
+    return "\n".join(out) + "\n"
+
+
+@dataclass(frozen=True, slots=True)
+class CardAsset:
+    """The minified card and its pre-compressed encodings."""
+
+    digest: str
+    body: bytes
+    gzip_body: bytes
+    brotli_body: Optional[bytes] = None
+
+    @classmethod
+    def from_source(cls, source: str) -> "CardAsset":
+        """Minify, hash and compress ``source``."""
+        body = minify_js(source).encode("utf-8")
+        return cls(
+            digest=hashlib.sha256(body).hexdigest()[:16],
+            body=body,
+            # mtime=0 keeps the gzip bytes identical across restarts.
+            gzip_body=gzip.compress(body, compresslevel=9, mtime=0),
+            brotli_body=brotli.compress(body) if brotli is not None else None,
+        )
+
+    def select(self, accept_encoding: str) -> Tuple[Optional[str], bytes]:
+        """Return ``(content_encoding, payload)`` for an ``Accept-Encoding``.
+
+        Prefers brotli, then gzip, then the uncompressed body. Codings with
+        ``q=0`` count as refused.
+        """
+        accepted = set()
+        for part in (accept_encoding or "").split(","):
+            coding, _, params = part.strip().partition(";")
+            if params.strip().replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+                continue
+            if coding:
+                accepted.add(coding.strip().lower())
+        if self.brotli_body is not None and "br" in accepted:
+            return "br", self.brotli_body
+        if "gzip" in accepted or "*" in accepted:
+            return "gzip", self.gzip_body
+        return None, self.body
+
+
+def load_card_asset(path: str) -> CardAsset:
+    """Read and build the card asset (blocking; run in an executor)."""
+    with open(path, encoding="utf-8") as handle:
+        return CardAsset.from_source(handle.read())
@@ -1,8 +1,10 @@
 """Config flow for Nuki OTP integration."""
 from __future__ import annotations
 
+import hashlib
 import logging
-from typing import Any, Dict, Optional
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
 from urllib.parse import urlparse
 
 import voluptuous as vol
@@ -12,14 +14,26 @@ from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import selector
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
 from .const import (
+    BACKEND_BRIDGE,
+    BACKEND_CLOUD,
     DOMAIN,
     DEFAULT_API_URL,
+    DEFAULT_BRIDGE_PORT,
+    DEFAULT_LATENCY_SLO_SECONDS,
+    DEFAULT_OPERATION_TIMEOUT_SECONDS,
     DEFAULT_OTP_USERNAME,
     DEFAULT_OTP_LIFETIME_HOURS,
 )
-from .helpers import NukiAPIClient, NukiConfig, NukiAPIError, NukiAuthError
+from .helpers import (
+    NukiAPIClient,
+    NukiBridgeClient,
+    NukiConfig,
+    NukiAPIError,
+    NukiAuthError,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -65,6 +79,52 @@ def _build_lock_step_schema(lock_names: list[str]) -> vol.Schema:
         ): vol.All(int, vol.Range(min=1, max=168)),  # 1 hour to 1 week
     })
 
+
+def _build_locks_step_schema(lock_names: list[str]) -> vol.Schema:
+    """Build the multi-lock schema: pick any number of the discovered locks.
+
+    The OTP fields apply to every entry created from the selection and can be
+    changed per entry later in the options.
+    """
+    return vol.Schema({
+        vol.Required("nuki_names"): selector.SelectSelector(
+            selector.SelectSelectorConfig(
+                options=[
+                    selector.SelectOptionDict(value=name, label=name)
+                    for name in lock_names
+                ],
+                multiple=True,
+                mode=selector.SelectSelectorMode.LIST,
+            )
+        ),
+        vol.Optional("otp_username", default=DEFAULT_OTP_USERNAME): vol.All(
+            str, vol.Length(min=1)
+        ),
+        vol.Optional(
+            "otp_lifetime_hours", default=DEFAULT_OTP_LIFETIME_HOURS
+        ): vol.All(int, vol.Range(min=1, max=168)),  # 1 hour to 1 week
+    })
+
+
+# Flow source (and step) for the extra entries of a multi-lock selection.
+SOURCE_ADDITIONAL_LOCK = "additional_lock"
+
+# Entry data handed to an additional-lock flow. Checked again there, since a
+# flow can be started with any data.
+ADDITIONAL_LOCK_SCHEMA = vol.Schema({
+    vol.Required("api_url"): vol.All(str, vol.Length(min=1)),
+    vol.Required("api_token"): vol.All(str, vol.Length(min=1)),
+    vol.Required("nuki_name"): vol.All(str, vol.Length(min=1)),
+    vol.Required("otp_username"): vol.All(str, vol.Length(min=1)),
+    vol.Required("otp_lifetime_hours"): vol.All(int, vol.Range(min=1, max=168)),
+    vol.Optional("smartlock_id"): int,
+})
+
+
+def _lock_unique_id(nuki_name: str) -> str:
+    """Return the config entry unique id for a lock name."""
+    return f"{DOMAIN}_{nuki_name.lower().replace(' ', '_')}"
+
 # Reauth only collects a fresh token; the rest of the connection config
 # (URL, Nuki name) is reused from the existing entry.
 STEP_REAUTH_DATA_SCHEMA = vol.Schema({
@@ -72,6 +132,63 @@ STEP_REAUTH_DATA_SCHEMA = vol.Schema({
 })
 
 
+# How long successful discovery/validation results are reused. Long enough to
+# cover resubmitting a form or stepping through a flow, short enough that a
+# lock added in the Nuki app shows up on the next attempt.
+DISCOVERY_CACHE_TTL = 120
+
+
+class DiscoveryCache:
+    """Short-lived cache of cloud discovery, keyed by the credentials used.
+
+    Shared by the config, reauth and options flows so resubmitting a form or
+    moving between steps does not call the cloud again. The key is a hash of
+    the URL and token (or Bridge address and token), so a changed token never
+    reuses a result obtained with another one. Only successes are cached.
+    """
+
+    def __init__(
+        self,
+        ttl: float = DISCOVERY_CACHE_TTL,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._ttl = ttl
+        self._clock = clock
+        self._entries: Dict[str, Tuple[float, Any]] = {}
+
+    @staticmethod
+    def _key(*parts: Any) -> str:
+        return hashlib.sha256("\0".join(map(str, parts)).encode()).hexdigest()
+
+    def get(self, *parts: Any) -> Any:
+        """Return the cached value for ``parts``, or None if absent/expired."""
+        entry = self._entries.get(self._key(*parts))
+        if entry is None or entry[0] <= self._clock():
+            return None
+        return entry[1]
+
+    def set(self, value: Any, *parts: Any) -> None:
+        """Cache ``value`` for ``parts`` and drop expired entries."""
+        now = self._clock()
+        self._entries = {
+            key: entry for key, entry in self._entries.items() if entry[0] > now
+        }
+        self._entries[self._key(*parts)] = (now + self._ttl, value)
+
+    def clear(self) -> None:
+        """Forget everything."""
+        self._entries.clear()
+
+
+# Kept beside ``hass.data[DOMAIN]``, which maps entry ids to their runtime data.
+_DISCOVERY_CACHE_KEY = f"{DOMAIN}_discovery_cache"
+
+
+def _discovery_cache(hass: HomeAssistant) -> DiscoveryCache:
+    """Return this Home Assistant instance's discovery cache."""
+    return hass.data.setdefault(_DISCOVERY_CACHE_KEY, DiscoveryCache())
+
+
 class InvalidAuth(HomeAssistantError):
     """Error to indicate there is invalid auth."""
 
@@ -113,6 +230,7 @@ def _client_for(hass: HomeAssistant, data: Dict[str, Any]) -> NukiAPIClient:
         otp_username=data.get("otp_username", DEFAULT_OTP_USERNAME),
         nuki_name=data.get("nuki_name", ""),
         otp_lifetime_hours=data.get("otp_lifetime_hours", DEFAULT_OTP_LIFETIME_HOURS),
+        smartlock_id=data.get("smartlock_id"),
     )
     return NukiAPIClient(hass, config)
 
@@ -128,6 +246,11 @@ async def discover_smartlocks(
     """
     _validate_api_url(data["api_url"])
 
+    cache = _discovery_cache(hass)
+    cache_key = ("locks", data["api_url"], data["api_token"])
+    if (locks := cache.get(*cache_key)) is not None:
+        return list(locks)
+
     api_client = _client_for(hass, data)
 
     try:
@@ -144,36 +267,55 @@ async def discover_smartlocks(
         # Token is valid but the account exposes no smartlocks to manage.
         raise NukiNotFound("No smartlocks found on this Nuki account")
 
+    cache.set(list(locks), *cache_key)
     return locks
 
 
-async def validate_input(hass: HomeAssistant, data: Dict[str, Any]) -> Dict[str, Any]:
-    """Validate the chosen lock allows us to connect (used by reauth).
+async def validate_auth_endpoint(hass: HomeAssistant, data: Dict[str, Any]) -> None:
+    """Check the token may read keypad auths (one request per token).
 
-    The user flow uses :func:`discover_smartlocks` then a lock-picker, so by
-    the time this runs ``nuki_name`` is a name we discovered. Reauth reuses the
-    stored connection config and re-checks that the named lock is reachable.
+    Discovery already proved the token can list locks. Before creating
+    entries for several locks at once, check once that it can also read
+    their auths, instead of once per lock. With ``smartlock_id`` set the
+    check uses the small per-lock endpoint.
     """
-    _validate_api_url(data["api_url"])
-
-    api_client = _client_for(hass, data)
-
+    cache = _discovery_cache(hass)
+    cache_key = ("auth", data["api_url"], data["api_token"])
+    if cache.get(*cache_key):
+        return
     try:
-        # Test API connection by getting smartlocks
-        smartlock = await api_client.get_smartlock()
-        if not smartlock:
-            raise NukiNotFound("Specified Nuki device not found")
-
-        # Test auth codes endpoint
-        await api_client.get_auth_codes()
-
+        await _client_for(hass, data).fetch_auth_codes()
     except NukiAuthError as err:
         raise InvalidAuth("Invalid API token") from err
     except NukiAPIError as err:
-        raise CannotConnect(f"Cannot connect to Nuki API: {err}") from err
+        raise CannotConnect(f"Cannot read auths from Nuki API: {err}") from err
     except Exception as err:
-        _LOGGER.exception("Unexpected error during validation")
+        _LOGGER.exception("Unexpected error while checking auth access")
         raise CannotConnect(f"Unexpected error: {err}") from err
+    cache.set(True, *cache_key)
+
+
+async def validate_input(hass: HomeAssistant, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate the chosen lock allows us to connect (used by reauth).
+
+    The user flow uses :func:`discover_smartlocks` then a lock-picker, so by
+    the time this runs ``nuki_name`` is a name we discovered. Reauth reuses the
+    stored connection config and re-checks that the named lock is reachable.
+
+    Both checks go through the discovery cache, so submitting the same token
+    again within :data:`DISCOVERY_CACHE_TTL` does not call the cloud.
+    """
+    # Raises InvalidUrl/InvalidAuth/CannotConnect/NukiNotFound as appropriate.
+    locks = await discover_smartlocks(hass, data)
+    smartlock = next(
+        (lock for lock in locks if lock.get("name") == data["nuki_name"]), None
+    )
+    if smartlock is None:
+        raise NukiNotFound("Specified Nuki device not found")
+
+    await validate_auth_endpoint(
+        hass, {**data, "smartlock_id": smartlock.get("smartlockId")}
+    )
 
     return {
         "title": f"Nuki OTP - {data['nuki_name']}",
@@ -195,6 +337,7 @@ class NukiConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         # into the lock-selection step.
         self._connection: Dict[str, Any] = {}
         self._lock_names: list[str] = []
+        self._lock_ids: Dict[str, Any] = {}
 
     @staticmethod
     @callback
@@ -238,6 +381,19 @@ class NukiConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             self._lock_names = [
                 name for lock in locks if (name := lock.get("name"))
             ]
+            # Keep the ids too so the entry can use the per-lock auth
+            # endpoint from its first poll without another lookup.
+            self._lock_ids = {
+                lock["name"]: lock.get("smartlockId")
+                for lock in locks
+                if lock.get("name")
+            }
+            if len(self._lock_names) > 1:
+                # Offer to set up several locks from this one discovery.
+                return self.async_show_menu(
+                    step_id="lock_mode",
+                    menu_options=["select_lock", "select_locks"],
+                )
             return await self.async_step_select_lock()
 
         return self.async_show_form(
@@ -260,12 +416,102 @@ class NukiConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             )
 
         self._errors = {}
-        # Merge the connection data with the lock selection + OTP options.
-        data = {**self._connection, **user_input}
+        return await self._async_create_lock_entry(
+            self._entry_data(user_input["nuki_name"], user_input)
+        )
+
+    async def async_step_select_locks(
+        self, user_input: Optional[Dict[str, Any]] = None
+    ) -> FlowResult:
+        """Step 2 (several locks): create one entry per selected lock.
+
+        Everything comes from the discovery response already fetched in the
+        connection step. The token is checked against the auth endpoint once,
+        then this flow creates the first entry and starts an additional-lock
+        flow for each of the others (see :meth:`async_step_additional_lock`).
+        """
+        configured = self._async_current_ids()
+        available = [
+            name for name in self._lock_names
+            if _lock_unique_id(name) not in configured
+        ]
+        if not available:
+            return self.async_abort(reason="already_configured")
+        schema = _build_locks_step_schema(available)
+
+        if user_input is not None:
+            self._errors = {}
+            names = [n for n in user_input.get("nuki_names", []) if n in available]
+            if not names:
+                self._errors["base"] = "no_locks_selected"
+            else:
+                entries = [self._entry_data(name, user_input) for name in names]
+                try:
+                    await validate_auth_endpoint(self.hass, entries[0])
+                except InvalidAuth:
+                    self._errors["base"] = "invalid_auth"
+                else:
+                    for data in entries[1:]:
+                        self.hass.async_create_task(
+                            self.hass.config_entries.flow.async_init(
+                                DOMAIN,
+                                context={"source": SOURCE_ADDITIONAL_LOCK},
+                                data=data,
+                            )
+                        )
+                    return await self._async_create_lock_entry(entries[0])
 
-        await self.async_set_unique_id(
-            f"{DOMAIN}_{data['nuki_name'].lower().replace(' ', '_')}"
+        return self.async_show_form(
+            step_id="select_locks",
+            data_schema=schema,
+            errors=self._errors,
         )
+
+    async def async_step_additional_lock(
+        self, discovery_info: Dict[str, Any]
+    ) -> FlowResult:
+        """Create the entry for one more lock of a multi-lock selection.
+
+        ``discovery_info`` is entry data from :meth:`async_step_select_locks`.
+        It is validated again: the fields against ``ADDITIONAL_LOCK_SCHEMA``,
+        and the lock and token against the discovery the selection was made
+        from. Both results are still cached, so no cloud call is made.
+        """
+        try:
+            data = ADDITIONAL_LOCK_SCHEMA(dict(discovery_info))
+            _validate_api_url(data["api_url"])
+        except (vol.Invalid, InvalidUrl):
+            return self.async_abort(reason="invalid_lock_data")
+        try:
+            locks = await discover_smartlocks(self.hass, data)
+            await validate_auth_endpoint(self.hass, data)
+        except InvalidAuth:
+            return self.async_abort(reason="invalid_auth")
+        except (CannotConnect, NukiNotFound):
+            return self.async_abort(reason="cannot_connect")
+        lock = next((lk for lk in locks if lk.get("name") == data["nuki_name"]), None)
+        if lock is None:
+            return self.async_abort(reason="lock_not_found")
+        data["smartlock_id"] = lock.get("smartlockId")
+        return await self._async_create_lock_entry(data)
+
+    def _entry_data(self, nuki_name: str, options: Dict[str, Any]) -> Dict[str, Any]:
+        """Merge the connection data with a lock choice and the OTP options."""
+        data = {
+            **self._connection,
+            "nuki_name": nuki_name,
+            "otp_username": options.get("otp_username", DEFAULT_OTP_USERNAME),
+            "otp_lifetime_hours": options.get(
+                "otp_lifetime_hours", DEFAULT_OTP_LIFETIME_HOURS
+            ),
+        }
+        if (smartlock_id := self._lock_ids.get(nuki_name)) is not None:
+            data["smartlock_id"] = smartlock_id
+        return data
+
+    async def _async_create_lock_entry(self, data: Dict[str, Any]) -> FlowResult:
+        """Create the entry for ``data``, unless its lock is already set up."""
+        await self.async_set_unique_id(_lock_unique_id(data["nuki_name"]))
         self._abort_if_unique_id_configured()
         return self.async_create_entry(
             title=f"Nuki OTP - {data['nuki_name']}", data=data
@@ -329,13 +575,39 @@ class NukiConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         )
 
 
+async def validate_bridge(hass: HomeAssistant, data: Dict[str, Any]) -> None:
+    """Check the Bridge answers with the given host/port/token.
+
+    Raises ``CannotConnect`` when the Bridge is unreachable or rejects the
+    token. Only the Bridge is contacted; the Web API is not involved. A
+    success is remembered in the discovery cache for the same address/token.
+    """
+    port = int(data.get("bridge_port", DEFAULT_BRIDGE_PORT))
+    cache = _discovery_cache(hass)
+    cache_key = ("bridge", data["bridge_host"], port, data["bridge_token"])
+    if cache.get(*cache_key):
+        return
+    bridge = NukiBridgeClient(
+        async_get_clientsession(hass),
+        data["bridge_host"],
+        port,
+        data["bridge_token"],
+    )
+    try:
+        await bridge.list_smartlocks()
+    except NukiAPIError as err:
+        raise CannotConnect(f"Cannot connect to Nuki Bridge: {err}") from err
+    cache.set(True, *cache_key)
+
+
 class NukiOptionsFlow(config_entries.OptionsFlow):
     """Handle options for Nuki OTP.
 
-    Exposes the safe-to-edit fields (OTP username and lifetime) so they can be
-    changed after setup without removing and re-adding the integration.
-    Connection fields (API URL/token, Nuki name) are intentionally omitted
-    because changing them requires re-validation and a new unique id.
+    Exposes the safe-to-edit fields (OTP username and lifetime, plus the
+    optional Bridge backend) so they can be changed after setup without
+    removing and re-adding the integration. Connection fields (API URL/token,
+    Nuki name) are intentionally omitted because changing them requires
+    re-validation and a new unique id.
     """
 
     def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
@@ -352,8 +624,20 @@ class NukiOptionsFlow(config_entries.OptionsFlow):
         self, user_input: Optional[Dict[str, Any]] = None
     ) -> FlowResult:
         """Manage the options."""
+        errors: Dict[str, str] = {}
         if user_input is not None:
-            return self.async_create_entry(title="", data=user_input)
+            if user_input.get("backend") == BACKEND_BRIDGE:
+                if not user_input.get("bridge_host") or not user_input.get(
+                    "bridge_token"
+                ):
+                    errors["base"] = "bridge_incomplete"
+                else:
+                    try:
+                        await validate_bridge(self.hass, user_input)
+                    except CannotConnect:
+                        errors["base"] = "bridge_cannot_connect"
+            if not errors:
+                return self.async_create_entry(title="", data=user_input)
 
         options_schema = vol.Schema({
             vol.Required(
@@ -366,6 +650,41 @@ class NukiOptionsFlow(config_entries.OptionsFlow):
                     "otp_lifetime_hours", DEFAULT_OTP_LIFETIME_HOURS
                 ),
             ): vol.All(int, vol.Range(min=1, max=168)),  # 1 hour to 1 week
+            vol.Required(
+                "backend", default=self._current("backend", BACKEND_CLOUD)
+            ): selector.SelectSelector(
+                selector.SelectSelectorConfig(
+                    options=[BACKEND_CLOUD, BACKEND_BRIDGE],
+                    mode=selector.SelectSelectorMode.DROPDOWN,
+                    translation_key="backend",
+                )
+            ),
+            vol.Optional(
+                "bridge_host",
+                description={"suggested_value": self._current("bridge_host", None)},
+            ): str,
+            vol.Optional(
+                "bridge_port",
+                default=self._current("bridge_port", DEFAULT_BRIDGE_PORT),
+            ): vol.All(int, vol.Range(min=1, max=65535)),
+            vol.Optional(
+                "bridge_token",
+                description={"suggested_value": self._current("bridge_token", None)},
+            ): str,
+            vol.Optional(
+                "latency_slo_seconds",
+                default=self._current(
+                    "latency_slo_seconds", DEFAULT_LATENCY_SLO_SECONDS
+                ),
+            ): vol.All(int, vol.Range(min=1, max=600)),
+            vol.Optional(
+                "operation_timeout_seconds",
+                default=self._current(
+                    "operation_timeout_seconds", DEFAULT_OPERATION_TIMEOUT_SECONDS
+                ),
+            ): vol.All(int, vol.Range(min=5, max=600)),
         })
 
-        return self.async_show_form(step_id="init", data_schema=options_schema)
\ No newline at end of file
+        return self.async_show_form(
+            step_id="init", data_schema=options_schema, errors=errors
+        )
\ No newline at end of file
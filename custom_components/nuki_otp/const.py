@@ -10,12 +10,35 @@ DEFAULT_TIMEOUT = 30
 MAX_RETRIES = 3
 RETRY_DELAY = 1
 
+# Transport backends. "bridge" reads lock data from a Nuki Bridge on the LAN
+# and falls back to the Web API (which is always used for keypad codes).
+BACKEND_CLOUD = "cloud"
+BACKEND_BRIDGE = "bridge"
+DEFAULT_BRIDGE_PORT = 8080
+
 # Sensor constants
 NO_CODE = "------"
 
+# Dispatcher signals sent with the entry id once an entry is set up and once it
+# is unloaded; live websocket subscriptions follow entries through reloads.
+SIGNAL_ENTRY_LOADED = f"{DOMAIN}_entry_loaded"
+SIGNAL_ENTRY_UNLOADED = f"{DOMAIN}_entry_unloaded"
+
+# Tap-to-visible latency for a new code (switch turned on until the code is
+# published). A measurement above the SLO fires EVENT_SLO_BREACHED.
+DEFAULT_LATENCY_SLO_SECONDS = 10
+EVENT_SLO_BREACHED = f"{DOMAIN}_slo_breached"
+
+# Time budget of a switch press or generate_code call across all its requests
+# and retries. When it runs out the operation fails instead of waiting longer.
+DEFAULT_OPERATION_TIMEOUT_SECONDS = 60
+
 # Frontend (Lovelace) card bundled with the integration. The card JS lives in
 # the integration's ``www`` folder and is served from this URL so HACS users
 # get the card automatically, without manually copying files or adding a
 # dashboard resource.
 CARD_FILENAME = "ha-otp-card.js"
-CARD_URL_PATH = "/nuki_otp/ha-otp-card.js"
\ No newline at end of file
+CARD_URL_PATH = "/nuki_otp/ha-otp-card.js"
+# Minified, pre-compressed copy of the card, served under a content hash with
+# immutable cache headers: f"{CARD_ASSET_URL_BASE}/<hash>/{CARD_FILENAME}".
+CARD_ASSET_URL_BASE = "/nuki_otp/card"
@@ -1,26 +1,49 @@
 """Data update coordinator for the Nuki OTP integration."""
 import logging
-from datetime import timedelta
-from typing import Any, Dict
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryAuthFailed
-from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.event import (
+    async_call_later,
+    async_track_point_in_utc_time,
+    async_track_time_interval,
+)
 from homeassistant.helpers.update_coordinator import (
     DataUpdateCoordinator,
     UpdateFailed,
 )
+from homeassistant.util import dt as dt_util
 
-from .const import DOMAIN
-from .helpers import NukiAPIClient, NukiAuthError
+from .const import DEFAULT_LATENCY_SLO_SECONDS, DOMAIN, EVENT_SLO_BREACHED
+from .expiry import ExpiryIndex
+from .helpers import (
+    AuthCode,
+    NukiAPIClient,
+    NukiAPIError,
+    NukiAuthError,
+    NukiConfig,
+)
+from .latency import LatencyTracker
+from .operations import OperationQueue
+from .outbox import Backoff
 
 _LOGGER = logging.getLogger(__name__)
 
-# Expired/used codes are deleted on this cadence, independent of the read
-# poll, so deletion latency or failures never couple into the data refresh.
+# Used codes (and any expired code the expiry timer missed) are deleted on
+# this cadence, independent of the read poll, so deletion latency or failures
+# never couple into the data refresh. Expiry itself is timer driven, see
+# _async_schedule_expiry.
 CLEANUP_INTERVAL = timedelta(hours=1)
 
+# When a poll fails with an API error, the last good data keeps being served
+# (marked with ``stale_since``) for up to this long before the entities go
+# unavailable, so a network blip does not flip the switch off and back on.
+STALE_DATA_MAX_AGE = timedelta(minutes=30)
+
 
 class NukiOTPDataCoordinator(DataUpdateCoordinator):
     """Data coordinator for Nuki OTP integration."""
@@ -30,6 +53,7 @@ class NukiOTPDataCoordinator(DataUpdateCoordinator):
         hass: HomeAssistant,
         api_client: NukiAPIClient,
         config_entry: ConfigEntry,
+        latency_slo: float = DEFAULT_LATENCY_SLO_SECONDS,
     ) -> None:
         """Initialize the coordinator."""
         super().__init__(
@@ -38,8 +62,29 @@ class NukiOTPDataCoordinator(DataUpdateCoordinator):
             name=DOMAIN,
             update_interval=timedelta(minutes=5),
             config_entry=config_entry,
+            # Entities are only written when the data actually changed; a
+            # poll that returns the same codes (or keeps serving stale data)
+            # costs no state writes.
+            always_update=False,
         )
         self.api_client = api_client
+        # Every change to the lock's codes runs through this queue, one at a
+        # time; switch toggles are coalesced (see operations.py).
+        self.operations = OperationQueue()
+        # Background drain of the client's outbox, see async_start_outbox.
+        self._outbox_backoff = Backoff()
+        self._unsub_drain: Optional[CALLBACK_TYPE] = None
+        # Codes by expiry, with one timer armed for the earliest of them.
+        self._expiry_index = ExpiryIndex()
+        self._indexed_codes: Dict[str, AuthCode] = {}
+        self._unsub_expiry: Optional[CALLBACK_TYPE] = None
+        # When data was last read successfully; see _async_serve_stale.
+        self._last_fetch: Optional[datetime] = None
+        # Tap-to-visible latency of new codes, see async_mark_code_requested.
+        self.latency = LatencyTracker()
+        self.latency_slo = latency_slo
+        self._latency_start: Optional[float] = None
+        self._latency_baseline: Optional[str] = None
 
     @callback
     def async_start_cleanup(self) -> CALLBACK_TYPE:
@@ -55,7 +100,7 @@ class NukiOTPDataCoordinator(DataUpdateCoordinator):
     async def _async_cleanup(self, _now=None) -> None:
         """Delete expired/used codes; isolated from the read poll."""
         try:
-            await self.api_client.cleanup_expired_codes()
+            await self.operations.submit(self.api_client.cleanup_expired_codes)
         except NukiAuthError:
             # Reauth is driven by the read poll (_async_update_data); from this
             # scheduled callback we can only ask HA to start the flow. Avoid
@@ -64,6 +109,209 @@ class NukiOTPDataCoordinator(DataUpdateCoordinator):
             if self.config_entry is not None:
                 self.config_entry.async_start_reauth(self.hass)
 
+    @callback
+    def async_start_outbox(self) -> CALLBACK_TYPE:
+        """Drain the client's outbox in the background until stopped.
+
+        Mutations the cloud could not be reached for are retried with
+        exponential backoff, and right away once a poll succeeds again.
+        Returns the callback that stops it (called on entry unload).
+        """
+        outbox = self.api_client.outbox
+        outbox.listener = self._async_outbox_queued
+        if outbox:
+            self._async_schedule_drain(0)
+
+        @callback
+        def _stop() -> None:
+            outbox.listener = None
+            if self._unsub_drain is not None:
+                self._unsub_drain()
+                self._unsub_drain = None
+
+        return _stop
+
+    @callback
+    def _async_outbox_queued(self) -> None:
+        """Something was queued because the cloud was unreachable."""
+        self._async_schedule_drain(self._outbox_backoff.next_delay())
+
+    @callback
+    def _async_schedule_drain(self, delay: float) -> None:
+        """Arm the drain timer unless a drain is already scheduled."""
+        if self._unsub_drain is None:
+            self._unsub_drain = async_call_later(
+                self.hass, delay, self._async_drain_outbox
+            )
+
+    async def _async_drain_outbox(self, _now=None) -> None:
+        """Send the queued mutations; back off while the cloud stays down."""
+        self._unsub_drain = None
+        try:
+            await self.operations.submit(self.api_client.drain_outbox)
+        except NukiAuthError:
+            # The read poll owns reauth; retry once credentials are fixed.
+            _LOGGER.debug("Outbox drain skipped: API authentication failed")
+        except NukiAPIError as err:
+            _LOGGER.debug("Outbox drain failed, retrying later: %s", err)
+        if self.api_client.outbox:
+            self._async_schedule_drain(self._outbox_backoff.next_delay())
+        else:
+            self._outbox_backoff.reset()
+
+    @callback
+    def async_cancel_expiry(self) -> None:
+        """Cancel the pending expiry timer (called on entry unload)."""
+        if self._unsub_expiry is not None:
+            self._unsub_expiry()
+            self._unsub_expiry = None
+
+    @callback
+    def _async_schedule_expiry(self, auth_codes: List[AuthCode]) -> None:
+        """Index ``auth_codes`` by expiry and arm a timer for the earliest.
+
+        Codes that are already past expiry are indexed too, so the timer
+        fires right away and deletes them from the lock.
+        """
+        self._indexed_codes = {auth.id: auth for auth in auth_codes}
+        self._expiry_index.replace(
+            (auth.id, auth.expiry) for auth in auth_codes if auth.expiry is not None
+        )
+        self._async_arm_expiry_timer()
+
+    @callback
+    def _async_arm_expiry_timer(self) -> None:
+        """(Re)arm the single timer for the next indexed expiry."""
+        self.async_cancel_expiry()
+        next_expiry = self._expiry_index.next_expiry()
+        if next_expiry is not None:
+            self._unsub_expiry = async_track_point_in_utc_time(
+                self.hass, self._async_handle_expiry, next_expiry
+            )
+
+    async def _async_handle_expiry(self, now: datetime) -> None:
+        """Evict the codes that just expired and publish the change at once.
+
+        The lock already stops accepting a code at its allowedUntilDate, so
+        the entities are updated first (state is never stale past expiry) and
+        the auths are deleted on the lock afterwards as housekeeping.
+        """
+        self._unsub_expiry = None
+        expired = [
+            self._indexed_codes[auth_id]
+            for auth_id in self._expiry_index.pop_due(now)
+        ]
+        if expired:
+            await self.async_evict_codes(expired)
+        self._async_arm_expiry_timer()
+
+    async def async_evict_codes(self, auth_codes: List[AuthCode]) -> None:
+        """Drop ``auth_codes`` from the published data, then delete them.
+
+        Used for expiry and for revoking codes the moment they are used: the
+        entities update immediately and the delete round trip happens after.
+        Delete failures are logged by the client; the hourly sweep retries.
+        """
+        evicted = {auth.id for auth in auth_codes}
+        for auth_id in evicted:
+            self._indexed_codes.pop(auth_id, None)
+            self._expiry_index.discard(auth_id)
+        current = self.data.get("auth_codes", []) if self.data else []
+        if any(auth.id in evicted for auth in current):
+            self.async_set_updated_data(
+                self._build_data(
+                    [a for a in current if a.id not in evicted],
+                    self.data.get("stale_since"),
+                )
+            )
+        await self.operations.submit(
+            lambda: self.api_client.delete_auth_codes(auth_codes)
+        )
+
+    async def async_apply_options(self, config: NukiConfig, latency_slo: float) -> None:
+        """Apply new options to the running entry.
+
+        Only a new OTP username changes which auths belong to this entry, so
+        only then are the auths fetched again. Anything else (lifetime of new
+        codes, Bridge settings, SLO) takes effect on the next use; the
+        entities are just re-rendered.
+        """
+        changed = self.api_client.apply_config(config)
+        self.latency_slo = latency_slo
+        if changed & {"otp_username", "api_token", "api_url", "nuki_name"}:
+            await self.async_request_refresh()
+        else:
+            self.async_update_listeners()
+
+    @callback
+    def async_mark_code_requested(self) -> None:
+        """Start the tap-to-visible clock for a new code.
+
+        Called by the switch as soon as it is turned on. The clock stops the
+        first time a code other than the one published now is published with
+        its secret, i.e. when the new code becomes visible. A press while a
+        measurement is pending (a double tap joining the running generation)
+        keeps the clock of the first press.
+        """
+        if self._latency_start is not None:
+            return
+        current = self.data.get("current_code") if self.data else None
+        self._latency_baseline = current.id if current is not None else None
+        self._latency_start = time.monotonic()
+
+    @callback
+    def async_cancel_code_request(self) -> None:
+        """Stop the clock without recording (code generation failed)."""
+        self._latency_start = None
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Record a pending latency measurement before entities update."""
+        self._async_measure_latency()
+        super().async_update_listeners()
+
+    @callback
+    def _async_measure_latency(self) -> None:
+        """Record tap-to-visible latency if the requested code is now published."""
+        if self._latency_start is None or not self.data:
+            return
+        current: Optional[AuthCode] = self.data.get("current_code")
+        if current is None or not current.code or current.id == self._latency_baseline:
+            return
+        elapsed = time.monotonic() - self._latency_start
+        self._latency_start = None
+        self.latency.record(elapsed)
+        if elapsed > self.latency_slo:
+            _LOGGER.warning(
+                "New OTP code took %.1fs to become visible (SLO %ss)",
+                elapsed,
+                self.latency_slo,
+            )
+            self.hass.bus.async_fire(
+                EVENT_SLO_BREACHED,
+                {
+                    "entry_id": self.config_entry.entry_id if self.config_entry else None,
+                    "latency": round(elapsed, 3),
+                    "threshold": self.latency_slo,
+                },
+            )
+
+    @staticmethod
+    def _build_data(
+        auth_codes: List[AuthCode], stale_since: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """Shape the coordinator data published to the entities.
+
+        ``stale_since`` is set while the last good data is being served after
+        failed polls: it is when that data was read.
+        """
+        return {
+            "auth_codes": auth_codes,
+            "current_code": auth_codes[0] if auth_codes else None,
+            "has_active_code": len(auth_codes) > 0,
+            "stale_since": stale_since,
+        }
+
     async def _async_update_data(self) -> Dict[str, Any]:
         """Fetch data from API endpoint.
 
@@ -72,27 +320,55 @@ class NukiOTPDataCoordinator(DataUpdateCoordinator):
         so a slow or failing delete never couples into the 5-minute refresh.
         """
         try:
-            # Get current auth codes
-            auth_codes = await self.api_client.get_auth_codes()
-
-            current_code = auth_codes[0] if auth_codes else None
-            if current_code is not None:
-                # The API never returns the secret code on read; surface the
-                # code we cached locally when we generated it.
-                cached = self.api_client.get_cached_code(current_code.get("name", ""))
-                if cached is not None:
-                    current_code = {**current_code, "code": cached}
-
-            return {
-                "auth_codes": auth_codes,
-                "current_code": current_code,
-                "has_active_code": len(auth_codes) > 0,
-            }
+            # Parsed AuthCode models; the client already attached the secret
+            # code we cached when generating it (the API never returns it).
+            auth_codes = await self.api_client.fetch_auth_codes()
         except NukiAuthError as err:
             # Token revoked/expired: trigger HA's reauth flow so the user can
             # supply a new token without re-adding the integration.
             raise ConfigEntryAuthFailed(
                 "Nuki API token rejected; reauthentication required"
             ) from err
+        except NukiAPIError as err:
+            return self._async_serve_stale(err)
         except Exception as err:
             raise UpdateFailed(f"Error communicating with API: {err}") from err
+
+        now = self._last_fetch = dt_util.utcnow()
+        # Codes past expiry but still on the lock are indexed, so the expiry
+        # timer deletes them right away, but never published as active.
+        self._async_schedule_expiry(auth_codes)
+        if self.api_client.outbox and self._unsub_drain is not None:
+            # The API answered: send what is queued now rather than
+            # waiting out the backoff.
+            self._unsub_drain()
+            self._unsub_drain = None
+            self._async_schedule_drain(0)
+        return self._build_data(
+            [auth for auth in auth_codes if auth.expiry is None or auth.expiry > now]
+        )
+
+    @callback
+    def _async_serve_stale(self, err: NukiAPIError) -> Dict[str, Any]:
+        """Keep serving the last good data after a failed poll.
+
+        A transient API error no longer reads as "the lock has no codes": the
+        previous codes stay published, with ``stale_since`` set to when they
+        were read, until :data:`STALE_DATA_MAX_AGE` has passed. Codes that
+        expire in the meantime are still dropped.
+        """
+        now = dt_util.utcnow()
+        if (
+            self.data is None
+            or self._last_fetch is None
+            or now - self._last_fetch > STALE_DATA_MAX_AGE
+        ):
+            raise UpdateFailed(f"Error communicating with API: {err}") from err
+        _LOGGER.debug("Poll failed, serving data from %s: %s", self._last_fetch, err)
+        return self._build_data(
+            [
+                auth for auth in self.data["auth_codes"]
+                if auth.expiry is None or auth.expiry > now
+            ],
+            self._last_fetch,
+        )
@@ -0,0 +1,64 @@
+"""Expiry index for the OTP codes an entry currently knows about.
+
+The coordinator keeps one :class:`ExpiryIndex` per entry and arms a single
+point-in-time callback for :meth:`ExpiryIndex.next_expiry`. When it fires,
+only the codes that are due are evicted, so the work per expiry is
+proportional to the number of codes expiring, not to the number held.
+
+Kept free of Home Assistant imports so it can be unit tested on its own.
+"""
+from __future__ import annotations
+
+import heapq
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class ExpiryIndex:
+    """Min-heap of ``(expiry, auth id)`` with lazy removal.
+
+    ``_live`` is the source of truth for which ids are indexed and when they
+    expire; heap entries that no longer match it are skipped when they reach
+    the top, which keeps :meth:`discard` O(1).
+    """
+
+    def __init__(self) -> None:
+        self._heap: List[Tuple[datetime, str]] = []
+        self._live: Dict[str, datetime] = {}
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def replace(self, entries: Iterable[Tuple[str, datetime]]) -> None:
+        """Rebuild the index from a fresh ``(auth id, expiry)`` snapshot."""
+        self._live = dict(entries)
+        self._heap = [(expiry, auth_id) for auth_id, expiry in self._live.items()]
+        heapq.heapify(self._heap)
+
+    def discard(self, auth_id: str) -> None:
+        """Stop tracking ``auth_id`` (e.g. after it was deleted)."""
+        self._live.pop(auth_id, None)
+
+    def _prune(self) -> None:
+        """Drop heap entries that were discarded or superseded."""
+        while self._heap:
+            expiry, auth_id = self._heap[0]
+            if self._live.get(auth_id) == expiry:
+                return
+            heapq.heappop(self._heap)
+
+    def next_expiry(self) -> Optional[datetime]:
+        """Return the earliest expiry still indexed, if any."""
+        self._prune()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: datetime) -> List[str]:
+        """Remove and return every auth id whose expiry is at or before ``now``."""
+        due: List[str] = []
+        self._prune()
+        while self._heap and self._heap[0][0] <= now:
+            _, auth_id = heapq.heappop(self._heap)
+            del self._live[auth_id]
+            due.append(auth_id)
+            self._prune()
+        return due
@@ -1,10 +1,15 @@
 """Frontend (Lovelace card) registration for the Nuki OTP integration.
 
 The integration ships the ``ha-otp-card`` Lovelace card in its ``www`` folder.
-On setup we serve that file from a static URL and register it as a Lovelace
-"extra module URL" so the card's custom element is loaded automatically. This
-means a user who installs the integration through HACS gets the card without
-copying files into ``config/www`` or hand-editing dashboard resources.
+On setup we serve a minified, pre-compressed copy of that file from a URL
+containing its content hash (see :mod:`.card_asset`) and register it as a
+Lovelace "extra module URL" so the card's custom element is loaded
+automatically. This means a user who installs the integration through HACS
+gets the card without copying files into ``config/www`` or hand-editing
+dashboard resources, and browsers download it once per card version.
+
+The original file stays available at :data:`CARD_URL_PATH` for dashboards
+that reference it as a resource by hand.
 
 The work is guarded so it runs at most once per Home Assistant instance even
 when several config entries are set up.
@@ -14,11 +19,14 @@ from __future__ import annotations
 import logging
 import os
 
-from homeassistant.components.http import StaticPathConfig
+from aiohttp import web
+
+from homeassistant.components.http import HomeAssistantView, StaticPathConfig
 from homeassistant.core import HomeAssistant
 from homeassistant.loader import IntegrationNotFound, async_get_integration
 
-from .const import CARD_FILENAME, CARD_URL_PATH, DOMAIN
+from .card_asset import CACHE_CONTROL, CONTENT_TYPE, CardAsset, load_card_asset
+from .const import CARD_ASSET_URL_BASE, CARD_FILENAME, CARD_URL_PATH, DOMAIN
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -41,6 +49,41 @@ async def _integration_version(hass: HomeAssistant) -> str:
     return str(integration.version or "0")
 
 
+class OtpCardView(HomeAssistantView):
+    """Serve the pre-compressed card under its content-hash URL."""
+
+    url = CARD_ASSET_URL_BASE + "/{digest}/" + CARD_FILENAME
+    name = "nuki_otp:card"
+    # Loaded by the frontend as a module script, before any auth header exists
+    # (same as the static path it replaces).
+    requires_auth = False
+
+    def __init__(self, asset: CardAsset) -> None:
+        self._asset = asset
+
+    async def get(self, request: web.Request, digest: str) -> web.Response:
+        """Return the best encoding the client accepts."""
+        if digest != self._asset.digest:
+            # An old hash from a cached page: never serve it as immutable.
+            raise web.HTTPNotFound()
+        encoding, payload = self._asset.select(
+            request.headers.get("Accept-Encoding", "")
+        )
+        headers = {
+            "Cache-Control": CACHE_CONTROL,
+            "ETag": f'"{self._asset.digest}"',
+            "Vary": "Accept-Encoding",
+        }
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return web.Response(
+            body=payload,
+            content_type=CONTENT_TYPE,
+            charset="utf-8",
+            headers=headers,
+        )
+
+
 async def async_register_card(hass: HomeAssistant) -> None:
     """Serve the bundled card and add it as a Lovelace module resource."""
     if hass.data.get(_REGISTERED_KEY):
@@ -53,23 +96,34 @@ async def async_register_card(hass: HomeAssistant) -> None:
         )
         return
 
-    # Serve the JS file from a stable URL. cache_headers=False so a card update
-    # shipped with a new integration version is not served stale by HA itself.
+    # Serve the original JS file from a stable URL for hand-added dashboard
+    # resources. cache_headers=False so a card update shipped with a new
+    # integration version is not served stale by HA itself.
     await hass.http.async_register_static_paths(
         [StaticPathConfig(CARD_URL_PATH, card_path, False)]
     )
 
+    # Minify and compress once, off the event loop. If that fails for any
+    # reason, fall back to the plain file with a version query string.
+    try:
+        asset = await hass.async_add_executor_job(load_card_asset, card_path)
+    except (OSError, ValueError) as err:
+        _LOGGER.warning("Could not build the compressed OTP card: %s", err)
+        card_url = f"{CARD_URL_PATH}?v={await _integration_version(hass)}"
+    else:
+        hass.http.register_view(OtpCardView(asset))
+        card_url = f"{CARD_ASSET_URL_BASE}/{asset.digest}/{CARD_FILENAME}"
+
     # Add the card to the frontend's extra module URLs so its custom element is
-    # loaded on every dashboard. The version query string busts the browser
-    # cache whenever the bundled card changes.
-    versioned_url = f"{CARD_URL_PATH}?v={await _integration_version(hass)}"
+    # loaded on every dashboard. The content hash in the URL changes whenever
+    # the bundled card does, so browsers can cache each version forever.
     try:
         from homeassistant.components.frontend import add_extra_js_url
 
-        add_extra_js_url(hass, versioned_url)
+        add_extra_js_url(hass, card_url)
     except ImportError:  # pragma: no cover - frontend always present in HA
         _LOGGER.debug("frontend component unavailable; card auto-load skipped")
         return
 
     hass.data[_REGISTERED_KEY] = True
-    _LOGGER.debug("Registered bundled OTP card at %s", versioned_url)
+    _LOGGER.debug("Registered bundled OTP card at %s", card_url)
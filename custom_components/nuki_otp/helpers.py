@@ -1,15 +1,40 @@
 """API client and helpers for the Nuki OTP integration."""
 import asyncio
+import codecs
+import hashlib
+import json
 import logging
 import secrets
-from dataclasses import dataclass
-from datetime import timedelta
-from typing import Dict, List, Optional, Tuple, Union
+from dataclasses import dataclass, fields
+from datetime import datetime, time, timedelta
+from time import monotonic
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
 
 import aiohttp
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.util import dt as dt_util
+from homeassistant.util.json import json_loads
+
+from .const import (
+    BACKEND_BRIDGE,
+    BACKEND_CLOUD,
+    DEFAULT_BRIDGE_PORT,
+    DEFAULT_OPERATION_TIMEOUT_SECONDS,
+)
+
+if TYPE_CHECKING:
+    from .outbox import Outbox
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -17,6 +42,47 @@ _LOGGER = logging.getLogger(__name__)
 DEFAULT_TIMEOUT = 30
 MAX_RETRIES = 3
 RETRY_DELAY = 1
+# Cap on connecting to the server within a request's share of the budget, so
+# an unreachable host fails well before the budget is spent.
+CONNECT_TIMEOUT = 10
+# Page size for the usage watcher's log-delta query. A lock produces far fewer
+# than this many log entries between two watcher cycles.
+LOG_DELTA_LIMIT = 50
+# Lock log action of an unlock, the only entry that counts as a code's use;
+# locking, lock 'n' go and the like do not.
+LOG_ACTION_UNLOCK = 1
+
+# Read size for incrementally parsed list responses. Auth records are a few
+# hundred bytes, so a chunk holds many records and only one partial record is
+# ever carried over between chunks.
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# allowedWeekDays bitmask of the Web API: Monday is the highest bit, Sunday the
+# lowest; 127 allows every day.
+WEEKDAY_BITS = {
+    "mon": 64, "tue": 32, "wed": 16, "thu": 8, "fri": 4, "sat": 2, "sun": 1,
+}
+ALL_WEEKDAYS = 127
+
+# Random hex tag appended to the name of every auth we create. It makes the
+# name unique, so after a create times out we can look the auth up and know
+# whether *this* create reached the lock. Short, because auth names are limited
+# in length.
+CREATE_NONCE_BYTES = 2
+# After an ambiguous create, how often a confirmed-absent auth is created again
+# before giving up, and how often the lookup that confirms it is retried.
+CREATE_REISSUE_ATTEMPTS = 2
+RECONCILE_RETRIES = 1
+
+# Nuki keypad code rules: six digits, no 0, and not starting with "12". The
+# Web API rejects any other code, so generated codes are checked locally.
+KEYPAD_CODE_LENGTH = 6
+KEYPAD_CODE_DIGITS = "123456789"
+KEYPAD_CODE_FORBIDDEN_PREFIX = "12"
+
+# LAN round trips are milliseconds; a bridge that takes longer than this is
+# treated as down and we fall back to the cloud rather than stall the caller.
+BRIDGE_TIMEOUT = 5
 
 
 @dataclass
@@ -27,12 +93,181 @@ class NukiConfig:
     otp_username: str
     nuki_name: str
     otp_lifetime_hours: int
+    backend: str = BACKEND_CLOUD
+    bridge_host: Optional[str] = None
+    bridge_port: int = DEFAULT_BRIDGE_PORT
+    bridge_token: Optional[str] = None
+    # Web API id of the lock, when already known (e.g. from discovery).
+    smartlock_id: Optional[int] = None
+    # Seconds a switch press or generate_code call may take in total.
+    operation_timeout: float = DEFAULT_OPERATION_TIMEOUT_SECONDS
+
+
+def _parse_api_datetime(value) -> Optional[datetime]:
+    """Parse a Web API ISO-8601 timestamp (``...Z``), or None if unusable."""
+    if not isinstance(value, str) or not value:
+        return None
+    if value.endswith("Z"):
+        value = value[:-1] + "+00:00"
+    try:
+        return dt_util.parse_datetime(value)
+    except ValueError:
+        return None
+
+
+@dataclass(frozen=True, slots=True)
+class AuthCode:
+    """A keypad auth created by this integration.
+
+    Built once per record when the API response is parsed, with the dates
+    already converted, so consumers never re-parse timestamps or dig through
+    raw dicts. ``code`` is the secret we generated (the API never returns it)
+    and is only known for codes created by this Home Assistant instance.
+    """
+
+    id: str
+    name: str
+    enabled: bool = False
+    remote_allowed: bool = False
+    lock_count: int = 0
+    creation_date: Optional[datetime] = None
+    # When the code stops being valid: the auth's allowedUntilDate, or the
+    # creation date plus the configured lifetime for auths without one.
+    expiry: Optional[datetime] = None
+    code: Optional[str] = None
+
+    @classmethod
+    def from_api(
+        cls, record: Dict, lifetime_hours: int, code: Optional[str] = None
+    ) -> "AuthCode":
+        """Build from a Web API auth record."""
+        creation_date = _parse_api_datetime(record.get("creationDate"))
+        expiry = _parse_api_datetime(record.get("allowedUntilDate"))
+        if expiry is None and creation_date is not None:
+            expiry = creation_date + timedelta(hours=lifetime_hours)
+        return cls(
+            id=str(record.get("id", "")),
+            name=record.get("name", ""),
+            enabled=bool(record.get("enabled", False)),
+            remote_allowed=bool(record.get("remoteAllowed", False)),
+            lock_count=int(record.get("lockCount") or 0),
+            creation_date=creation_date,
+            expiry=expiry,
+            code=code,
+        )
+
+    def is_expired(self, now: datetime) -> bool:
+        """Return True once ``now`` is past the expiry (or it is unknown)."""
+        return self.expiry is None or now >= self.expiry
+
+
+@dataclass(frozen=True, slots=True)
+class IssuedCode:
+    """A code this client just created, as returned to the caller.
+
+    Unlike :class:`AuthCode` it does not come from a read: the auth id is not
+    known yet (the create response carries none), but the secret is.
+    """
+
+    name: str
+    code: str
+    valid_from: datetime
+    expiry: datetime
+
+
+def _api_date(value: datetime) -> str:
+    """Format a datetime the way the Web API expects (ms precision, ``Z``)."""
+    return value.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+
+
+def _minutes(value: Optional[time]) -> int:
+    """Minutes since midnight, the unit of allowedFromTime/allowedUntilTime."""
+    return value.hour * 60 + value.minute if value is not None else 0
+
+
+def is_valid_keypad_code(code: str) -> bool:
+    """Return True if the Web API accepts ``code`` as a keypad code."""
+    return (
+        len(code) == KEYPAD_CODE_LENGTH
+        and all(digit in KEYPAD_CODE_DIGITS for digit in code)
+        and not code.startswith(KEYPAD_CODE_FORBIDDEN_PREFIX)
+    )
+
+
+class IssuedCodeIndex:
+    """Codes this integration has put on the locks, across all entries.
+
+    A lock rejects a keypad code that another of its auths already uses.
+    The API never returns codes on read, so the codes we issued are the only
+    ones we can avoid. They are indexed by config entry and auth name, and
+    each entry's lock id is recorded once it is resolved: entries on the same
+    lock avoid each other's codes, while an entry whose lock is not resolved
+    yet only avoids its own. Home Assistant keeps one index in ``hass.data``.
+    """
+
+    def __init__(self) -> None:
+        self._by_entry: Dict[str, Dict[str, str]] = {}
+        self._locks: Dict[str, int] = {}
+
+    def add(
+        self, entry_id: str, smartlock_id: Optional[int], name: str, code: str
+    ) -> None:
+        self._by_entry.setdefault(entry_id, {})[name] = code
+        self._track(entry_id, smartlock_id)
+
+    def discard(self, entry_id: str, name: str) -> None:
+        codes = self._by_entry.get(entry_id)
+        if codes is not None:
+            codes.pop(name, None)
+            if not codes:
+                del self._by_entry[entry_id]
+
+    def remove_entry(self, entry_id: str) -> None:
+        """Forget everything issued by a removed entry."""
+        self._by_entry.pop(entry_id, None)
+        self._locks.pop(entry_id, None)
+
+    def codes(self, entry_id: str, smartlock_id: Optional[int]) -> Set[str]:
+        """Return the codes in use on ``entry_id``'s lock, ``smartlock_id``."""
+        self._track(entry_id, smartlock_id)
+        entries = {entry_id}
+        if smartlock_id is not None:
+            entries.update(
+                other for other, lock in self._locks.items() if lock == smartlock_id
+            )
+        return {
+            code for entry in entries for code in self._by_entry.get(entry, {}).values()
+        }
+
+    def _track(self, entry_id: str, smartlock_id: Optional[int]) -> None:
+        if smartlock_id is None:
+            self._locks.pop(entry_id, None)
+        else:
+            self._locks[entry_id] = smartlock_id
 
 
 class NukiAPIError(Exception):
     """Custom exception for Nuki API errors."""
 
 
+class NukiConnectionError(NukiAPIError):
+    """Raised when a request timed out or failed below HTTP.
+
+    The outcome is unknown: the server may have processed the request. Callers
+    of non-idempotent requests use this to reconcile instead of giving up.
+    """
+
+
+class NukiDeadlineExceeded(NukiConnectionError):
+    """Raised when an operation's time budget runs out (see :class:`Deadline`).
+
+    A connection error as far as callers are concerned: the request in flight
+    when the budget ran out may have been processed, so deletes are queued.
+    A create is reconciled only while budget remains; after that it fails
+    with this error rather than returning None.
+    """
+
+
 class NukiAuthError(NukiAPIError):
     """Raised when the Nuki API rejects our credentials (HTTP 401/403).
 
@@ -42,18 +277,312 @@ class NukiAuthError(NukiAPIError):
     """
 
 
+class Deadline:
+    """Time budget shared by every request and retry of one operation.
+
+    Created when the operation starts and passed down through the client
+    methods. Each request gets a timeout from what is left of the budget
+    (:meth:`client_timeout`), and retry delays that would overrun it are not
+    slept (:meth:`sleep`). Once it is spent, :class:`NukiDeadlineExceeded` is
+    raised instead of starting another request, so the whole operation takes
+    at most ``seconds`` plus scheduling slack.
+
+    Deletes and creates end differently when it runs out: deletes are queued
+    in the outbox and report False (the revocation still has to happen),
+    while creates raise, since a code no one was told about is of no use.
+    """
+
+    def __init__(self, seconds: float) -> None:
+        self.seconds = seconds
+        self._expires_at = monotonic() + seconds
+
+    def remaining(self) -> float:
+        """Seconds left in the budget (0 once it is spent)."""
+        return max(0.0, self._expires_at - monotonic())
+
+    def check(self) -> float:
+        """Return the seconds left, or raise if the budget is spent."""
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise NukiDeadlineExceeded(
+                f"Operation did not finish within {self.seconds:g}s"
+            )
+        return remaining
+
+    def client_timeout(self, total: float) -> aiohttp.ClientTimeout:
+        """Timeouts for one request: ``total`` capped by the remaining budget."""
+        budget = min(total, self.check())
+        return aiohttp.ClientTimeout(
+            total=budget, connect=min(CONNECT_TIMEOUT, budget), sock_read=budget
+        )
+
+    async def sleep(self, delay: float) -> None:
+        """Sleep ``delay`` seconds, or raise at once if that overruns the budget."""
+        if delay >= self.check():
+            raise NukiDeadlineExceeded(
+                f"Operation did not finish within {self.seconds:g}s"
+            )
+        await asyncio.sleep(delay)
+
+
+def _client_timeout(
+    total: float, deadline: Optional[Deadline]
+) -> aiohttp.ClientTimeout:
+    """Return a request's timeouts, bounded by ``deadline`` when given."""
+    if deadline is None:
+        return aiohttp.ClientTimeout(total=total)
+    return deadline.client_timeout(total)
+
+
+async def _retry_sleep(deadline: Optional[Deadline]) -> None:
+    """Wait between two attempts, within ``deadline`` when given."""
+    if deadline is None:
+        await asyncio.sleep(RETRY_DELAY)
+    else:
+        await deadline.sleep(RETRY_DELAY)
+
+
+def _decode_json(body: bytes):
+    """Decode a buffered response body with Home Assistant's orjson loader.
+
+    Works on the raw bytes, so the body is not first decoded to ``str`` as
+    ``response.json()`` does before handing it to the stdlib parser. An empty
+    body yields None, like ``response.json()``.
+    """
+    if not body.strip():
+        return None
+    try:
+        return json_loads(body)
+    except ValueError as err:
+        raise NukiAPIError(f"Invalid JSON in response: {err}") from err
+
+
+async def _collect_json_array(
+    stream, keep: Callable[[Dict], bool]
+) -> List[Dict]:
+    """Parse a JSON array from ``stream`` incrementally, keeping matches only.
+
+    Each element is decoded on its own (``raw_decode`` is C-accelerated) as
+    soon as its bytes have arrived and is dropped unless ``keep`` accepts it,
+    so peak memory is one read chunk plus the records we keep rather than the
+    whole response. A body that is not an array yields ``[]``, mirroring the
+    ``isinstance(..., list)`` guards on the buffered path.
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    kept: List[Dict] = []
+    buf = ""
+    pos = 0
+    started = False
+    finished = False
+
+    async for chunk in stream.iter_chunked(STREAM_CHUNK_SIZE):
+        buf = buf[pos:] + utf8.decode(chunk)
+        pos = 0
+        while not finished:
+            # Skip whitespace and element separators.
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= len(buf):
+                break
+            if not started:
+                if buf[pos] != "[":
+                    return []
+                started = True
+                pos += 1
+                continue
+            if buf[pos] == "]":
+                finished = True
+                break
+            try:
+                record, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                # Element straddles the chunk boundary; wait for more bytes.
+                break
+            pos = end
+            if isinstance(record, dict) and keep(record):
+                kept.append(record)
+        if finished:
+            break
+
+    if not finished:
+        raise NukiAPIError("Truncated JSON array in response")
+    return kept
+
+
+def bridge_smartlock_id(device_type: int, nuki_id: int) -> int:
+    """Map a Bridge ``nukiId``/``deviceType`` pair to a Web API smartlockId.
+
+    The Web API id is the device type prepended (in hex) to the 32-bit nukiId,
+    e.g. a Smart Lock 3.0 (type 4) with nukiId ``0x1A2B3C4D`` is smartlockId
+    ``0x41A2B3C4D``. The Bridge only reports the two parts separately.
+    """
+    return (int(device_type) << 32) | int(nuki_id)
+
+
+class NukiBridgeClient:
+    """Client for the Nuki Bridge HTTP API on the local network.
+
+    The Bridge API exposes lock discovery, state and lock actions only; it has
+    no endpoints for auths or keypad codes. We therefore use it for the reads
+    it can answer (the smartlock list) and leave every keypad-code operation
+    to the Web API.
+    """
+
+    def __init__(
+        self,
+        session: "aiohttp.ClientSession",
+        host: str,
+        port: int,
+        token: str,
+    ) -> None:
+        self._session = session
+        self._base_url = f"http://{host}:{port}"
+        self._token = token
+
+    def _auth_params(self) -> Dict[str, str]:
+        """Return hashed-token auth params so the token never crosses the LAN.
+
+        The Bridge accepts ``ts``/``rnr``/``hash`` where ``hash`` is the
+        SHA-256 of ``"<ts>,<rnr>,<token>"``.
+        """
+        ts = dt_util.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
+        rnr = str(secrets.randbelow(65535))
+        digest = hashlib.sha256(f"{ts},{rnr},{self._token}".encode()).hexdigest()
+        return {"ts": ts, "rnr": rnr, "hash": digest}
+
+    async def _request(self, endpoint: str, deadline: Optional[Deadline] = None):
+        """GET a Bridge endpoint once; any failure raises NukiAPIError.
+
+        Bridge failures never raise ``NukiAuthError``: a rejected Bridge token
+        must not send the entry into a Web API reauth flow, it just means the
+        caller should fall back to the cloud.
+        """
+        url = f"{self._base_url}/{endpoint}"
+        try:
+            timeout = _client_timeout(BRIDGE_TIMEOUT, deadline)
+            async with self._session.request(
+                "GET", url, params=self._auth_params(), timeout=timeout
+            ) as response:
+                if response.status == 200:
+                    return _decode_json(await response.read())
+                raise NukiAPIError(f"Bridge request failed: {response.status}")
+        except asyncio.TimeoutError as err:
+            raise NukiAPIError("Bridge request timeout") from err
+        except aiohttp.ClientError as err:
+            raise NukiAPIError(f"Bridge client error: {err}") from err
+
+    async def list_smartlocks(
+        self, deadline: Optional[Deadline] = None
+    ) -> List[Dict]:
+        """Return the Bridge's paired devices shaped like Web API smartlocks."""
+        devices = await self._request("list", deadline)
+        if not isinstance(devices, list):
+            raise NukiAPIError("Unexpected Bridge /list response")
+        return [
+            {
+                "smartlockId": bridge_smartlock_id(
+                    device.get("deviceType", 0), device["nukiId"]
+                ),
+                "name": device.get("name"),
+                "type": device.get("deviceType", 0),
+            }
+            for device in devices
+            if "nukiId" in device
+        ]
+
+
 class NukiAPIClient:
     """Nuki API client with proper error handling and async support."""
 
-    def __init__(self, hass: HomeAssistant, config: NukiConfig):
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        config: NukiConfig,
+        issued_codes: Optional[IssuedCodeIndex] = None,
+        entry_id: str = "",
+    ):
         self.hass = hass
         self.config = config
         self._session = async_get_clientsession(hass)
+        # Optional LAN transport. Reads the Bridge can answer go there first
+        # and fall back to the Web API on any Bridge failure.
+        self._bridge = self._build_bridge()
         # Cache of generated OTP codes keyed by auth name. The Nuki API never
         # returns the secret code on read (it is write-only), so we keep the
         # code we generated locally to surface it through the sensor. Sensitive:
         # never log the values stored here.
         self._code_cache: Dict[str, str] = {}
+        # Codes issued by every entry, shared so entries on one lock never
+        # pick the same code; a client on its own gets a private index.
+        self._issued_codes = (
+            issued_codes if issued_codes is not None else IssuedCodeIndex()
+        )
+        self._entry_id = entry_id
+        # Resolved on the first successful lock lookup; enables the per-lock
+        # auth endpoint so polls stop downloading every lock's auths.
+        self._smartlock_id: Optional[int] = config.smartlock_id
+        # Durable queue for deletes the cloud could not be reached for; see
+        # attach_outbox. Without one, such deletes are logged and dropped.
+        self.outbox: Optional["Outbox"] = None
+
+    def attach_outbox(self, outbox: "Outbox") -> None:
+        """Queue unreachable deletes in ``outbox`` from now on."""
+        self.outbox = outbox
+
+    def operation_deadline(self) -> Deadline:
+        """Start the time budget of a user-facing operation.
+
+        See :class:`Deadline` for how deletes and creates end when it runs out.
+        """
+        return Deadline(self.config.operation_timeout)
+
+    def _remember_code(self, name: str, code: str) -> None:
+        """Cache the secret of auth ``name`` and mark the code as in use."""
+        self._code_cache[name] = code
+        self._issued_codes.add(self._entry_id, self._smartlock_id, name, code)
+
+    def _forget_code(self, name: str) -> None:
+        """Drop the secret of auth ``name`` and free its code."""
+        self._code_cache.pop(name, None)
+        self._issued_codes.discard(self._entry_id, name)
+
+    def _build_bridge(self) -> Optional[NukiBridgeClient]:
+        """Return a Bridge client if the config selects a usable Bridge."""
+        config = self.config
+        if (
+            config.backend == BACKEND_BRIDGE
+            and config.bridge_host
+            and config.bridge_token
+        ):
+            return NukiBridgeClient(
+                self._session,
+                config.bridge_host,
+                config.bridge_port,
+                config.bridge_token,
+            )
+        return None
+
+    def apply_config(self, config: NukiConfig) -> Set[str]:
+        """Update the live config in place and return the changed field names.
+
+        Used when options change, instead of building a new client, so the
+        cached secret codes and the resolved lock id survive. Everything that
+        holds this client's :class:`NukiConfig` sees the new values.
+        """
+        changed = {
+            field.name
+            for field in fields(NukiConfig)
+            if getattr(self.config, field.name) != getattr(config, field.name)
+        }
+        for name in changed:
+            setattr(self.config, name, getattr(config, name))
+        if changed & {"backend", "bridge_host", "bridge_port", "bridge_token"}:
+            self._bridge = self._build_bridge()
+        if "nuki_name" in changed:
+            # A different lock: the resolved id no longer applies.
+            self._smartlock_id = config.smartlock_id
+        return changed
 
     @property
     def headers(self) -> Dict[str, str]:
@@ -69,13 +598,25 @@ class NukiAPIClient:
         endpoint: str,
         json_data: Optional[Union[Dict, List]] = None,
         retries: int = MAX_RETRIES,
+        keep: Optional[Callable[[Dict], bool]] = None,
+        deadline: Optional[Deadline] = None,
     ):
         """Make HTTP request with retry logic.
 
         Only idempotent GET requests are retried. A create-side call (PUT/
         POST/DELETE) that times out may already have been processed by the
         Nuki server, so retrying it could create a duplicate OTP code on the
-        lock. Such calls are attempted exactly once and the error propagates.
+        lock. Such calls are attempted exactly once and the error propagates
+        as :class:`NukiConnectionError`; :meth:`create_auth_code` reconciles.
+
+        A 200 body is read as bytes and decoded in one go (see
+        :func:`_decode_json`). With ``keep``, it is instead parsed
+        incrementally as a JSON array and only the records ``keep`` accepts
+        are returned (see :func:`_collect_json_array`).
+
+        With a ``deadline``, every attempt's timeouts come out of its remaining
+        budget and no attempt or retry delay starts once it is spent;
+        :class:`NukiDeadlineExceeded` is raised instead.
         """
         url = f"{self.config.api_url}/{endpoint}"
 
@@ -85,12 +626,14 @@ class NukiAPIClient:
 
         for attempt in range(retries + 1):
             try:
-                timeout = aiohttp.ClientTimeout(total=DEFAULT_TIMEOUT)
+                timeout = _client_timeout(DEFAULT_TIMEOUT, deadline)
                 async with self._session.request(
                     method, url, headers=self.headers, json=json_data, timeout=timeout
                 ) as response:
                     if response.status == 200:
-                        return await response.json()
+                        if keep is not None:
+                            return await _collect_json_array(response.content, keep)
+                        return _decode_json(await response.read())
                     if response.status == 204:
                         return {}
                     error_text = await response.text()
@@ -105,53 +648,135 @@ class NukiAPIClient:
                         f"API request failed: {response.status} - {error_text}"
                     )
 
-            except asyncio.TimeoutError:
+            except asyncio.TimeoutError as err:
+                if deadline is not None:
+                    # Raises if this attempt used up the rest of the budget.
+                    deadline.check()
                 if attempt < retries:
                     _LOGGER.warning("Request timeout, retrying in %ss...", RETRY_DELAY)
-                    await asyncio.sleep(RETRY_DELAY)
+                    await _retry_sleep(deadline)
                     continue
-                raise NukiAPIError("Request timeout after retries")
+                raise NukiConnectionError("Request timeout after retries") from err
 
             except aiohttp.ClientError as err:
                 if attempt < retries:
                     _LOGGER.warning("Client error, retrying: %s", err)
-                    await asyncio.sleep(RETRY_DELAY)
+                    await _retry_sleep(deadline)
                     continue
-                raise NukiAPIError(f"Client error: {err}") from err
+                raise NukiConnectionError(f"Client error: {err}") from err
 
         raise NukiAPIError("Max retries exceeded")
 
-    async def get_auth_codes(self) -> List[Dict]:
-        """Get all OTP auth codes created by this integration."""
+    async def get_auth_codes(
+        self, deadline: Optional[Deadline] = None
+    ) -> List[AuthCode]:
+        """Get all OTP auth codes created by this integration.
+
+        API errors other than auth failures and a spent ``deadline`` are
+        logged and read as "no codes"; use :meth:`fetch_auth_codes` to tell
+        the two apart.
+        """
         try:
-            # Nuki Web API filters auth types via the plural "types" query
-            # param (comma-separated). 13 = keypad code.
-            results = await self._make_request("GET", "smartlock/auth?types=13")
-            # A 204 returns {} and the API may return a dict on error; only a
-            # list is iterable as auth records, so guard against anything else.
-            if not isinstance(results, list):
-                return []
-            prefix = self.config.otp_username
-            return [
-                auth for auth in results
-                if auth.get("name", "").startswith(prefix)
-            ]
-        except NukiAuthError:
-            # Let auth failures bubble up so the coordinator can reauth.
+            return await self.fetch_auth_codes(deadline=deadline)
+        except (NukiAuthError, NukiDeadlineExceeded):
+            # Let auth failures bubble up so the coordinator can reauth, and
+            # a spent budget so the operation stops here.
             raise
         except NukiAPIError:
             _LOGGER.exception("Failed to get auth codes")
             return []
 
-    async def list_smartlocks(self) -> List[Dict]:
+    async def fetch_auth_codes(
+        self,
+        active_at: Optional[datetime] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> List[AuthCode]:
+        """Get all OTP auth codes created by this integration; errors raise.
+
+        The coordinator uses this so that a failed read is not mistaken for
+        a lock without codes. With ``active_at``, codes that have expired by
+        then are left out as well.
+        """
+        prefix = self.config.otp_username
+
+        def _ours(auth: Dict) -> bool:
+            name = auth.get("name")
+            return isinstance(name, str) and name.startswith(prefix)
+
+        if self._smartlock_id is None:
+            # One-time lookup; afterwards every poll uses the per-lock
+            # endpoint. If it fails we fall back to the account-wide list.
+            await self.get_smartlock(deadline)
+        # Nuki Web API filters auth types via the plural "types" query
+        # param (comma-separated). 13 = keypad code. It cannot filter by
+        # name. The per-lock endpoint returns only this lock's auths, which
+        # are read in one go and decoded with orjson. The account-wide one
+        # (every auth on every lock) is the fallback for when the lock
+        # cannot be resolved; it is streamed and only our records are kept.
+        if self._smartlock_id is not None:
+            results = await self._make_request(
+                "GET",
+                f"smartlock/{self._smartlock_id}/auth?types=13",
+                deadline=deadline,
+            )
+        else:
+            results = await self._make_request(
+                "GET", "smartlock/auth?types=13", keep=_ours, deadline=deadline
+            )
+        # A 204 returns {} and the API may return a dict on error; only a
+        # list is iterable as auth records, so guard against anything else.
+        if not isinstance(results, list):
+            return []
+        lifetime = self.config.otp_lifetime_hours
+        # Auths whose delete is queued are already revoked as far as the
+        # entities are concerned.
+        revoked = set(self.outbox.delete_ids) if self.outbox else set()
+        # Filter and build the models in a single pass over the records.
+        codes: List[AuthCode] = []
+        for record in results:
+            if (
+                not isinstance(record, dict)
+                or not _ours(record)
+                or record.get("id") in revoked
+            ):
+                continue
+            auth = AuthCode.from_api(
+                record, lifetime, self._code_cache.get(record["name"])
+            )
+            if (
+                active_at is not None
+                and auth.expiry is not None
+                and auth.expiry <= active_at
+            ):
+                continue
+            codes.append(auth)
+        return codes
+
+    async def list_smartlocks(
+        self, deadline: Optional[Deadline] = None
+    ) -> List[Dict]:
         """Return every smartlock on the account (raw list).
 
         Unlike :meth:`get_smartlock`, this does not swallow API errors: the
         config flow needs to distinguish auth failures (bad token) from
         connectivity problems and from "the account simply has no locks", so
         it relies on ``NukiAuthError`` / ``NukiAPIError`` propagating.
+
+        With the Bridge backend the list is read over the LAN; an unreachable
+        or misconfigured Bridge falls back to the Web API transparently.
         """
-        locks = await self._make_request("GET", "smartlock")
+        if self._bridge is not None:
+            try:
+                return await self._bridge.list_smartlocks(deadline)
+            except NukiAPIError as err:
+                _LOGGER.debug("Bridge unavailable, using Web API: %s", err)
+        return await self._list_cloud_smartlocks(deadline)
+
+    async def _list_cloud_smartlocks(
+        self, deadline: Optional[Deadline] = None
+    ) -> List[Dict]:
+        """Return the account's smartlocks from the Web API."""
+        locks = await self._make_request("GET", "smartlock", deadline=deadline)
         # A 204 returns {} and the API may return a dict on error; only a list
         # is iterable as smartlock records, so guard against anything else.
         if not isinstance(locks, list):
@@ -159,32 +784,72 @@ class NukiAPIClient:
             return []
         return locks
 
-    async def get_smartlock(self) -> Optional[Dict]:
+    async def get_smartlock(
+        self, deadline: Optional[Deadline] = None
+    ) -> Optional[Dict]:
         """Get the configured smartlock by name."""
         try:
-            locks = await self.list_smartlocks()
+            locks = await self.list_smartlocks(deadline)
             for lock in locks:
                 if lock.get("name") == self.config.nuki_name:
+                    self._smartlock_id = lock.get("smartlockId")
                     return lock
+            if self._bridge is not None:
+                # The lock may be paired with a different Bridge (or none);
+                # the Web API always knows every lock on the account.
+                for lock in await self._list_cloud_smartlocks(deadline):
+                    if lock.get("name") == self.config.nuki_name:
+                        self._smartlock_id = lock.get("smartlockId")
+                        return lock
             _LOGGER.error("Smartlock '%s' not found", self.config.nuki_name)
             return None
-        except NukiAuthError:
-            # Let auth failures bubble up so the coordinator can reauth.
+        except (NukiAuthError, NukiDeadlineExceeded):
+            # Let auth failures bubble up so the coordinator can reauth, and
+            # a spent budget so the operation stops here.
             raise
         except NukiAPIError:
             _LOGGER.exception("Failed to get smartlock")
             return None
 
-    async def create_auth_code(self) -> bool:
-        """Create new OTP auth code."""
+    async def create_auth_code(
+        self,
+        lifetime_hours: Optional[int] = None,
+        name_suffix: Optional[str] = None,
+        weekdays: Optional[Iterable[str]] = None,
+        allowed_from: Optional[time] = None,
+        allowed_until: Optional[time] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> Optional[IssuedCode]:
+        """Create new OTP auth code.
+
+        Defaults to the configured lifetime, every weekday and all day. Pass
+        ``weekdays`` (``"mon"`` .. ``"sun"``) and/or an ``allowed_from`` /
+        ``allowed_until`` time of day to restrict when the code opens the
+        lock. Returns the created code, or None if creation failed. Raises
+        :class:`NukiDeadlineExceeded` if ``deadline`` runs out before the
+        create is sent.
+        """
         try:
-            smartlock = await self.get_smartlock()
+            smartlock = await self.get_smartlock(deadline)
             if not smartlock:
-                return False
+                return None
 
-            start_date, end_date = self._get_time_range()
+            valid_from, expiry = self._get_time_range(lifetime_hours)
             code = self._generate_otp_code()
             name = f"{self.config.otp_username}_code"
+            if name_suffix:
+                name = f"{name}_{name_suffix}"
+            name = f"{name}_{secrets.token_hex(CREATE_NONCE_BYTES)}"
+            weekday_mask = (
+                sum(WEEKDAY_BITS[day] for day in set(weekdays))
+                if weekdays
+                else ALL_WEEKDAYS
+            )
+            # 0/0 means "all day"; an open end of a window runs to midnight.
+            from_time = _minutes(allowed_from)
+            until_time = _minutes(allowed_until)
+            if allowed_from is not None and allowed_until is None:
+                until_time = 23 * 60 + 59
 
             data = {
                 "name": name,
@@ -192,11 +857,11 @@ class NukiAPIClient:
                 # allowedUntilDate (ISO-8601). The old start_date/end_date keys
                 # are not in the schema and were silently ignored, so codes
                 # never honored otp_lifetime_hours.
-                "allowedFromDate": start_date,
-                "allowedUntilDate": end_date,
-                "allowedWeekDays": 127,
-                "allowedFromTime": 0,
-                "allowedUntilTime": 0,
+                "allowedFromDate": _api_date(valid_from),
+                "allowedUntilDate": _api_date(expiry),
+                "allowedWeekDays": weekday_mask,
+                "allowedFromTime": from_time,
+                "allowedUntilTime": until_time,
                 "smartlockIds": [smartlock["smartlockId"]],
                 "remoteAllowed": True,
                 "smartActionsEnabled": False,
@@ -204,19 +869,110 @@ class NukiAPIClient:
                 "code": code,
             }
 
-            await self._make_request("PUT", "smartlock/auth", data)
             # Cache the generated code so the sensor can surface it; the API
-            # will not return it on subsequent reads.
-            self._code_cache[name] = str(code)
+            # will not return it on subsequent reads. Cached before the PUT so
+            # an auth whose create could not be confirmed still shows its code
+            # if it turns up on a later poll.
+            self._remember_code(name, str(code))
+            try:
+                await self._make_request(
+                    "PUT", "smartlock/auth", data, deadline=deadline
+                )
+            except NukiConnectionError as err:
+                try:
+                    confirmed = await self._reconcile_create(data, err, deadline)
+                except NukiDeadlineExceeded:
+                    raise
+                except NukiAPIError:
+                    # The re-issued create was rejected, so no auth has the code.
+                    self._forget_code(name)
+                    raise
+                if not confirmed:
+                    # Not queued: the body holds the plaintext code, and the
+                    # caller has already been told the create failed.
+                    _LOGGER.error("Could not confirm the auth code was created")
+                    return None
+            except NukiAPIError:
+                self._forget_code(name)
+                raise
             _LOGGER.info("New OTP auth code created")
-            return True
+            return IssuedCode(
+                name=name, code=str(code), valid_from=valid_from, expiry=expiry
+            )
 
+        except NukiDeadlineExceeded:
+            raise
         except NukiAPIError:
             _LOGGER.exception("Failed to create auth code")
-            return False
+            return None
+
+    async def _reconcile_create(
+        self,
+        data: Dict,
+        error: NukiConnectionError,
+        deadline: Optional[Deadline] = None,
+    ) -> bool:
+        """Settle a create whose PUT failed with an unknown outcome.
+
+        The auth's name is unique (see :data:`CREATE_NONCE_BYTES`), so looking
+        it up on the lock tells whether the create went through. If it did,
+        the auth is adopted; if it is confirmed absent, the identical create is
+        issued again. When the lookup itself fails nothing is re-issued (that
+        could duplicate the code) and False is returned; the cached code stays
+        so a later poll that finds the auth can still show it. If ``deadline``
+        runs out first, :class:`NukiDeadlineExceeded` propagates.
+        """
+        name = data["name"]
+        _LOGGER.warning("Creating auth code failed (%s), checking the lock", error)
+        for _ in range(CREATE_REISSUE_ATTEMPTS):
+            try:
+                # Give the server a moment to finish a create it did receive.
+                await _retry_sleep(deadline)
+                if await self._auth_exists(name, deadline):
+                    _LOGGER.info("Auth code was created despite the error")
+                    return True
+            except NukiDeadlineExceeded:
+                raise
+            except NukiAPIError as err:
+                _LOGGER.error("Could not confirm whether the auth code exists: %s", err)
+                return False
+            try:
+                await self._make_request(
+                    "PUT", "smartlock/auth", data, deadline=deadline
+                )
+                return True
+            except NukiDeadlineExceeded:
+                raise
+            except NukiConnectionError as err:
+                _LOGGER.warning("Re-issued create failed (%s), checking again", err)
+        # Still ambiguous after the last re-issue.
+        return False
+
+    async def _auth_exists(
+        self, name: str, deadline: Optional[Deadline] = None
+    ) -> bool:
+        """Return True if the lock has an auth called ``name`` (errors raise)."""
+        if self._smartlock_id is not None:
+            endpoint = f"smartlock/{self._smartlock_id}/auth?types=13"
+        else:
+            endpoint = "smartlock/auth?types=13"
+        found = await self._make_request(
+            "GET",
+            endpoint,
+            retries=RECONCILE_RETRIES,
+            keep=lambda auth: auth.get("name") == name,
+            deadline=deadline,
+        )
+        return isinstance(found, list) and bool(found)
 
-    async def delete_auth_codes(self, auth_codes: List[Dict]) -> bool:
-        """Delete auth codes."""
+    async def delete_auth_codes(
+        self, auth_codes: List[AuthCode], deadline: Optional[Deadline] = None
+    ) -> bool:
+        """Delete auth codes.
+
+        If they cannot be deleted now, including because ``deadline`` ran out,
+        the deletes are queued in the outbox and False is returned.
+        """
         if not auth_codes:
             return True
 
@@ -225,18 +981,82 @@ class NukiAPIClient:
             # string auth ids (e.g. ["id1", "id2"]), NOT an object such as
             # {"ids": [...]}. The wrapped shape fails schema validation and the
             # codes are never removed. The auth "id" field is a string.
-            ids = [auth["id"] for auth in auth_codes]
-            await self._make_request("DELETE", "smartlock/auth", ids)
+            ids = [auth.id for auth in auth_codes]
+            await self._make_request(
+                "DELETE", "smartlock/auth", ids, deadline=deadline
+            )
             # Drop the cached codes for the deleted auths so the sensor falls
             # back to "no code" once they are gone.
             for auth in auth_codes:
-                self._code_cache.pop(auth.get("name", ""), None)
+                self._forget_code(auth.name)
             _LOGGER.info("Deleted %d auth code(s)", len(ids))
             return True
+        except NukiConnectionError as err:
+            if self.outbox is None:
+                _LOGGER.exception("Failed to delete auth codes")
+                return False
+            # The revocation must still happen: keep it across restarts and
+            # send it with the other queued deletes once the cloud is back.
+            self.outbox.add_deletes(
+                (auth.id for auth in auth_codes), _api_date(dt_util.utcnow())
+            )
+            for auth in auth_codes:
+                self._forget_code(auth.name)
+            _LOGGER.warning("Deleting %d auth code(s) queued: %s", len(auth_codes), err)
+            return False
         except NukiAPIError:
             _LOGGER.exception("Failed to delete auth codes")
             return False
 
+    async def drain_outbox(self) -> None:
+        """Send the queued deletes.
+
+        They all go out in one DELETE call. If the API rejects them outright
+        they are dropped with an error, since resending them cannot succeed.
+        Connection errors (and auth failures) propagate with the deletes still
+        queued, for the caller to retry.
+        """
+        outbox = self.outbox
+        if not outbox:
+            return
+        ids = outbox.delete_ids
+        if ids:
+            try:
+                await self._make_request("DELETE", "smartlock/auth", ids)
+            except (NukiConnectionError, NukiAuthError):
+                raise
+            except NukiAPIError as err:
+                _LOGGER.error("Dropping %d queued delete(s): %s", len(ids), err)
+            else:
+                _LOGGER.info("Deleted %d queued auth code(s)", len(ids))
+            outbox.complete_deletes(ids)
+
+    @property
+    def smartlock_id(self) -> Optional[int]:
+        """Web API id of the configured lock, once resolved."""
+        return self._smartlock_id
+
+    async def get_log_delta(self, since: Optional[str]) -> List[Dict]:
+        """Return the lock's unlocks dated ``since`` or later, newest first.
+
+        Without ``since``, the latest page of unlocks. One small request
+        regardless of how many codes are outstanding; used by the usage
+        watcher. Errors propagate so the caller can keep its cursor and retry
+        on the next cycle.
+        """
+        if self._smartlock_id is None:
+            await self.get_smartlock()
+        if self._smartlock_id is None:
+            raise NukiAPIError("Smartlock id unknown")
+        endpoint = (
+            f"smartlock/{self._smartlock_id}/log"
+            f"?action={LOG_ACTION_UNLOCK}&limit={LOG_DELTA_LIMIT}"
+        )
+        if since:
+            endpoint += f"&fromDate={since}"
+        result = await self._make_request("GET", endpoint)
+        return result if isinstance(result, list) else []
+
     def get_cached_code(self, name: str) -> Optional[str]:
         """Return the locally cached code for an auth name, if known.
 
@@ -246,44 +1066,48 @@ class NukiAPIClient:
         return self._code_cache.get(name)
 
     async def get_smartlock_logs(self, smartlock_id: str, auth_id: str) -> List[Dict]:
-        """Get smartlock usage logs."""
+        """Get smartlock usage logs.
+
+        Callers only need to know whether the auth was used at all, so the
+        server filters by auth and action and returns at most one entry.
+        """
         try:
             result = await self._make_request(
                 "GET",
-                f"smartlock/{smartlock_id}/log?action=1&authId={auth_id}",
+                f"smartlock/{smartlock_id}/log"
+                f"?action={LOG_ACTION_UNLOCK}&authId={auth_id}&limit=1",
             )
             return result if isinstance(result, list) else []
         except NukiAPIError:
             _LOGGER.exception("Failed to get smartlock logs")
             return []
 
-    def _generate_otp_code(self, length: int = 6) -> int:
-        """Generate a cryptographically secure random OTP code."""
-        code_str = "".join(secrets.choice("123456789") for _ in range(length))
-        return int(code_str)
-
-    def _get_time_range(self) -> Tuple[str, str]:
-        """Get time range for OTP validity."""
-        now = dt_util.utcnow()
-        end_time = now + timedelta(hours=self.config.otp_lifetime_hours)
-
-        start_date = now.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
-        end_date = end_time.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+    def _generate_otp_code(self) -> int:
+        """Generate a cryptographically secure random keypad code.
 
-        return start_date, end_date
+        Drawn until it satisfies the keypad rules and is not a code this
+        integration already has on the lock, so the create is not rejected.
+        About one draw in 81 starts with "12", and clashes are rarer still.
+        """
+        in_use = self._issued_codes.codes(self._entry_id, self._smartlock_id)
+        while True:
+            code = "".join(
+                secrets.choice(KEYPAD_CODE_DIGITS) for _ in range(KEYPAD_CODE_LENGTH)
+            )
+            if is_valid_keypad_code(code) and code not in in_use:
+                return int(code)
 
-    async def is_auth_expired(self, auth: Dict) -> bool:
-        """Check if auth code is expired."""
-        try:
-            creation_date = dt_util.parse_datetime(auth["creationDate"])
-            if creation_date is None:
-                return True
-            lifetime = dt_util.utcnow() - creation_date
-            return lifetime.total_seconds() >= self.config.otp_lifetime_hours * 3600
-        except (KeyError, ValueError):
-            return True
+    def _get_time_range(
+        self, lifetime_hours: Optional[int] = None
+    ) -> Tuple[datetime, datetime]:
+        """Get time range for OTP validity (configured lifetime by default)."""
+        now = dt_util.utcnow()
+        hours = lifetime_hours or self.config.otp_lifetime_hours
+        return now, now + timedelta(hours=hours)
 
-    async def is_auth_used(self, auth: Dict, smartlock: Optional[Dict] = None) -> bool:
+    async def is_auth_used(
+        self, auth: AuthCode, smartlock: Optional[Dict] = None
+    ) -> bool:
         """Check if auth code has been used.
 
         Pass ``smartlock`` to reuse an already-fetched smartlock and avoid
@@ -297,7 +1121,7 @@ class NukiAPIClient:
 
             logs = await self.get_smartlock_logs(
                 smartlock["smartlockId"],
-                auth["id"],
+                auth.id,
             )
             return len(logs) > 0
         except Exception:
@@ -316,11 +1140,12 @@ class NukiAPIClient:
             # list per code (an N+1 against the Nuki cloud API).
             smartlock = await self.get_smartlock()
 
+            now = dt_util.utcnow()
             to_delete = []
             for auth in auth_codes:
-                if await self.is_auth_expired(auth) or await self.is_auth_used(auth, smartlock):
+                if auth.is_expired(now) or await self.is_auth_used(auth, smartlock):
                     to_delete.append(auth)
-                    _LOGGER.debug("Marking for deletion: %s", auth.get("name"))
+                    _LOGGER.debug("Marking for deletion: %s", auth.name)
 
             if to_delete:
                 await self.delete_auth_codes(to_delete)
@@ -0,0 +1,51 @@
+"""Rolling window of code-creation latencies.
+
+"Time from tap to code visible" is measured from the moment the OTP switch is
+turned on until the coordinator publishes the new code. The coordinator keeps
+the last :data:`LATENCY_WINDOW` measurements here, and the diagnostic latency
+sensors read their p50/p95/max from it.
+
+Kept free of Home Assistant imports so it can be unit tested on its own.
+"""
+from __future__ import annotations
+
+import math
+from collections import deque
+from typing import Deque, Optional
+
+# Number of most recent measurements the statistics are computed over.
+LATENCY_WINDOW = 100
+
+
+class LatencyTracker:
+    """Bounded window of latency samples, in seconds."""
+
+    def __init__(self, window: int = LATENCY_WINDOW) -> None:
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, seconds: float) -> None:
+        """Add one measurement, evicting the oldest once the window is full."""
+        self._samples.append(seconds)
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """Return the nearest-rank ``percent`` percentile, or None if empty."""
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        rank = max(1, math.ceil(percent / 100 * len(ordered)))
+        return ordered[rank - 1]
+
+    @property
+    def p50(self) -> Optional[float]:
+        return self.percentile(50)
+
+    @property
+    def p95(self) -> Optional[float]:
+        return self.percentile(95)
+
+    @property
+    def max(self) -> Optional[float]:
+        return max(self._samples) if self._samples else None
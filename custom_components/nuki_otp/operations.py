@@ -0,0 +1,120 @@
+"""Per-lock queue for operations that change the codes on a lock.
+
+Turning the switch on deletes the entry's codes and creates a new one; turning
+it off deletes them. Two of these running at once waste round trips and can
+leave two codes behind, so every mutation goes through the lock's
+:class:`OperationQueue`, which runs one at a time.
+
+Switch toggles are *intents* ("on"/"off"), and only the latest one matters:
+
+* an intent equal to the one already running joins it (a double tap creates
+  one code, not two), and drops whatever intent was waiting, since the lock
+  ends up as the running intent leaves it;
+* otherwise it takes the single pending slot, replacing whatever intent was
+  waiting there (latest intent wins) and sharing its result with everyone who
+  asked for the replaced one.
+
+So however fast the input arrives, at most one intent runs after the current
+operation. Operations without an intent (e.g. the ``generate_code`` action)
+are only serialized, never merged or dropped.
+
+Kept free of Home Assistant imports so it can be unit tested on its own.
+"""
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable, Optional
+
+Operation = Callable[[], Awaitable[Any]]
+
+
+class _Pending:
+    """The intent waiting for its turn, and the future its callers share."""
+
+    __slots__ = ("intent", "operation", "future", "superseded_by")
+
+    def __init__(self, intent: str, operation: Operation) -> None:
+        self.intent = intent
+        self.operation = operation
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        # Only callers that joined read the outcome; mark an exception as
+        # retrieved so an unshared failure is not logged a second time.
+        self.future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        # Set when a later intent equal to the running one made this moot.
+        self.superseded_by: Optional[_Pending] = None
+
+
+def _copy_outcome(source: asyncio.Future, target: asyncio.Future) -> None:
+    """Resolve ``target`` like the finished ``source``."""
+    if source.cancelled():
+        target.cancel()
+    elif source.exception() is not None:
+        target.set_exception(source.exception())
+    else:
+        target.set_result(source.result())
+
+
+class OperationQueue:
+    """Serializes mutations and coalesces intents for one lock."""
+
+    def __init__(self) -> None:
+        self._lock = asyncio.Lock()
+        self._pending: Optional[_Pending] = None
+        self._running: Optional[_Pending] = None
+
+    async def submit(self, operation: Operation, intent: Optional[str] = None) -> Any:
+        """Run ``operation`` after the ones before it and return its result.
+
+        With ``intent``, the call may instead be merged into an equal running
+        or pending intent, or have its operation replaced by a later intent;
+        either way it returns the result of the operation that ran for it.
+        """
+        if intent is None:
+            async with self._lock:
+                return await operation()
+
+        running = self._running
+        if running is not None and running.intent == intent:
+            if self._pending is not None:
+                # Back to the running intent: the waiting one is moot, and
+                # its callers get the running result instead.
+                self._pending.superseded_by = running
+                self._pending = None
+            return await asyncio.shield(running.future)
+        if self._pending is not None:
+            # Latest intent wins; an identical one is simply merged.
+            self._pending.intent = intent
+            self._pending.operation = operation
+            return await asyncio.shield(self._pending.future)
+
+        pending = _Pending(intent, operation)
+        self._pending = pending
+        try:
+            await self._lock.acquire()
+        except asyncio.CancelledError:
+            # Nobody else will run it; release the callers merged into it.
+            if self._pending is pending:
+                self._pending = None
+            pending.future.cancel()
+            raise
+        try:
+            if pending.superseded_by is not None:
+                # Its future finished before the lock was released.
+                _copy_outcome(pending.superseded_by.future, pending.future)
+                return pending.future.result()
+            self._pending = None
+            self._running = pending
+            try:
+                result = await pending.operation()
+            except Exception as err:
+                pending.future.set_exception(err)
+                raise
+            pending.future.set_result(result)
+            return result
+        finally:
+            if not pending.future.done():
+                # Cancelled mid-operation: release the callers that joined.
+                pending.future.cancel()
+            if self._running is pending:
+                self._running = None
+            self._lock.release()
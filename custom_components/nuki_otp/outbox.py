@@ -0,0 +1,99 @@
+"""Durable outbox for lock mutations the cloud could not be reached for.
+
+A revocation that fails because the Nuki cloud is down must still happen, even
+if Home Assistant restarts before the cloud comes back. The API client puts
+such deletes here instead of dropping them, keyed by auth id, so queueing the
+same auth twice is one entry and every queued delete goes out in a single
+``DELETE smartlock/auth`` call.
+
+Creates are never queued: their PUT body holds the plaintext keypad code,
+which must not be written to ``.storage``, and a code nobody was told about
+is of no use once it lands. Creates queued by earlier versions are dropped
+when the outbox is loaded.
+
+The entries are persisted through a Home Assistant ``Store`` (or anything with
+``async_load`` and ``async_delay_save``), and the coordinator drains them with
+:class:`Backoff` between attempts.
+
+Kept free of Home Assistant imports so it can be unit tested on its own.
+"""
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+OUTBOX_STORAGE_VERSION = 1
+# Seconds changes are batched before they are written to disk. Home Assistant
+# flushes pending delayed saves on shutdown.
+OUTBOX_SAVE_DELAY = 1
+
+# Delay before the first retry after a failed drain, doubling up to the max.
+OUTBOX_RETRY_INITIAL = 30
+OUTBOX_RETRY_MAX = 30 * 60
+
+
+class Backoff:
+    """Exponential retry delay in seconds, reset after a success."""
+
+    def __init__(
+        self, initial: float = OUTBOX_RETRY_INITIAL, maximum: float = OUTBOX_RETRY_MAX
+    ) -> None:
+        self._initial = initial
+        self._maximum = maximum
+        self._next = initial
+
+    def next_delay(self) -> float:
+        """Return the delay to wait now and double the following one."""
+        delay = self._next
+        self._next = min(self._next * 2, self._maximum)
+        return delay
+
+    def reset(self) -> None:
+        self._next = self._initial
+
+
+class Outbox:
+    """Pending deletes for one entry, persisted on change."""
+
+    def __init__(self, store: Any = None) -> None:
+        self._store = store
+        self._deletes: Dict[str, Dict[str, Any]] = {}
+        # Called whenever something is queued, e.g. to schedule a drain.
+        self.listener: Optional[Callable[[], None]] = None
+
+    def __len__(self) -> int:
+        return len(self._deletes)
+
+    async def async_load(self) -> None:
+        """Restore the entries saved before the last shutdown."""
+        if self._store is None:
+            return
+        saved = await self._store.async_load() or {}
+        self._deletes = dict(saved.get("deletes", {}))
+        if "creates" in saved:
+            # Written by an earlier version, with the codes in plain text.
+            self._changed()
+
+    @property
+    def delete_ids(self) -> List[str]:
+        """Auth ids waiting to be deleted, oldest first."""
+        return list(self._deletes)
+
+    def add_deletes(self, auth_ids: Iterable[str], queued_at: str) -> None:
+        """Queue ``auth_ids`` for deletion; ids already queued are kept once."""
+        for auth_id in auth_ids:
+            self._deletes.setdefault(auth_id, {"queued_at": queued_at})
+        self._changed(queued=True)
+
+    def complete_deletes(self, auth_ids: Iterable[str]) -> None:
+        for auth_id in auth_ids:
+            self._deletes.pop(auth_id, None)
+        self._changed()
+
+    def _changed(self, queued: bool = False) -> None:
+        if self._store is not None:
+            self._store.async_delay_save(self._data_to_save, OUTBOX_SAVE_DELAY)
+        if queued and self.listener is not None:
+            self.listener()
+
+    def _data_to_save(self) -> Dict[str, Any]:
+        return {"deletes": self._deletes}
@@ -0,0 +1,107 @@
+"""Compact JSON payloads describing an entry's codes.
+
+The websocket API pushes these to the Lovelace cards instead of making them
+read the sensor's state and re-parse its attributes, and ``list_codes``
+answers the ``nuki_otp.list_codes`` action and websocket command from the
+coordinators' data. Dates are ISO-8601 strings so the payload can be sent as
+is.
+
+Kept free of Home Assistant imports so it can be unit tested on its own.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Any, Collection, Dict, List, Mapping, Optional
+
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+def entry_payload(
+    entry_id: str, lock: str, data: Optional[Mapping[str, Any]]
+) -> Dict[str, Any]:
+    """Describe the entry's current code (the one the sensor shows).
+
+    ``state`` is ``"active"`` while the entry has a code and ``"idle"``
+    otherwise. ``code`` is None when the secret is not known to this Home
+    Assistant instance. ``stale_since`` is set while the coordinator serves
+    data from before a failed poll.
+    """
+    current = data.get("current_code") if data else None
+    return {
+        "entry_id": entry_id,
+        "lock": lock,
+        "state": "active" if current is not None else "idle",
+        "name": current.name if current is not None else None,
+        "code": current.code if current is not None else None,
+        "created": _iso(current.creation_date) if current is not None else None,
+        "expiry": _iso(current.expiry) if current is not None else None,
+        "stale_since": _iso(data.get("stale_since")) if data else None,
+    }
+
+
+def code_payload(
+    entry_id: str, lock: str, auth: Any, stale_since: Optional[datetime] = None
+) -> Dict[str, Any]:
+    """Describe one active code of an entry, with its usage."""
+    return {
+        "entry_id": entry_id,
+        "lock": lock,
+        "id": auth.id,
+        "name": auth.name,
+        "code": auth.code,
+        "enabled": auth.enabled,
+        "remote_allowed": auth.remote_allowed,
+        "lock_count": auth.lock_count,
+        "created": _iso(auth.creation_date),
+        "expiry": _iso(auth.expiry),
+        "stale_since": _iso(stale_since),
+    }
+
+
+def list_codes(
+    loaded: Mapping[str, Mapping[str, Any]],
+    now: datetime,
+    *,
+    entry_ids: Optional[Collection[str]] = None,
+    locks: Optional[Collection[str]] = None,
+    name_prefix: Optional[str] = None,
+    expires_after: Optional[datetime] = None,
+    expires_before: Optional[datetime] = None,
+    expires_within: Optional[timedelta] = None,
+) -> List[Dict[str, Any]]:
+    """Return the active codes of every loaded entry, soonest expiry first.
+
+    ``loaded`` is ``hass.data[DOMAIN]``. Only the coordinators' last data is
+    read, so this never calls the API. Each filter that is given narrows the
+    result: ``entry_ids`` and ``locks`` (lock names, case-insensitive) select
+    entries, ``name_prefix`` matches the start of the auth name, and the
+    ``expires_*`` bounds select codes expiring in that window.
+    """
+    if expires_within is not None:
+        limit = now + expires_within
+        expires_before = limit if expires_before is None else min(expires_before, limit)
+    wanted_locks = {lock.casefold() for lock in locks} if locks is not None else None
+
+    codes = []
+    for entry_id, entry in loaded.items():
+        lock = entry["config"].nuki_name
+        if entry_ids is not None and entry_id not in entry_ids:
+            continue
+        if wanted_locks is not None and lock.casefold() not in wanted_locks:
+            continue
+        data = entry["coordinator"].data or {}
+        for auth in data.get("auth_codes", ()):
+            if auth.is_expired(now):
+                continue
+            if name_prefix is not None and not auth.name.startswith(name_prefix):
+                continue
+            if expires_after is not None and auth.expiry <= expires_after:
+                continue
+            if expires_before is not None and auth.expiry > expires_before:
+                continue
+            payload = code_payload(entry_id, lock, auth, data.get("stale_since"))
+            codes.append((auth.expiry, payload))
+    codes.sort(key=lambda item: item[0])
+    return [payload for _, payload in codes]
@@ -1,19 +1,23 @@
 """Nuki OTP Sensor implementation."""
 import logging
-from datetime import timedelta
-from typing import Any, Dict
-
-from homeassistant.components.sensor import SensorEntity
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorStateClass,
+)
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory, UnitOfTime
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
-from homeassistant.util import dt as dt_util
 
 from .const import DOMAIN, NO_CODE
 from .coordinator import NukiOTPDataCoordinator
-from .helpers import NukiConfig
+from .helpers import AuthCode, NukiConfig
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -45,9 +49,9 @@ class NukiOTPSensor(CoordinatorEntity, SensorEntity):
         if not self.coordinator.data:
             return NO_CODE
 
-        current_code = self.coordinator.data.get("current_code")
-        if current_code and isinstance(current_code, dict):
-            return str(current_code.get("code", NO_CODE))
+        current_code: Optional[AuthCode] = self.coordinator.data.get("current_code")
+        if current_code is not None and current_code.code:
+            return current_code.code
         return NO_CODE
 
     @property
@@ -56,42 +60,75 @@ class NukiOTPSensor(CoordinatorEntity, SensorEntity):
         if not self.coordinator.data:
             return {}
 
-        current_code = self.coordinator.data.get("current_code")
-        if not current_code or not isinstance(current_code, dict):
-            return {"status": "No active code"}
-
-        try:
-            creation_date = current_code.get("creationDate", "")
-            expiry_date = self._calculate_expiry_date(creation_date)
-
-            return {
-                "name": current_code.get("name", ""),
-                "enabled": current_code.get("enabled", False),
-                "remote_allowed": current_code.get("remoteAllowed", False),
-                "lock_count": current_code.get("lockCount", 0),
-                "creation_date": creation_date,
-                "expiry_date": expiry_date,
+        current_code: Optional[AuthCode] = self.coordinator.data.get("current_code")
+        if current_code is None:
+            attributes = {"status": "No active code"}
+        else:
+            # Dates were parsed once when the API response was read.
+            creation_date = current_code.creation_date
+            expiry = current_code.expiry
+            attributes = {
+                "name": current_code.name,
+                "enabled": current_code.enabled,
+                "remote_allowed": current_code.remote_allowed,
+                "lock_count": current_code.lock_count,
+                "creation_date": creation_date.isoformat() if creation_date else "",
+                "expiry_date": expiry.isoformat() if expiry else "Unknown",
                 "status": "Active",
             }
-        except Exception as err:
-            _LOGGER.warning("Error building attributes: %s", err)
-            return {"status": "Error"}
-
-    def _calculate_expiry_date(self, creation_date: str) -> str:
-        """Calculate expiry date from creation date."""
-        try:
-            # Handle timezone suffix
-            if creation_date.endswith("Z"):
-                creation_date = creation_date[:-1] + "+00:00"
-
-            utc_time = dt_util.parse_datetime(creation_date)
-            if utc_time is None:
-                return "Unknown"
-            expiry_time = utc_time + timedelta(hours=self.config.otp_lifetime_hours)
-            return expiry_time.isoformat()
-        except (ValueError, TypeError) as err:
-            _LOGGER.warning("Error calculating expiry date: %s", err)
-            return "Unknown"
+        # Only present while polls fail and the last good data is shown; a
+        # timestamp rather than an age, so it does not change on every poll.
+        stale_since: Optional[datetime] = self.coordinator.data.get("stale_since")
+        if stale_since is not None:
+            attributes["stale_since"] = stale_since.isoformat()
+        return attributes
+
+
+class NukiOTPLatencySensor(CoordinatorEntity, SensorEntity):
+    """Tap-to-visible latency of new codes over the recent window.
+
+    One sensor per statistic (p50, p95, max). The coordinator records a
+    measurement right before it notifies its entities, so these update in the
+    same pass that shows the new code.
+    """
+
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_native_unit_of_measurement = UnitOfTime.SECONDS
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_suggested_display_precision = 2
+
+    def __init__(
+        self,
+        coordinator: NukiOTPDataCoordinator,
+        config: NukiConfig,
+        entry_id: str,
+        statistic: str,
+    ) -> None:
+        """Initialize the sensor for ``statistic`` ("p50", "p95" or "max")."""
+        super().__init__(coordinator)
+        self._statistic = statistic
+        self._attr_unique_id = f"{entry_id}_code_latency_{statistic}"
+        self._attr_name = f"Nuki OTP Code Latency {statistic}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, entry_id)},
+            name=f"Nuki OTP - {config.nuki_name}",
+            manufacturer="Nuki",
+            model="OTP Generator",
+        )
+
+    @property
+    def native_value(self) -> Optional[float]:
+        """Return the statistic, or None before the first measurement."""
+        return getattr(self.coordinator.latency, self._statistic)
+
+    @property
+    def extra_state_attributes(self) -> Dict[str, Any]:
+        """Return the sample count and SLO the statistic is judged against."""
+        return {
+            "samples": len(self.coordinator.latency),
+            "slo_seconds": self.coordinator.latency_slo,
+        }
 
 
 async def async_setup_entry(
@@ -104,4 +141,10 @@ async def async_setup_entry(
     coordinator = integration_data["coordinator"]
     config = integration_data["config"]
 
-    async_add_entities([NukiOTPSensor(coordinator, config, entry.entry_id)])
+    async_add_entities([
+        NukiOTPSensor(coordinator, config, entry.entry_id),
+        *(
+            NukiOTPLatencySensor(coordinator, config, entry.entry_id, statistic)
+            for statistic in ("p50", "p95", "max")
+        ),
+    ])
@@ -0,0 +1,180 @@
+"""Services for the Nuki OTP integration.
+
+``nuki_otp.generate_code`` creates a keypad code and returns it, with its
+expiry, in the service response. An automation that sends codes to guests
+makes one call instead of toggling the switch and then waiting for the sensor
+to pick the code up on the next refresh.
+
+``nuki_otp.list_codes`` returns every active code of every entry, with its
+lock, expiry and usage, from the coordinators' data. Front-desk tooling reads
+all codes in one call, without a cloud round trip and without iterating the
+sensors (which only show each entry's newest code).
+"""
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict, List
+
+import voluptuous as vol
+
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .helpers import WEEKDAY_BITS, NukiDeadlineExceeded
+from .payloads import list_codes
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_GENERATE_CODE = "generate_code"
+SERVICE_LIST_CODES = "list_codes"
+
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_LIFETIME_HOURS = "lifetime_hours"
+ATTR_NAME_SUFFIX = "name_suffix"
+ATTR_WEEKDAYS = "weekdays"
+ATTR_ALLOWED_FROM = "allowed_from"
+ATTR_ALLOWED_UNTIL = "allowed_until"
+ATTR_LOCK = "lock"
+ATTR_NAME_PREFIX = "name_prefix"
+ATTR_EXPIRES_AFTER = "expires_after"
+ATTR_EXPIRES_BEFORE = "expires_before"
+ATTR_EXPIRES_WITHIN = "expires_within"
+
+GENERATE_CODE_SCHEMA = vol.Schema({
+    vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+    vol.Optional(ATTR_LIFETIME_HOURS): vol.All(
+        vol.Coerce(int), vol.Range(min=1, max=168)  # 1 hour to 1 week
+    ),
+    # Appended to "<otp_username>_code" so guests' codes are told apart in the
+    # Nuki app; kept short because keypad auth names are limited in length.
+    vol.Optional(ATTR_NAME_SUFFIX): vol.All(cv.string, vol.Length(min=1, max=12)),
+    vol.Optional(ATTR_WEEKDAYS): vol.All(cv.ensure_list, [vol.In(WEEKDAY_BITS)]),
+    vol.Optional(ATTR_ALLOWED_FROM): cv.time,
+    vol.Optional(ATTR_ALLOWED_UNTIL): cv.time,
+})
+
+# Shared by the action and the nuki_otp/list_codes websocket command.
+LIST_CODES_FIELDS = {
+    vol.Optional(ATTR_CONFIG_ENTRY_ID): vol.All(cv.ensure_list, [cv.string]),
+    vol.Optional(ATTR_LOCK): vol.All(cv.ensure_list, [cv.string]),
+    vol.Optional(ATTR_NAME_PREFIX): cv.string,
+    vol.Optional(ATTR_EXPIRES_AFTER): cv.datetime,
+    vol.Optional(ATTR_EXPIRES_BEFORE): cv.datetime,
+    vol.Optional(ATTR_EXPIRES_WITHIN): cv.positive_time_period,
+}
+LIST_CODES_SCHEMA = vol.Schema(LIST_CODES_FIELDS)
+
+
+def _entry_data(hass: HomeAssistant, call: ServiceCall) -> Dict[str, Any]:
+    """Return hass.data for the targeted entry (the only one if omitted)."""
+    loaded = hass.data.get(DOMAIN, {})
+    entry_id = call.data.get(ATTR_CONFIG_ENTRY_ID)
+    if entry_id is None:
+        if len(loaded) != 1:
+            raise ServiceValidationError(
+                "config_entry_id is required when more than one Nuki OTP "
+                "entry is set up"
+            )
+        entry_id = next(iter(loaded))
+    if entry_id not in loaded:
+        raise ServiceValidationError(f"No loaded Nuki OTP entry {entry_id}")
+    return loaded[entry_id]
+
+
+async def _async_generate_code(call: ServiceCall) -> ServiceResponse:
+    """Create a code and return it with its validity window."""
+    hass = call.hass
+    allowed_from = call.data.get(ATTR_ALLOWED_FROM)
+    allowed_until = call.data.get(ATTR_ALLOWED_UNTIL)
+    if (
+        allowed_from is not None
+        and allowed_until is not None
+        and allowed_from >= allowed_until
+    ):
+        raise ServiceValidationError("allowed_from must be before allowed_until")
+
+    data = _entry_data(hass, call)
+    api_client = data["api_client"]
+    # Queued behind any switch toggle on the same lock, so a "turn off" that
+    # deletes the entry's codes cannot interleave with this create. The time
+    # budget starts when the create does, not while it waits in the queue.
+    try:
+        issued = await data["coordinator"].operations.submit(
+            lambda: api_client.create_auth_code(
+                lifetime_hours=call.data.get(ATTR_LIFETIME_HOURS),
+                name_suffix=call.data.get(ATTR_NAME_SUFFIX),
+                weekdays=call.data.get(ATTR_WEEKDAYS),
+                allowed_from=allowed_from,
+                allowed_until=allowed_until,
+                deadline=api_client.operation_deadline(),
+            )
+        )
+    except NukiDeadlineExceeded as err:
+        raise HomeAssistantError(f"Creating the OTP code timed out: {err}") from err
+    if issued is None:
+        raise HomeAssistantError("Failed to create the OTP code on the lock")
+
+    # The caller already has the code; refresh the entities in the background
+    # rather than making the response wait for another round trip.
+    hass.async_create_task(data["coordinator"].async_request_refresh())
+    return {
+        "code": issued.code,
+        "name": issued.name,
+        "valid_from": issued.valid_from.isoformat(),
+        "expiry": issued.expiry.isoformat(),
+    }
+
+
+@callback
+def async_list_codes(
+    hass: HomeAssistant, params: Dict[str, Any]
+) -> List[Dict[str, Any]]:
+    """Return the active codes matching validated ``LIST_CODES_FIELDS``."""
+    # Naive datetimes are in Home Assistant's time zone; expiries are UTC.
+    bounds = {
+        key: dt_util.as_utc(params[key])
+        for key in (ATTR_EXPIRES_AFTER, ATTR_EXPIRES_BEFORE)
+        if key in params
+    }
+    return list_codes(
+        hass.data.get(DOMAIN, {}),
+        dt_util.utcnow(),
+        entry_ids=params.get(ATTR_CONFIG_ENTRY_ID),
+        locks=params.get(ATTR_LOCK),
+        name_prefix=params.get(ATTR_NAME_PREFIX),
+        expires_after=bounds.get(ATTR_EXPIRES_AFTER),
+        expires_before=bounds.get(ATTR_EXPIRES_BEFORE),
+        expires_within=params.get(ATTR_EXPIRES_WITHIN),
+    )
+
+
+async def _async_list_codes(call: ServiceCall) -> ServiceResponse:
+    """Return every active code across the loaded entries."""
+    return {"codes": async_list_codes(call.hass, call.data)}
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration's services (once per Home Assistant)."""
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GENERATE_CODE,
+        _async_generate_code,
+        schema=GENERATE_CODE_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_LIST_CODES,
+        _async_list_codes,
+        schema=LIST_CODES_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
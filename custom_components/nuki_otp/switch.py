@@ -5,13 +5,14 @@ from typing import Optional
 from homeassistant.components.switch import SwitchEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN
 from .coordinator import NukiOTPDataCoordinator
-from .helpers import NukiAPIClient
+from .helpers import NukiAPIClient, NukiDeadlineExceeded
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -43,7 +44,8 @@ class NukiOTPSwitch(CoordinatorEntity, SwitchEntity):
         # to the pre-press state mid-operation (off→on flicker on turn-on),
         # then jump again once the next refresh lands. We assume the requested
         # state immediately and clear the override once the coordinator
-        # delivers data that confirms it.
+        # delivers data that confirms it, or at the latest once the press's
+        # operation (which ends with a refresh) has finished.
         self._optimistic_state: Optional[bool] = None
 
     @property
@@ -85,44 +87,93 @@ class NukiOTPSwitch(CoordinatorEntity, SwitchEntity):
         # generation round trip is in progress.
         self._optimistic_state = True
         self.async_write_ha_state()
+        # Tap-to-visible latency is measured from the press, including any
+        # wait in the queue, until the coordinator publishes the new code.
+        self.coordinator.async_mark_code_requested()
+        # A double tap joins the generation already running instead of
+        # replacing its code a second later; see operations.py.
+        await self._async_submit(self._async_generate, "on")
+
+    async def async_turn_off(self, **kwargs) -> None:
+        """Turn the switch off - delete OTP codes."""
+        # Assume off immediately for a smooth toggle while deletion runs.
+        self._optimistic_state = False
+        self.async_write_ha_state()
+        await self._async_submit(self._async_revoke, "off")
+
+    async def _async_submit(self, operation, intent: str) -> None:
+        """Queue ``operation``, then drop the override it was pressed with.
+
+        The coordinator only calls listeners when a refresh changes its data,
+        so a press that leaves the data as it was (turning off with no code)
+        would otherwise keep the override, and ``assumed_state``, forever.
+        """
+        assumed = self._optimistic_state
+        try:
+            await self.coordinator.operations.submit(operation, intent=intent)
+        finally:
+            # A later press that assumed the other state clears its own.
+            if assumed is not None and self._optimistic_state == assumed:
+                self._optimistic_state = None
+                self.async_write_ha_state()
+
+    async def _async_generate(self) -> None:
+        """Replace the lock's codes with a new one (queued as intent "on")."""
+        # One time budget for every request of this press, retries included.
+        deadline = self.api_client.operation_deadline()
         try:
             # Delete existing codes first
-            auth_codes = await self.api_client.get_auth_codes()
+            auth_codes = await self.api_client.get_auth_codes(deadline=deadline)
             if auth_codes:
-                await self.api_client.delete_auth_codes(auth_codes)
+                await self.api_client.delete_auth_codes(auth_codes, deadline=deadline)
 
             # Create new code
-            success = await self.api_client.create_auth_code()
+            success = await self.api_client.create_auth_code(deadline=deadline)
             if success:
-                await self.coordinator.async_request_refresh()
+                # Not debounced: the data must be current when the press ends
+                # and the optimistic state is dropped.
+                await self.coordinator.async_refresh()
             else:
                 _LOGGER.error("Failed to create OTP code")
                 # Generation failed: drop the optimistic state so the UI
                 # reflects reality rather than a stuck "on".
+                self.coordinator.async_cancel_code_request()
                 self._optimistic_state = None
                 self.async_write_ha_state()
+        except NukiDeadlineExceeded as err:
+            self.coordinator.async_cancel_code_request()
+            self._optimistic_state = None
+            self.async_write_ha_state()
+            raise HomeAssistantError(
+                f"Generating the OTP code timed out: {err}"
+            ) from err
         except Exception as err:
             _LOGGER.exception("Error turning on OTP switch: %s", err)
+            self.coordinator.async_cancel_code_request()
             self._optimistic_state = None
             self.async_write_ha_state()
 
-    async def async_turn_off(self, **kwargs) -> None:
-        """Turn the switch off - delete OTP codes."""
-        # Assume off immediately for a smooth toggle while deletion runs.
-        self._optimistic_state = False
-        self.async_write_ha_state()
+    async def _async_revoke(self) -> None:
+        """Delete the lock's codes (queued as intent "off")."""
+        deadline = self.api_client.operation_deadline()
         try:
-            auth_codes = await self.api_client.get_auth_codes()
+            auth_codes = await self.api_client.get_auth_codes(deadline=deadline)
             if auth_codes:
-                await self.api_client.delete_auth_codes(auth_codes)
+                # Queued for later if the budget runs out before it is sent.
+                await self.api_client.delete_auth_codes(auth_codes, deadline=deadline)
 
-            await self.coordinator.async_request_refresh()
+            await self.coordinator.async_refresh()
+        except NukiDeadlineExceeded as err:
+            self._optimistic_state = None
+            self.async_write_ha_state()
+            raise HomeAssistantError(
+                f"Revoking the OTP codes timed out: {err}"
+            ) from err
         except Exception as err:
             _LOGGER.exception("Error turning off OTP switch: %s", err)
             self._optimistic_state = None
             self.async_write_ha_state()
 
-
 async def async_setup_entry(
     hass: HomeAssistant,
     entry: ConfigEntry,
@@ -0,0 +1,131 @@
+"""Usage watcher: revoke one-time codes as soon as they are used.
+
+Instead of asking the log endpoint about every outstanding code (one request
+per code, hourly), the watcher reads only the lock log entries that appeared
+since its cursor, one small request per lock per cycle, and matches the
+``authId`` of each unlock against the set of active auth ids. A used code is
+revoked within one cycle of its first use.
+
+The cursor only ever holds a date the server wrote into the log, never Home
+Assistant's clock, so a skew between the two cannot hide an entry.
+"""
+from __future__ import annotations
+
+import logging
+from datetime import timedelta
+from typing import Dict, List, Optional, Set
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+
+from .coordinator import NukiOTPDataCoordinator
+from .helpers import LOG_ACTION_UNLOCK, NukiAPIError, NukiAuthError
+
+_LOGGER = logging.getLogger(__name__)
+
+# How often the lock log is checked while at least one code is active. With no
+# active code the watcher makes no requests at all.
+USAGE_WATCH_INTERVAL = timedelta(seconds=15)
+
+
+class LogCursor:
+    """Tracks the newest log entry seen so each entry is handled once.
+
+    The Web API's ``fromDate`` filter is inclusive, so entries dated exactly at
+    the cursor come back on the next query; their ids are remembered and
+    skipped. Without a date yet, the next query reads the latest page of the
+    log, and the cursor starts at the newest date in it.
+    """
+
+    def __init__(self, since: Optional[str] = None) -> None:
+        self.since = since
+        self._seen_at_cursor: Set[str] = set()
+
+    def reset(self, since: Optional[str] = None) -> None:
+        """Move the cursor to ``since`` and forget what was seen before."""
+        self.since = since
+        self._seen_at_cursor = set()
+
+    def advance(self, entries: List[Dict]) -> List[Dict]:
+        """Return the entries not seen before and move the cursor past them."""
+        fresh = [
+            entry for entry in entries
+            if entry.get("id") not in self._seen_at_cursor
+            and (self.since is None or entry.get("date", "") >= self.since)
+        ]
+        if fresh:
+            # Dates share one ISO-8601 format, so they order as strings.
+            newest = max(entry.get("date", "") for entry in fresh)
+            if newest != self.since:
+                self.since = newest
+                self._seen_at_cursor = set()
+            self._seen_at_cursor.update(
+                entry.get("id") for entry in fresh if entry.get("date") == newest
+            )
+        return fresh
+
+
+class UsageWatcher:
+    """Polls the lock log delta and revokes codes on first use."""
+
+    def __init__(
+        self, hass: HomeAssistant, coordinator: NukiOTPDataCoordinator
+    ) -> None:
+        self.hass = hass
+        self.coordinator = coordinator
+        self._cursor = LogCursor()
+        # The interval timer does not wait for the previous run to finish.
+        self._polling = False
+
+    @callback
+    def async_start(self) -> CALLBACK_TYPE:
+        """Start watching; returns the unsubscribe callback."""
+        self._cursor.reset()
+        return async_track_time_interval(
+            self.hass, self._async_poll, USAGE_WATCH_INTERVAL
+        )
+
+    async def _async_poll(self, _now=None) -> None:
+        """Run one check, unless the previous one is still running."""
+        if self._polling:
+            _LOGGER.debug("Usage watch still running, skipping this cycle")
+            return
+        self._polling = True
+        try:
+            await self._async_check()
+        finally:
+            self._polling = False
+
+    async def _async_check(self) -> None:
+        """Fetch new log entries and revoke any active code they mention."""
+        data = self.coordinator.data
+        active = {auth.id: auth for auth in data["auth_codes"]} if data else {}
+        if not active:
+            # Nothing can be used; skip the request. Auth ids are never
+            # reused, so the next code can safely be matched against the
+            # latest page of the log, which also re-seeds the cursor.
+            self._cursor.reset()
+            return
+
+        try:
+            entries = await self.coordinator.api_client.get_log_delta(
+                self._cursor.since
+            )
+        except NukiAuthError:
+            # The read poll owns reauth; just wait for new credentials.
+            _LOGGER.debug("Usage watch skipped: API authentication failed")
+            return
+        except NukiAPIError as err:
+            _LOGGER.debug("Usage watch failed, retrying next cycle: %s", err)
+            return
+
+        used = {
+            entry.get("authId")
+            for entry in self._cursor.advance(entries)
+            if entry.get("action") == LOG_ACTION_UNLOCK
+        } & active.keys()
+        if used:
+            _LOGGER.info("Revoking %d used OTP code(s)", len(used))
+            await self.coordinator.async_evict_codes(
+                [active[auth_id] for auth_id in used]
+            )
@@ -0,0 +1,217 @@
+"""Websocket commands for the Nuki OTP Lovelace cards.
+
+``nuki_otp/subscribe`` pushes an entry's current code (see
+:func:`.payloads.entry_payload`) right away and then again whenever it
+changes. The card no longer depends on the state-machine broadcast for its
+entity, and it gets the expiry as a timestamp instead of parsing sensor
+attributes.
+
+When the entry is unloaded (a reload or reauth included) its coordinator is
+dropped, so the subscription sends ``{"entry_id": ..., "ended": true}`` and
+goes quiet; the card falls back to the entity's state and subscribes again.
+The target may also be a Nuki OTP entity whose entry is not loaded yet, which
+is answered with ``not_found``; other entities get ``not_supported``.
+
+``nuki_otp/subscribe_entries`` does the same for every loaded entry at once,
+for the fleet card: one message with all entries, then one per change. It
+follows entries through reloads: an unloaded entry is sent in ``removed`` and
+an entry set up later is sent like a change.
+
+``nuki_otp/list_codes`` is the websocket twin of the ``nuki_otp.list_codes``
+action: it answers once with every active code that matches its filters.
+"""
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List, Optional
+
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+
+from .const import DOMAIN, SIGNAL_ENTRY_LOADED, SIGNAL_ENTRY_UNLOADED
+from .payloads import entry_payload
+from .services import LIST_CODES_FIELDS, async_list_codes
+
+
+def _resolve_entry_id(hass: HomeAssistant, msg: Dict[str, Any]) -> Optional[str]:
+    """Return the id of the entry targeted by ``msg``, or None if not ours."""
+    entry_id = msg.get("entry_id")
+    if entry_id is None and (entity_id := msg.get("entity_id")) is not None:
+        entity = er.async_get(hass).async_get(entity_id)
+        if entity is None or entity.platform != DOMAIN:
+            return None
+        entry_id = entity.config_entry_id
+    return entry_id
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "nuki_otp/subscribe",
+        vol.Exclusive("entity_id", "target"): cv.entity_id,
+        vol.Exclusive("entry_id", "target"): cv.string,
+    }
+)
+@callback
+def ws_subscribe(
+    hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: Dict[str, Any]
+) -> None:
+    """Push an entry's code now and whenever it changes, until it unloads."""
+    entry_id = _resolve_entry_id(hass, msg)
+    if entry_id is None:
+        connection.send_error(
+            msg["id"], websocket_api.ERR_NOT_SUPPORTED, "Not a Nuki OTP entity"
+        )
+        return
+    data = hass.data.get(DOMAIN, {}).get(entry_id)
+    if data is None:
+        connection.send_error(
+            msg["id"], websocket_api.ERR_NOT_FOUND, "No loaded Nuki OTP entry found"
+        )
+        return
+    coordinator = data["coordinator"]
+    lock = data["config"].nuki_name
+    last: Optional[Dict[str, Any]] = None
+
+    @callback
+    def _forward() -> None:
+        nonlocal last
+        payload = entry_payload(entry_id, lock, coordinator.data)
+        # The coordinator also notifies for changes that do not touch the
+        # current code (other codes, latency); send only real changes.
+        if payload != last:
+            last = payload
+            connection.send_message(websocket_api.event_message(msg["id"], payload))
+
+    unsubs: List[Callable[[], None]] = [coordinator.async_add_listener(_forward)]
+
+    @callback
+    def _unsubscribe() -> None:
+        while unsubs:
+            unsubs.pop()()
+
+    @callback
+    def _unloaded(unloaded_id: str) -> None:
+        if unloaded_id != entry_id:
+            return
+        # Stays registered so the card's unsubscribe still succeeds.
+        _unsubscribe()
+        connection.send_message(
+            websocket_api.event_message(
+                msg["id"], {"entry_id": entry_id, "ended": True}
+            )
+        )
+
+    unsubs.append(async_dispatcher_connect(hass, SIGNAL_ENTRY_UNLOADED, _unloaded))
+    connection.subscriptions[msg["id"]] = _unsubscribe
+    connection.send_result(msg["id"])
+    _forward()
+
+
+@websocket_api.websocket_command({vol.Required("type"): "nuki_otp/subscribe_entries"})
+@callback
+def ws_subscribe_entries(
+    hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: Dict[str, Any]
+) -> None:
+    """Push every loaded entry's code now, then each entry when it changes.
+
+    Each payload also carries the entry's OTP switch (``switch``), which the
+    fleet card turns on or off to generate or revoke a code. Entries set up
+    or unloaded while the subscription runs are added or sent as removed.
+    """
+    registry = er.async_get(hass)
+    last: Dict[str, Dict[str, Any]] = {}
+    listeners: Dict[str, Callable[[], None]] = {}
+
+    def _payload(entry_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            **entry_payload(
+                entry_id, data["config"].nuki_name, data["coordinator"].data
+            ),
+            "switch": registry.async_get_entity_id(
+                "switch", DOMAIN, f"{entry_id}_otp_switch"
+            ),
+        }
+
+    def _listener(entry_id: str, data: Dict[str, Any]) -> Callable[[], None]:
+        @callback
+        def _forward() -> None:
+            payload = _payload(entry_id, data)
+            if payload != last.get(entry_id):
+                last[entry_id] = payload
+                connection.send_message(
+                    websocket_api.event_message(msg["id"], {"entries": [payload]})
+                )
+
+        return _forward
+
+    def _attach(entry_id: str, data: Dict[str, Any]) -> None:
+        last[entry_id] = _payload(entry_id, data)
+        listeners[entry_id] = data["coordinator"].async_add_listener(
+            _listener(entry_id, data)
+        )
+
+    for entry_id, data in hass.data.get(DOMAIN, {}).items():
+        _attach(entry_id, data)
+
+    @callback
+    def _loaded(entry_id: str) -> None:
+        data = hass.data.get(DOMAIN, {}).get(entry_id)
+        if data is None or entry_id in listeners:
+            return
+        _attach(entry_id, data)
+        connection.send_message(
+            websocket_api.event_message(msg["id"], {"entries": [last[entry_id]]})
+        )
+
+    @callback
+    def _unloaded(entry_id: str) -> None:
+        if (unsub := listeners.pop(entry_id, None)) is None:
+            return
+        unsub()
+        last.pop(entry_id, None)
+        connection.send_message(
+            websocket_api.event_message(
+                msg["id"], {"entries": [], "removed": [entry_id]}
+            )
+        )
+
+    signals = [
+        async_dispatcher_connect(hass, SIGNAL_ENTRY_LOADED, _loaded),
+        async_dispatcher_connect(hass, SIGNAL_ENTRY_UNLOADED, _unloaded),
+    ]
+
+    @callback
+    def _unsubscribe() -> None:
+        for unsub in [*listeners.values(), *signals]:
+            unsub()
+        listeners.clear()
+        signals.clear()
+
+    connection.subscriptions[msg["id"]] = _unsubscribe
+    connection.send_result(msg["id"])
+    connection.send_message(
+        websocket_api.event_message(msg["id"], {"entries": list(last.values())})
+    )
+
+
+@websocket_api.websocket_command(
+    {vol.Required("type"): "nuki_otp/list_codes", **LIST_CODES_FIELDS}
+)
+@callback
+def ws_list_codes(
+    hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: Dict[str, Any]
+) -> None:
+    """Answer with every active code across the loaded entries."""
+    connection.send_result(msg["id"], {"codes": async_list_codes(hass, msg)})
+
+
+@callback
+def async_register_websocket_commands(hass: HomeAssistant) -> None:
+    """Register the integration's websocket commands."""
+    websocket_api.async_register_command(hass, ws_subscribe)
+    websocket_api.async_register_command(hass, ws_subscribe_entries)
+    websocket_api.async_register_command(hass, ws_list_codes)
@@ -5,6 +5,11 @@
  *
  * Two sources are supported:
  *   1. `entity`  — read the current code from an existing Home Assistant entity.
+ *                  If the entity has an `expiry_date` attribute (as the Nuki
+ *                  OTP sensor does), the countdown runs to that expiry. For
+ *                  Nuki OTP entities the card subscribes to
+ *                  `nuki_otp/subscribe` and is pushed the code and expiry
+ *                  only when they change.
  *   2. `secret`  — generate RFC-6238 TOTP codes in the browser via Web Crypto.
  *
  * Zero dependencies, no build step. Drop the file in `config/www/` and add it
@@ -13,6 +18,10 @@
 
 const VERSION = "1.0.0";
 
+// Wait before subscribing again after a Nuki OTP entry unloaded (a reload or
+// reauth), or while it is not loaded yet. The entity's state is shown meanwhile.
+const LIVE_RETRY_MS = 5000;
+
 /* ------------------------------------------------------------------ *
  *  Base32 + TOTP (RFC 4648 / RFC 6238) — runs entirely client-side.  *
  * ------------------------------------------------------------------ */
@@ -41,14 +50,54 @@ function base32Decode(input) {
   return new Uint8Array(out);
 }
 
+// Imported HMAC keys, keyed by algorithm + secret. importKey is comparatively
+// expensive and the key never changes for a given secret.
+const _cryptoKeys = new Map();
+
+// TOTP results keyed by (secret, period, counter, digits, algorithm), shared by
+// every card on the page, so N cards showing the same secret do one HMAC per
+// time-step. Entries for past time-steps are dropped as the counter advances.
+const _totpCodes = new Map();
+
+function importHmacKey(secret, algorithm) {
+  const id = `${algorithm}|${secret}`;
+  let key = _cryptoKeys.get(id);
+  if (!key) {
+    key = crypto.subtle.importKey(
+      "raw",
+      base32Decode(secret),
+      { name: "HMAC", hash: { name: algorithm } },
+      false,
+      ["sign"]
+    );
+    // Do not cache a failure (e.g. a bad secret being edited in the editor).
+    key.catch(() => _cryptoKeys.delete(id));
+    _cryptoKeys.set(id, key);
+  }
+  return key;
+}
+
 /**
- * Generate an RFC-6238 TOTP code.
+ * Generate an RFC-6238 TOTP code (memoized per time-step).
  * @returns {Promise<string>} zero-padded code of `digits` length.
  */
-async function generateTotp(secret, { digits = 6, period = 30, algorithm = "SHA-1" } = {}) {
-  const key = base32Decode(secret);
+function generateTotp(secret, { digits = 6, period = 30, algorithm = "SHA-1" } = {}) {
   const counter = Math.floor(Date.now() / 1000 / period);
+  const id = `${secret}|${period}|${counter}|${digits}|${algorithm}`;
+  let code = _totpCodes.get(id);
+  if (!code) {
+    for (const [key, entry] of _totpCodes) {
+      if (entry.counter < counter - 1) _totpCodes.delete(key);
+    }
+    code = computeTotp(secret, counter, digits, algorithm);
+    code.counter = counter;
+    code.catch(() => _totpCodes.delete(id));
+    _totpCodes.set(id, code);
+  }
+  return code;
+}
 
+async function computeTotp(secret, counter, digits, algorithm) {
   // 8-byte big-endian counter.
   const counterBytes = new Uint8Array(8);
   let temp = counter;
@@ -57,13 +106,7 @@ async function generateTotp(secret, { digits = 6, period = 30, algorithm = "SHA-
     temp = Math.floor(temp / 256);
   }
 
-  const cryptoKey = await crypto.subtle.importKey(
-    "raw",
-    key,
-    { name: "HMAC", hash: { name: algorithm } },
-    false,
-    ["sign"]
-  );
+  const cryptoKey = await importHmacKey(secret, algorithm);
   const sig = new Uint8Array(await crypto.subtle.sign("HMAC", cryptoKey, counterBytes));
 
   // Dynamic truncation.
@@ -78,6 +121,48 @@ async function generateTotp(secret, { digits = 6, period = 30, algorithm = "SHA-
   return code;
 }
 
+/* ------------------------------------------------------------------ *
+ *  Shared ticker — one timer for every card on the page.              *
+ * ------------------------------------------------------------------ */
+
+/**
+ * Calls every subscriber once per second, on the second boundary, from a
+ * single timeout. Runs only while at least one (visible) card is subscribed.
+ */
+const otpTicker = {
+  _subscribers: new Set(),
+  _timer: null,
+
+  subscribe(fn) {
+    this._subscribers.add(fn);
+    if (!this._timer) this._schedule();
+    return () => this.unsubscribe(fn);
+  },
+
+  unsubscribe(fn) {
+    this._subscribers.delete(fn);
+    if (this._subscribers.size === 0 && this._timer) {
+      clearTimeout(this._timer);
+      this._timer = null;
+    }
+  },
+
+  _schedule() {
+    this._timer = setTimeout(() => {
+      this._timer = null;
+      const now = Date.now();
+      for (const fn of this._subscribers) {
+        try {
+          fn(now);
+        } catch (err) {
+          console.error("ha-otp-card tick failed", err);
+        }
+      }
+      if (this._subscribers.size) this._schedule();
+    }, 1000 - (Date.now() % 1000));
+  },
+};
+
 /* ------------------------------------------------------------------ *
  *  The card element.                                                  *
  * ------------------------------------------------------------------ */
@@ -92,9 +177,30 @@ class HaOtpCard extends HTMLElement {
     this._error = "";
     this._revealed = true;
     this._copied = false;
-    this._timer = null;
+    this._unsubscribeTick = null;
+    this._onTick = () => this._tick();
     this._rendered = false;
     this._totpCounter = null;
+    this._stateObj = undefined;
+    // Entity mode: expiry / creation (ms since epoch) from the entity's
+    // attributes, or null to fall back to the TOTP-period countdown.
+    this._expiry = null;
+    this._created = null;
+    // Entity mode over the `nuki_otp/subscribe` websocket command: the last
+    // pushed payload, the pending unsubscribe promise and the entity it is
+    // for. Entities the command does not know fall back to hass.states, and
+    // so does an entity whose entry is reloading until `_liveRetryAt`.
+    this._live = null;
+    this._liveUnsub = null;
+    this._liveEntity = null;
+    this._liveUnsupported = new Set();
+    this._liveRetryAt = 0;
+    this._liveRetryTimer = null;
+    // Whether the card is on screen (IntersectionObserver); timers only run
+    // while it is, and while the page itself is visible.
+    this._intersecting = true;
+    this._observer = null;
+    this._onVisibilityChange = () => this._syncTimer();
   }
 
   /* ---- Lovelace lifecycle ---- */
@@ -115,24 +221,48 @@ class HaOtpCard extends HTMLElement {
     this._revealed = this._config.reveal_by_default !== false;
     this._rendered = false; // force a fresh DOM build
     this._totpCounter = null; // invalidate the cached code (secret may have changed)
-    this._startTimer();
+    this._stateObj = undefined; // entity may have changed
+    if (this._liveEntity !== this._config.entity) this._unsubscribeLive();
     this._refresh();
+    this._syncTimer();
   }
 
   set hass(hass) {
     this._hass = hass;
-    if (this._config && this._config.entity) this._refresh();
+    if (!this._config || !this._config.entity) return;
+    this._subscribeLive();
+    // Pushed payloads replace the state object as the source of truth.
+    if (this._live) return;
+    // HA calls this setter on every state change anywhere in the system, but
+    // replaces an entity's state object only when that entity's state or
+    // attributes change, so a reference check skips everything else.
+    const stateObj = hass.states[this._config.entity];
+    if (this._rendered && stateObj === this._stateObj) return;
+    this._stateObj = stateObj;
+    this._refresh().then(() => this._syncRing());
   }
 
   connectedCallback() {
-    this._startTimer();
+    document.addEventListener("visibilitychange", this._onVisibilityChange);
+    if (!this._observer && "IntersectionObserver" in window) {
+      this._observer = new IntersectionObserver((entries) => {
+        this._intersecting = entries[entries.length - 1].isIntersecting;
+        this._syncTimer();
+      });
+    }
+    if (this._observer) this._observer.observe(this);
+    this._subscribeLive();
+    this._syncTimer();
   }
 
   disconnectedCallback() {
-    if (this._timer) {
-      clearInterval(this._timer);
-      this._timer = null;
-    }
+    document.removeEventListener("visibilitychange", this._onVisibilityChange);
+    if (this._observer) this._observer.disconnect();
+    clearTimeout(this._liveRetryTimer);
+    this._liveRetryTimer = null;
+    this._liveRetryAt = 0;
+    this._unsubscribeLive();
+    this._stopTimer();
   }
 
   getCardSize() {
@@ -149,10 +279,121 @@ class HaOtpCard extends HTMLElement {
 
   /* ---- internals ---- */
 
-  _startTimer() {
-    if (this._timer) clearInterval(this._timer);
-    // Tick every 250ms so the ring animates smoothly and code rotation is prompt.
-    this._timer = setInterval(() => this._refresh(), 250);
+  /** Subscribe to pushed code updates for a Nuki OTP entity, once. */
+  _subscribeLive() {
+    const entity = this._config && this._config.entity;
+    const connection = this._hass && this._hass.connection;
+    if (
+      !entity ||
+      !connection ||
+      !this.isConnected ||
+      this._liveUnsub ||
+      this._liveUnsupported.has(entity) ||
+      Date.now() < this._liveRetryAt
+    ) {
+      return;
+    }
+    this._liveEntity = entity;
+    this._liveUnsub = connection
+      .subscribeMessage((payload) => this._onLive(payload), {
+        type: "nuki_otp/subscribe",
+        entity_id: entity,
+      })
+      .catch((err) => {
+        if (err && err.code === "not_found") {
+          // A Nuki OTP entity whose entry is not loaded (yet): try again.
+          this._scheduleLiveRetry();
+        } else {
+          // Not a Nuki OTP entity (or an older integration): use hass.states.
+          this._liveUnsupported.add(entity);
+        }
+        if (this._liveEntity === entity) this._resetLive();
+        this._fallBackToState();
+        return null;
+      });
+  }
+
+  _scheduleLiveRetry() {
+    this._liveRetryAt = Date.now() + LIVE_RETRY_MS;
+    clearTimeout(this._liveRetryTimer);
+    this._liveRetryTimer = setTimeout(() => {
+      this._liveRetryTimer = null;
+      this._liveRetryAt = 0;
+      this._subscribeLive();
+    }, LIVE_RETRY_MS);
+  }
+
+  /** Show the entity's state until pushed payloads resume. */
+  _fallBackToState() {
+    this._stateObj = undefined;
+    this._refresh().then(() => this._syncRing());
+  }
+
+  _unsubscribeLive() {
+    if (this._liveUnsub) {
+      this._liveUnsub.then((unsub) => unsub && unsub());
+    }
+    this._resetLive();
+  }
+
+  _resetLive() {
+    this._live = null;
+    this._liveUnsub = null;
+    this._liveEntity = null;
+  }
+
+  _onLive(payload) {
+    if (payload.ended) {
+      // The entry unloaded and its subscription went quiet: drop it, show
+      // the entity's state, and subscribe again once the entry is back.
+      this._unsubscribeLive();
+      this._scheduleLiveRetry();
+      this._fallBackToState();
+      return;
+    }
+    this._live = payload;
+    this._refresh().then(() => this._syncRing());
+  }
+
+  /** Run the countdown timer only while the card can actually be seen. */
+  _syncTimer() {
+    const visible =
+      this.isConnected &&
+      this._config &&
+      this._intersecting &&
+      document.visibilityState !== "hidden";
+    if (!visible) {
+      this._stopTimer();
+      return;
+    }
+    if (this._unsubscribeTick) return;
+    // Coming back into view: catch up on a missed rotation and resync the ring.
+    this._refresh();
+    this._syncRing();
+    this._unsubscribeTick = otpTicker.subscribe(this._onTick);
+  }
+
+  _stopTimer() {
+    if (this._unsubscribeTick) {
+      this._unsubscribeTick();
+      this._unsubscribeTick = null;
+    }
+  }
+
+  /**
+   * Called by the shared ticker once per second. The ring itself is a CSS
+   * animation, so the only per-tick work is the seconds label and, in TOTP
+   * mode, a code rotation when the time-step rolls over.
+   */
+  _tick() {
+    if (!this._config.entity) {
+      const counter = Math.floor(Date.now() / 1000 / this._period);
+      if (counter !== this._totpCounter) {
+        this._refresh();
+        return;
+      }
+    }
+    this._updateCountdown();
   }
 
   get _period() {
@@ -160,27 +401,51 @@ class HaOtpCard extends HTMLElement {
   }
 
   _secondsRemaining() {
+    if (this._expiry !== null) {
+      return Math.max(0, Math.ceil((this._expiry - Date.now()) / 1000));
+    }
     const period = this._period;
     return period - (Math.floor(Date.now() / 1000) % period);
   }
 
+  /** Short countdown label that fits inside the ring (45, 12m, 3h). */
+  _formatRemaining(seconds) {
+    return formatRemaining(seconds);
+  }
+
+  _parseDate(value) {
+    const ms = Date.parse(value);
+    return Number.isNaN(ms) ? null : ms;
+  }
+
   async _computeCode() {
     const cfg = this._config;
+    if (cfg.entity && this._live) {
+      this._error = "";
+      this._code = this._live.code || "";
+      this._expiry = this._parseDate(this._live.expiry);
+      this._created = this._parseDate(this._live.created);
+      return;
+    }
     if (cfg.entity) {
       const stateObj = this._hass && this._hass.states[cfg.entity];
       if (!stateObj) {
         this._error = `Entity "${cfg.entity}" not found.`;
         this._code = "";
+        this._expiry = this._created = null;
         return;
       }
+      const attrs = stateObj.attributes || {};
       this._error = "";
       this._code = String(stateObj.state || "").trim();
+      this._expiry = this._parseDate(attrs.expiry_date);
+      this._created = this._parseDate(attrs.creation_date);
       return;
     }
     try {
       this._error = "";
       // The code only changes once per time-step, so skip the HMAC when the
-      // counter hasn't advanced (the timer ticks every 250ms for the ring).
+      // counter hasn't advanced (the timer ticks every second).
       const counter = Math.floor(Date.now() / 1000 / this._period);
       if (this._code && this._totpCounter === counter) return;
       this._totpCounter = counter;
@@ -273,7 +538,7 @@ class HaOtpCard extends HTMLElement {
             <div class="countdown">
               <svg viewBox="0 0 36 36" class="ring" aria-hidden="true">
                 <circle class="ring-bg" cx="18" cy="18" r="15.915"></circle>
-                <circle class="ring-fg" cx="18" cy="18" r="15.915"></circle>
+                <circle class="ring-fg" cx="18" cy="18" r="15.915" pathLength="100"></circle>
               </svg>
               <span class="secs"></span>
             </div>
@@ -307,6 +572,7 @@ class HaOtpCard extends HTMLElement {
 
     this._rendered = true;
     this._update(true);
+    this._syncRing();
   }
 
   _update(codeChanged) {
@@ -315,8 +581,6 @@ class HaOtpCard extends HTMLElement {
 
     const codeEl = root.querySelector(".code");
     const errEl = root.querySelector(".error");
-    const secsEl = root.querySelector(".secs");
-    const ringFg = root.querySelector(".ring-fg");
     const revealIcon = root.querySelector(".reveal ha-icon");
     const copyBtn = root.querySelector(".copy");
     const copyIcon = root.querySelector(".copy ha-icon");
@@ -338,15 +602,7 @@ class HaOtpCard extends HTMLElement {
       codeEl.classList.add("flip");
     }
 
-    // Countdown.
-    const remaining = this._secondsRemaining();
-    const fraction = remaining / this._period;
-    secsEl.textContent = remaining;
-    const circumference = 2 * Math.PI * 15.915;
-    ringFg.style.strokeDasharray = `${circumference}`;
-    ringFg.style.strokeDashoffset = `${circumference * (1 - fraction)}`;
-    ringFg.classList.toggle("urgent", remaining <= 5);
-    secsEl.classList.toggle("urgent", remaining <= 5);
+    this._updateCountdown();
 
     // Reveal toggle icon.
     revealIcon.setAttribute("icon", this._revealed ? "mdi:eye" : "mdi:eye-off");
@@ -361,6 +617,48 @@ class HaOtpCard extends HTMLElement {
     }
   }
 
+  _updateCountdown() {
+    const root = this.shadowRoot;
+    if (!root || !this._rendered) return;
+    const remaining = this._secondsRemaining();
+    // A code that expires in hours is "urgent" in its last minute; a TOTP
+    // step only in its last five seconds.
+    const urgent = remaining <= (this._expiry !== null ? 60 : 5);
+    root.querySelector(".secs").textContent = this._formatRemaining(remaining);
+    root.querySelector(".secs").classList.toggle("urgent", urgent);
+    root.querySelector(".ring-fg").classList.toggle("urgent", urgent);
+  }
+
+  /**
+   * Phase-align the CSS ring animation with the TOTP period, or with the
+   * code's lifetime when the entity reports an expiry. The animation runs one
+   * full sweep per period (or once over the lifetime); a negative delay starts
+   * it part-way through, so no per-frame JavaScript is needed to draw the ring.
+   */
+  _syncRing() {
+    const root = this.shadowRoot;
+    if (!root || !this._rendered) return;
+    const ring = root.querySelector(".ring-fg");
+    const now = Date.now();
+    if (this._expiry !== null) {
+      const start = this._created !== null && this._created < this._expiry
+        ? this._created
+        : now;
+      const lifetime = Math.max(1, (this._expiry - start) / 1000);
+      ring.style.animationDuration = `${lifetime.toFixed(3)}s`;
+      ring.style.animationDelay = `-${Math.max(0, (now - start) / 1000).toFixed(3)}s`;
+      ring.style.animationIterationCount = "1";
+      ring.style.animationFillMode = "forwards";
+      return;
+    }
+    const period = this._period;
+    const elapsed = (now / 1000) % period;
+    ring.style.animationDuration = `${period}s`;
+    ring.style.animationDelay = `-${elapsed.toFixed(3)}s`;
+    ring.style.animationIterationCount = "";
+    ring.style.animationFillMode = "";
+  }
+
   _escape(str) {
     return String(str).replace(/[&<>"']/g, (c) => ({
       "&": "&amp;",
@@ -462,7 +760,14 @@ HaOtpCard.styles = `
     stroke: var(--otp-accent);
     stroke-width: 3;
     stroke-linecap: round;
-    transition: stroke-dashoffset 0.25s linear, stroke 0.3s ease;
+    stroke-dasharray: 100;
+    transition: stroke 0.3s ease;
+    /* Duration and (negative) delay are set per card by _syncRing(). */
+    animation: otp-ring 30s linear infinite;
+  }
+  @keyframes otp-ring {
+    from { stroke-dashoffset: 0; }
+    to { stroke-dashoffset: 100; }
   }
   .ring-fg.urgent { stroke: var(--error-color, #db4437); }
   .secs {
@@ -597,6 +902,355 @@ class HaOtpCardEditor extends HTMLElement {
 
 customElements.define("ha-otp-card-editor", HaOtpCardEditor);
 
+/* ------------------------------------------------------------------ *
+ *  Fleet card — every Nuki OTP entry in one element.                  *
+ * ------------------------------------------------------------------ */
+
+/** Short countdown label (45, 12m, 3h); shared by both cards. */
+function formatRemaining(seconds) {
+  if (seconds < 60) return String(seconds);
+  if (seconds < 3600) return `${Math.floor(seconds / 60)}m`;
+  return `${Math.floor(seconds / 3600)}h`;
+}
+
+const FLEET_ROW_HEIGHT = 52;
+// Rows rendered above and below the visible window, so a fast scroll does
+// not show blank rows before the next frame fills them.
+const FLEET_OVERSCAN = 3;
+
+/**
+ * Lists every `nuki_otp` entry with its code, a countdown to its expiry and
+ * generate / revoke buttons.
+ *
+ * Built for many locks. One `nuki_otp/subscribe_entries` websocket
+ * subscription delivers all entries and then only the ones that change. Rows
+ * are virtualized: a fixed pool of row elements (visible rows plus overscan)
+ * is moved and refilled as the list scrolls, so the DOM size does not grow
+ * with the number of locks. The countdowns share the page's single
+ * `otpTicker` and only the pooled rows are updated on a tick.
+ */
+class HaOtpFleetCard extends HTMLElement {
+  constructor() {
+    super();
+    this.attachShadow({ mode: "open" });
+    this._hass = null;
+    this._config = null;
+    this._entries = new Map(); // entry_id -> latest payload
+    this._order = []; // entry ids sorted by lock name
+    this._pool = [];
+    this._rendered = false;
+    this._subscription = null;
+    this._unsubscribeTick = null;
+    this._onTick = () => this._updateCountdowns();
+    this._frame = null;
+    this._onVisibilityChange = () => this._syncTimer();
+  }
+
+  setConfig(config) {
+    this._config = {
+      title: "Nuki OTP codes",
+      visible_rows: 8,
+      ...config,
+    };
+    this._rendered = false;
+    this._render();
+  }
+
+  set hass(hass) {
+    this._hass = hass;
+    this._subscribe();
+  }
+
+  connectedCallback() {
+    document.addEventListener("visibilitychange", this._onVisibilityChange);
+    this._subscribe();
+    this._syncTimer();
+  }
+
+  disconnectedCallback() {
+    document.removeEventListener("visibilitychange", this._onVisibilityChange);
+    if (this._subscription) {
+      this._subscription.then((unsub) => unsub && unsub());
+      this._subscription = null;
+    }
+    this._stopTimer();
+  }
+
+  getCardSize() {
+    return 1 + Math.min(this._order.length || 1, Number(this._config.visible_rows) || 8);
+  }
+
+  static getStubConfig() {
+    return {};
+  }
+
+  /* ---- data ---- */
+
+  _subscribe() {
+    const connection = this._hass && this._hass.connection;
+    if (!connection || !this.isConnected || this._subscription) return;
+    this._subscription = connection
+      .subscribeMessage((msg) => this._onEntries(msg.entries, msg.removed), {
+        type: "nuki_otp/subscribe_entries",
+      })
+      .catch((err) => {
+        this._subscription = null;
+        this._showMessage(`Nuki OTP entries unavailable: ${err.message || err}`);
+        return null;
+      });
+  }
+
+  _onEntries(entries, removed = []) {
+    // Entries unloaded (or reloading) are dropped until they are sent again.
+    let reorder = false;
+    for (const entryId of removed) {
+      if (this._entries.delete(entryId)) reorder = true;
+    }
+    for (const entry of entries) {
+      if (!this._entries.has(entry.entry_id)) reorder = true;
+      this._entries.set(entry.entry_id, entry);
+    }
+    if (reorder) {
+      this._order = [...this._entries.values()]
+        .sort((a, b) => a.lock.localeCompare(b.lock))
+        .map((entry) => entry.entry_id);
+      this._resize();
+    }
+    this._scheduleWindow();
+    this._syncTimer();
+  }
+
+  /* ---- timer ---- */
+
+  _syncTimer() {
+    const run = this.isConnected && this._order.length && document.visibilityState !== "hidden";
+    if (!run) {
+      this._stopTimer();
+    } else if (!this._unsubscribeTick) {
+      this._updateCountdowns();
+      this._unsubscribeTick = otpTicker.subscribe(this._onTick);
+    }
+  }
+
+  _stopTimer() {
+    if (this._unsubscribeTick) {
+      this._unsubscribeTick();
+      this._unsubscribeTick = null;
+    }
+  }
+
+  /* ---- rendering ---- */
+
+  _render() {
+    const root = this.shadowRoot;
+    root.innerHTML = `
+      <style>${HaOtpFleetCard.styles}</style>
+      <ha-card>
+        <div class="header"></div>
+        <div class="message" hidden></div>
+        <div class="viewport">
+          <div class="spacer"></div>
+        </div>
+      </ha-card>
+    `;
+    root.querySelector(".header").textContent = this._config.title;
+    const viewport = root.querySelector(".viewport");
+    viewport.addEventListener("scroll", () => this._scheduleWindow(), { passive: true });
+    viewport.addEventListener("click", (e) => this._onClick(e));
+    this._pool = [];
+    this._rendered = true;
+    this._resize();
+    this._scheduleWindow();
+  }
+
+  _showMessage(text) {
+    const el = this.shadowRoot.querySelector(".message");
+    if (!el) return;
+    el.hidden = !text;
+    el.textContent = text || "";
+  }
+
+  /** Size the scroll area and the row pool to the current entry count. */
+  _resize() {
+    if (!this._rendered) return;
+    const root = this.shadowRoot;
+    const visible = Math.max(1, Number(this._config.visible_rows) || 8);
+    const viewport = root.querySelector(".viewport");
+    // Strict containment sizes the box as if it were empty, so the height
+    // has to be set explicitly rather than capped.
+    const shown = Math.max(1, Math.min(this._order.length, visible));
+    viewport.style.height = `${shown * FLEET_ROW_HEIGHT}px`;
+    root.querySelector(".spacer").style.height = `${this._order.length * FLEET_ROW_HEIGHT}px`;
+    const poolSize = Math.min(this._order.length, visible + 2 * FLEET_OVERSCAN);
+    while (this._pool.length < poolSize) {
+      const row = this._createRow();
+      viewport.appendChild(row);
+      this._pool.push(row);
+    }
+    while (this._pool.length > poolSize) this._pool.pop().remove();
+    this._showMessage(this._order.length ? "" : "No Nuki OTP entries are set up.");
+  }
+
+  _createRow() {
+    const row = document.createElement("div");
+    row.className = "row";
+    row.innerHTML = `
+      <div class="lock"></div>
+      <div class="code" role="button" tabindex="0" title="Copy code"></div>
+      <div class="secs"></div>
+      <button class="btn" data-action="generate" title="Generate a new code">
+        <ha-icon icon="mdi:refresh"></ha-icon>
+      </button>
+      <button class="btn" data-action="revoke" title="Revoke the code">
+        <ha-icon icon="mdi:delete-outline"></ha-icon>
+      </button>
+    `;
+    row._payload = null;
+    return row;
+  }
+
+  /** Coalesce scroll events and entry updates into one pass per frame. */
+  _scheduleWindow() {
+    if (this._frame !== null || !this._rendered) return;
+    this._frame = requestAnimationFrame(() => {
+      this._frame = null;
+      this._renderWindow();
+    });
+  }
+
+  /** Fill the pooled rows with the entries in (or just around) view. */
+  _renderWindow() {
+    const viewport = this.shadowRoot.querySelector(".viewport");
+    const first = Math.max(
+      0,
+      Math.min(
+        Math.floor(viewport.scrollTop / FLEET_ROW_HEIGHT) - FLEET_OVERSCAN,
+        this._order.length - this._pool.length
+      )
+    );
+    this._pool.forEach((row, i) => {
+      const index = first + i;
+      const payload = this._entries.get(this._order[index]);
+      row.style.transform = `translateY(${index * FLEET_ROW_HEIGHT}px)`;
+      // Payloads are replaced, never mutated, so identity means unchanged.
+      if (row._payload === payload) return;
+      row._payload = payload;
+      row._expiry = Date.parse(payload.expiry);
+      row.querySelector(".lock").textContent = payload.lock;
+      const code = payload.code || "";
+      row.querySelector(".code").textContent =
+        code.length === 6 ? `${code.slice(0, 3)} ${code.slice(3)}` : code || "------";
+      row.querySelector("[data-action=revoke]").disabled = payload.state !== "active";
+      row.classList.toggle("stale", Boolean(payload.stale_since));
+      this._updateCountdown(row, Date.now());
+    });
+  }
+
+  _updateCountdowns() {
+    const now = Date.now();
+    for (const row of this._pool) this._updateCountdown(row, now);
+  }
+
+  _updateCountdown(row, now) {
+    const secs = row.querySelector(".secs");
+    if (!row._payload || Number.isNaN(row._expiry)) {
+      secs.textContent = "";
+      return;
+    }
+    const remaining = Math.max(0, Math.ceil((row._expiry - now) / 1000));
+    secs.textContent = formatRemaining(remaining);
+    secs.classList.toggle("urgent", remaining <= 60);
+  }
+
+  _onClick(e) {
+    const row = e.target.closest(".row");
+    if (!row || !row._payload) return;
+    const button = e.target.closest("button");
+    if (button) {
+      // The entry's OTP switch already queues and coalesces presses.
+      const service = button.dataset.action === "generate" ? "turn_on" : "turn_off";
+      if (row._payload.switch) {
+        this._hass.callService("switch", service, { entity_id: row._payload.switch });
+      }
+      return;
+    }
+    if (e.target.closest(".code") && row._payload.code) {
+      navigator.clipboard.writeText(row._payload.code).catch(() => {});
+    }
+  }
+}
+
+HaOtpFleetCard.styles = `
+  :host { --otp-accent: var(--primary-color, #03a9f4); }
+  .header {
+    padding: 14px 16px 6px;
+    font-size: 1.05rem;
+    font-weight: 600;
+    color: var(--primary-text-color);
+  }
+  .message {
+    padding: 8px 16px 14px;
+    color: var(--secondary-text-color);
+  }
+  .viewport {
+    position: relative;
+    overflow-y: auto;
+    contain: strict;
+    min-height: ${FLEET_ROW_HEIGHT}px;
+  }
+  .spacer { width: 1px; }
+  .row {
+    position: absolute;
+    top: 0;
+    left: 0;
+    right: 0;
+    height: ${FLEET_ROW_HEIGHT}px;
+    box-sizing: border-box;
+    padding: 0 8px 0 16px;
+    display: flex;
+    align-items: center;
+    gap: 10px;
+    border-top: 1px solid var(--divider-color, rgba(127,127,127,0.2));
+    will-change: transform;
+  }
+  .lock {
+    flex: 1 1 auto;
+    min-width: 0;
+    overflow: hidden;
+    text-overflow: ellipsis;
+    white-space: nowrap;
+    color: var(--primary-text-color);
+  }
+  .code {
+    font-family: "Roboto Mono", "SF Mono", ui-monospace, monospace;
+    font-size: 1.2rem;
+    font-weight: 700;
+    letter-spacing: 0.08em;
+    font-variant-numeric: tabular-nums;
+    cursor: pointer;
+  }
+  .row.stale .code { opacity: 0.55; }
+  .secs {
+    width: 3em;
+    text-align: right;
+    font-variant-numeric: tabular-nums;
+    color: var(--secondary-text-color);
+  }
+  .secs.urgent { color: var(--error-color, #db4437); }
+  .btn {
+    border: none;
+    background: none;
+    color: var(--secondary-text-color);
+    cursor: pointer;
+    padding: 6px;
+    border-radius: 50%;
+  }
+  .btn:hover { color: var(--otp-accent); }
+  .btn:disabled { opacity: 0.3; cursor: default; }
+`;
+
+customElements.define("ha-otp-fleet-card", HaOtpFleetCard);
+
 /* ------------------------------------------------------------------ *
  *  Register with the card picker.                                     *
  * ------------------------------------------------------------------ */
@@ -609,6 +1263,13 @@ window.customCards.push({
   preview: true,
   documentationURL: "https://github.com/paperclip/ha-otp-card",
 });
+window.customCards.push({
+  type: "ha-otp-fleet-card",
+  name: "Nuki OTP Fleet Card",
+  description: "Lists the codes of every Nuki OTP lock with countdowns and generate / revoke buttons.",
+  preview: false,
+  documentationURL: "https://github.com/pickeld/nuki_integration",
+});
 
 console.info(
   `%c HA-OTP-CARD %c v${VERSION} `,
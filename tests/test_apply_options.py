@@ -0,0 +1,58 @@
+"""Unit tests for applying options to a running client.
+
+Saving the options used to reload the whole entry: the platforms were torn
+down, a new ``NukiAPIClient`` lost the cached secret codes, and a fresh first
+refresh went to the cloud. Options are now applied in place with
+``NukiAPIClient.apply_config``; the coordinator only refetches when the set of
+auths that belong to the entry can have changed.
+
+Reuses the stubs and by-path module load from ``test_make_request_retry``.
+"""
+import dataclasses
+import unittest
+
+from test_make_request_retry import _FakeSession, _make_client, helpers
+
+
+class ApplyConfigTest(unittest.TestCase):
+    def setUp(self):
+        self.client = _make_client(_FakeSession([]))
+        self.client._code_cache["otpuser_code"] = "123456"
+        self.client._smartlock_id = 42
+        self.live_config = self.client.config
+
+    def _apply(self, **changes):
+        return self.client.apply_config(
+            dataclasses.replace(self.client.config, **changes)
+        )
+
+    def test_returns_changed_fields_and_updates_in_place(self):
+        changed = self._apply(otp_lifetime_hours=48, otp_username="guest")
+        self.assertEqual(changed, {"otp_lifetime_hours", "otp_username"})
+        # Everyone holding the config object sees the new values.
+        self.assertIs(self.client.config, self.live_config)
+        self.assertEqual(self.live_config.otp_lifetime_hours, 48)
+        self.assertEqual(self.live_config.otp_username, "guest")
+
+    def test_keeps_cached_codes_and_lock_id(self):
+        self._apply(otp_lifetime_hours=1)
+        self.assertEqual(self.client.get_cached_code("otpuser_code"), "123456")
+        self.assertEqual(self.client.smartlock_id, 42)
+
+    def test_unchanged_options_report_nothing(self):
+        self.assertEqual(self._apply(), set())
+
+    def test_bridge_settings_rebuild_the_bridge_client(self):
+        self.assertIsNone(self.client._bridge)
+        self._apply(
+            backend=helpers.BACKEND_BRIDGE,
+            bridge_host="192.168.1.20",
+            bridge_token="abc",
+        )
+        self.assertIsInstance(self.client._bridge, helpers.NukiBridgeClient)
+        self._apply(backend=helpers.BACKEND_CLOUD)
+        self.assertIsNone(self.client._bridge)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+"""Unit tests for the ``AuthCode`` model.
+
+The API client parses each auth record into a frozen, slotted ``AuthCode`` once
+per poll, with the dates already converted and the expiry precomputed, so the
+coordinator, sensor and cleanup never re-parse ``creationDate`` strings or pass
+raw dicts around.
+
+Reuses the stubs and by-path module load from ``test_make_request_retry``.
+"""
+import dataclasses
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from test_make_request_retry import (
+    _FakeResponse,
+    _FakeSession,
+    _make_client,
+    _run,
+    helpers,
+)
+
+AuthCode = helpers.AuthCode
+
+CREATED = datetime(2026, 1, 1, 8, 0, tzinfo=timezone.utc)
+
+
+class AuthCodeModelTest(unittest.TestCase):
+    def test_from_api_parses_dates_once(self):
+        auth = AuthCode.from_api(
+            {
+                "id": "abc",
+                "name": "OTP_code",
+                "enabled": True,
+                "remoteAllowed": True,
+                "lockCount": 2,
+                "creationDate": "2026-01-01T08:00:00.000Z",
+                "allowedUntilDate": "2026-01-01T10:00:00.000Z",
+            },
+            lifetime_hours=12,
+            code="123456",
+        )
+        self.assertEqual(auth.id, "abc")
+        self.assertEqual(auth.creation_date, CREATED)
+        # allowedUntilDate wins over creation + lifetime.
+        self.assertEqual(auth.expiry, CREATED + timedelta(hours=2))
+        self.assertEqual(auth.code, "123456")
+        self.assertEqual(auth.lock_count, 2)
+
+    def test_expiry_falls_back_to_lifetime(self):
+        auth = AuthCode.from_api(
+            {"id": "a", "name": "OTP_code", "creationDate": "2026-01-01T08:00:00Z"},
+            lifetime_hours=12,
+        )
+        self.assertEqual(auth.expiry, CREATED + timedelta(hours=12))
+        self.assertFalse(auth.is_expired(CREATED + timedelta(hours=11)))
+        self.assertTrue(auth.is_expired(CREATED + timedelta(hours=12)))
+
+    def test_unknown_dates_count_as_expired(self):
+        auth = AuthCode.from_api({"id": "a", "name": "OTP_code"}, lifetime_hours=12)
+        self.assertIsNone(auth.expiry)
+        self.assertTrue(auth.is_expired(CREATED))
+
+    def test_model_is_frozen_and_slotted(self):
+        auth = AuthCode(id="a", name="OTP_code")
+        self.assertFalse(hasattr(auth, "__dict__"))
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            auth.code = "1"
+
+    def test_client_attaches_cached_code(self):
+        session = _FakeSession([
+            _FakeResponse(status=200, payload=[{"name": "Front Door", "smartlockId": 1}]),
+            _FakeResponse(status=200, payload=[{"id": "x", "name": "otpuser_code"}]),
+        ])
+        client = _make_client(session)
+        client._code_cache["otpuser_code"] = "987654"
+        (auth,) = _run(client.get_auth_codes())
+        self.assertIsInstance(auth, AuthCode)
+        self.assertEqual(auth.code, "987654")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -70,6 +70,13 @@ class AuthErrorPropagationTest(unittest.TestCase):
         # 500 -> NukiAPIError (not auth) -> get_auth_codes returns [].
         self.assertEqual(_run(client.get_auth_codes()), [])
 
+    def test_fetch_auth_codes_raises_non_auth_error(self):
+        """The coordinator's read tells a failed poll from "no codes"."""
+        session = _FakeSession([_FakeResponse(status=500)])
+        client = _make_client(session)
+        with self.assertRaises(NukiAPIError):
+            _run(client.fetch_auth_codes())
+
     def test_auth_error_is_api_error_subclass(self):
         """Existing ``except NukiAPIError`` handlers still catch auth errors."""
         self.assertTrue(issubclass(NukiAuthError, NukiAPIError))
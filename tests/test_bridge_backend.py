@@ -0,0 +1,176 @@
+"""Unit tests for the optional Nuki Bridge backend.
+
+With ``backend="bridge"`` the smartlock lookup (used by every code creation and
+cleanup) is answered by a Nuki Bridge on the LAN instead of the Web API. These
+tests run the client against an in-process fake of the Bridge HTTP API and
+assert that:
+
+* the Bridge is authenticated with the hashed token (the plain token is never
+  sent) and its devices are mapped to Web API smartlockIds;
+* an unreachable Bridge, a rejected Bridge token, or a lock the Bridge does not
+  know falls back to the Web API without raising ``NukiAuthError``;
+* keypad-code operations always go to the Web API.
+
+Reuses the homeassistant/aiohttp stubs and by-path module load from
+``test_make_request_retry``.
+"""
+import asyncio
+import hashlib
+import unittest
+
+from test_make_request_retry import (
+    NukiConfig,
+    _FakeHass,
+    _FakeResponse,
+    _run,
+    helpers,
+)
+
+NukiAPIClient = helpers.NukiAPIClient
+
+BRIDGE_TOKEN = "bridgetoken"
+CLOUD_URL = "https://api.example/test"
+
+
+class _FakeBridgeSession:
+    """Serves a fake Bridge on ``http://bridge.local:8080`` plus the cloud.
+
+    Bridge requests are checked against the hashed-token scheme; the cloud
+    answers ``smartlock`` with ``cloud_locks`` and everything else with an
+    empty list. ``bridge_down`` makes every Bridge call time out.
+    """
+
+    def __init__(self, bridge_devices, cloud_locks=None, bridge_down=False):
+        self.bridge_devices = bridge_devices
+        self.cloud_locks = cloud_locks or []
+        self.bridge_down = bridge_down
+        self.calls = []  # (method, url, params)
+
+    def request(self, method, url, **kwargs):
+        params = kwargs.get("params") or {}
+        self.calls.append((method, url, params))
+        if url.startswith("http://bridge.local:8080/"):
+            if self.bridge_down:
+                raise asyncio.TimeoutError()
+            expected = hashlib.sha256(
+                f"{params.get('ts')},{params.get('rnr')},{BRIDGE_TOKEN}".encode()
+            ).hexdigest()
+            if "token" in params or params.get("hash") != expected:
+                return _FakeResponse(status=401)
+            if url.endswith("/list"):
+                return _FakeResponse(status=200, payload=self.bridge_devices)
+            return _FakeResponse(status=404)
+        if url == f"{CLOUD_URL}/smartlock":
+            return _FakeResponse(status=200, payload=self.cloud_locks)
+        return _FakeResponse(status=200, payload=[])
+
+    def bridge_calls(self):
+        return [c for c in self.calls if c[1].startswith("http://bridge.local")]
+
+    def cloud_calls(self):
+        return [c for c in self.calls if c[1].startswith(CLOUD_URL)]
+
+
+def _make_bridge_client(session, token=BRIDGE_TOKEN, nuki_name="Front Door"):
+    config = NukiConfig(
+        api_token="token",
+        api_url=CLOUD_URL,
+        otp_username="otpuser",
+        nuki_name=nuki_name,
+        otp_lifetime_hours=24,
+        backend="bridge",
+        bridge_host="bridge.local",
+        bridge_port=8080,
+        bridge_token=token,
+    )
+    return NukiAPIClient(_FakeHass(session), config)
+
+
+BRIDGE_DEVICES = [
+    {"nukiId": 0x1A2B3C4D, "deviceType": 4, "name": "Front Door"},
+    {"nukiId": 0x00000042, "deviceType": 2, "name": "Opener"},
+]
+
+
+class BridgeBackendTest(unittest.TestCase):
+    def test_smartlock_id_mapping(self):
+        self.assertEqual(helpers.bridge_smartlock_id(4, 0x1A2B3C4D), 0x41A2B3C4D)
+        self.assertEqual(helpers.bridge_smartlock_id(0, 123), 123)
+
+    def test_get_smartlock_served_by_bridge(self):
+        session = _FakeBridgeSession(BRIDGE_DEVICES)
+        client = _make_bridge_client(session)
+        lock = _run(client.get_smartlock())
+        self.assertEqual(lock["smartlockId"], 0x41A2B3C4D)
+        self.assertEqual(len(session.bridge_calls()), 1)
+        self.assertEqual(session.cloud_calls(), [])
+
+    def test_plain_token_never_sent(self):
+        session = _FakeBridgeSession(BRIDGE_DEVICES)
+        client = _make_bridge_client(session)
+        _run(client.list_smartlocks())
+        _, _, params = session.bridge_calls()[0]
+        self.assertNotIn("token", params)
+        self.assertNotIn(BRIDGE_TOKEN, params.values())
+
+    def test_unreachable_bridge_falls_back_to_cloud(self):
+        session = _FakeBridgeSession(
+            BRIDGE_DEVICES,
+            cloud_locks=[{"name": "Front Door", "smartlockId": 7}],
+            bridge_down=True,
+        )
+        client = _make_bridge_client(session)
+        lock = _run(client.get_smartlock())
+        self.assertEqual(lock["smartlockId"], 7)
+        # One Bridge attempt (not retried), then the Web API.
+        self.assertEqual(len(session.bridge_calls()), 1)
+        self.assertEqual(len(session.cloud_calls()), 1)
+
+    def test_rejected_bridge_token_is_not_an_auth_error(self):
+        """A bad Bridge token must fall back, not trigger Web API reauth."""
+        session = _FakeBridgeSession(
+            BRIDGE_DEVICES, cloud_locks=[{"name": "Front Door", "smartlockId": 7}]
+        )
+        client = _make_bridge_client(session, token="wrong")
+        locks = _run(client.list_smartlocks())
+        self.assertEqual(locks, [{"name": "Front Door", "smartlockId": 7}])
+
+    def test_lock_missing_on_bridge_looked_up_in_cloud(self):
+        session = _FakeBridgeSession(
+            BRIDGE_DEVICES, cloud_locks=[{"name": "Garage", "smartlockId": 9}]
+        )
+        client = _make_bridge_client(session, nuki_name="Garage")
+        lock = _run(client.get_smartlock())
+        self.assertEqual(lock["smartlockId"], 9)
+
+    def test_auth_codes_always_use_web_api(self):
+        """The lock id comes from the Bridge; the auth list from the cloud."""
+        session = _FakeBridgeSession(BRIDGE_DEVICES)
+        client = _make_bridge_client(session)
+        _run(client.get_auth_codes())
+        self.assertTrue(all(c[1].endswith("/list") for c in session.bridge_calls()))
+        self.assertEqual(
+            [c[1] for c in session.cloud_calls()],
+            [f"{CLOUD_URL}/smartlock/{0x41A2B3C4D}/auth?types=13"],
+        )
+
+    def test_cloud_backend_never_touches_bridge(self):
+        session = _FakeBridgeSession(
+            BRIDGE_DEVICES, cloud_locks=[{"name": "Front Door", "smartlockId": 7}]
+        )
+        config = NukiConfig(
+            api_token="token",
+            api_url=CLOUD_URL,
+            otp_username="otpuser",
+            nuki_name="Front Door",
+            otp_lifetime_hours=24,
+            bridge_host="bridge.local",
+            bridge_token=BRIDGE_TOKEN,
+        )
+        client = NukiAPIClient(_FakeHass(session), config)
+        _run(client.get_smartlock())
+        self.assertEqual(session.bridge_calls(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
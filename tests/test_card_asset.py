@@ -0,0 +1,87 @@
+"""Unit tests for the compressed, content-hashed card asset.
+
+The card used to be served uncompressed with ``cache_headers=False``, so every
+dashboard load downloaded the full source again. It is now minified and
+pre-compressed once at setup and served under a URL containing its content
+hash with immutable cache headers. ``card_asset.py`` has no Home Assistant
+imports, so it is loaded directly by path and run against the real card.
+"""
+import gzip
+import importlib.util
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+_PKG_DIR = Path(__file__).resolve().parents[1] / "custom_components" / "nuki_otp"
+_spec = importlib.util.spec_from_file_location(
+    "nuki_otp_card_asset", _PKG_DIR / "card_asset.py"
+)
+card_asset = importlib.util.module_from_spec(_spec)
+# dataclasses looks the module up in sys.modules while building the class.
+sys.modules[_spec.name] = card_asset
+_spec.loader.exec_module(card_asset)
+
+CardAsset = card_asset.CardAsset
+CARD_PATH = _PKG_DIR / "www" / "ha-otp-card.js"
+
+
+class MinifyTest(unittest.TestCase):
+    def test_strips_comments_and_indentation_only(self):
+        source = (
+            "/**\n * Header.\n */\n"
+            "const a = 1; // trailing comments stay\n"
+            "\n"
+            "  // whole-line comment\n"
+            "  const css = `\n    .x { color: red; }\n  `;\n"
+        )
+        self.assertEqual(
+            card_asset.minify_js(source),
+            "const a = 1; // trailing comments stay\n"
+            "const css = `\n.x { color: red; }\n`;\n",
+        )
+
+    @unittest.skipUnless(shutil.which("node"), "node is not installed")
+    def test_minified_card_is_valid_javascript(self):
+        minified = card_asset.minify_js(CARD_PATH.read_text(encoding="utf-8"))
+        with tempfile.NamedTemporaryFile("w", suffix=".mjs", delete=False) as handle:
+            handle.write(minified)
+        try:
+            result = subprocess.run(
+                ["node", "--check", handle.name], capture_output=True, text=True
+            )
+        finally:
+            Path(handle.name).unlink()
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+
+class CardAssetTest(unittest.TestCase):
+    def setUp(self):
+        self.asset = card_asset.load_card_asset(str(CARD_PATH))
+
+    def test_smaller_than_source_and_gzip_round_trips(self):
+        self.assertLess(len(self.asset.body), CARD_PATH.stat().st_size)
+        self.assertLess(len(self.asset.gzip_body), len(self.asset.body) // 3)
+        self.assertEqual(gzip.decompress(self.asset.gzip_body), self.asset.body)
+
+    def test_digest_follows_content(self):
+        same = CardAsset.from_source(CARD_PATH.read_text(encoding="utf-8"))
+        self.assertEqual(same.digest, self.asset.digest)
+        self.assertEqual(same.gzip_body, self.asset.gzip_body)
+        changed = CardAsset.from_source("const v = 2;\n")
+        self.assertNotEqual(changed.digest, self.asset.digest)
+
+    def test_encoding_negotiation(self):
+        asset = CardAsset(digest="d", body=b"b", gzip_body=b"g", brotli_body=b"r")
+        self.assertEqual(asset.select("gzip, deflate, br"), ("br", b"r"))
+        self.assertEqual(asset.select("gzip, br;q=0"), ("gzip", b"g"))
+        self.assertEqual(asset.select("identity"), (None, b"b"))
+        self.assertEqual(asset.select(""), (None, b"b"))
+        no_brotli = CardAsset(digest="d", body=b"b", gzip_body=b"g")
+        self.assertEqual(no_brotli.select("br, gzip"), ("gzip", b"g"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -13,6 +13,11 @@ and the integration could not be added. The flow is now two steps:
 2. ``async_step_select_lock`` shows those locks in a dropdown so the user picks
    one — a mistyped/non-existent name is impossible.
 
+When the account has several locks, a menu also offers
+``async_step_select_locks``: a multi-select that creates one entry per chosen
+lock from the same discovery response, checking the token against the auth
+endpoint once rather than once per lock.
+
 These tests load ``config_flow.py`` behind lightweight stubs (no full Home
 Assistant install) and assert the discovery + selection behaviour, including the
 "account has no locks" path.
@@ -79,6 +84,19 @@ def _install_stub_modules():
         config_entries.OptionsFlow = OptionsFlow
         config_entries.ConfigEntry = ConfigEntry
 
+    # Flow helpers used by the multi-lock steps, added even when another test
+    # module created the ConfigFlow stub.
+    if not hasattr(config_entries, "SOURCE_IMPORT"):
+        config_entries.SOURCE_IMPORT = "import"
+    flow_helpers = {
+        "async_show_menu": lambda self, **kwargs: {"type": "menu", **kwargs},
+        "async_abort": lambda self, **kwargs: {"type": "abort", **kwargs},
+        "_async_current_ids": lambda self: set(getattr(self, "_current_ids", ())),
+    }
+    for name, func in flow_helpers.items():
+        if not hasattr(config_entries.ConfigFlow, name):
+            setattr(config_entries.ConfigFlow, name, func)
+
     # homeassistant.core (may already exist from another test, without callback)
     core = _ensure_module("homeassistant.core", ha, "core")
     if not hasattr(core, "HomeAssistant"):
@@ -126,15 +144,17 @@ def _install_stub_modules():
 
         class SelectSelectorMode:
             DROPDOWN = "dropdown"
+            LIST = "list"
 
         class SelectOptionDict(dict):
             def __init__(self, value=None, label=None):
                 super().__init__(value=value, label=label)
 
         class SelectSelectorConfig:
-            def __init__(self, options=None, mode=None):
+            def __init__(self, options=None, mode=None, multiple=False, **kwargs):
                 self.options = options or []
                 self.mode = mode
+                self.multiple = multiple
 
         class SelectSelector:
             def __init__(self, config=None):
@@ -143,9 +163,11 @@ def _install_stub_modules():
             def __call__(self, value):
                 # Mirror HA: only allow values present in the option list.
                 valid = {opt["value"] for opt in (self.config.options if self.config else [])}
-                if value not in valid:
-                    import voluptuous as vol
-                    raise vol.Invalid(f"{value} is not a valid option")
+                values = value if getattr(self.config, "multiple", False) else [value]
+                for item in values:
+                    if item not in valid:
+                        import voluptuous as vol
+                        raise vol.Invalid(f"{item} is not a valid option")
                 return value
 
         selector.TextSelectorType = TextSelectorType
@@ -170,6 +192,30 @@ def _run(coro):
     return asyncio.run(coro)
 
 
+class _FakeFlowManager:
+    def __init__(self):
+        self.started = []
+
+    async def async_init(self, domain, context=None, data=None):
+        self.started.append((context["source"], data))
+
+
+class _FakeFlowHass:
+    """Just enough hass for flows that start other flows."""
+
+    def __init__(self):
+        self.data = {}
+        self.config_entries = types.SimpleNamespace(flow=_FakeFlowManager())
+
+    def async_create_task(self, coro):
+        # The fake async_init never suspends, so drive it to completion now
+        # and let the test inspect the started flows.
+        try:
+            coro.send(None)
+        except StopIteration:
+            pass
+
+
 @unittest.skipUnless(_HAVE_VOLUPTUOUS, "voluptuous not installed")
 class ConfigFlowDiscoveryTest(unittest.TestCase):
     @classmethod
@@ -189,17 +235,21 @@ class ConfigFlowDiscoveryTest(unittest.TestCase):
 
         _install_stub_modules()
 
+        repo_component = repo_root / "custom_components" / "nuki_otp"
+
+        # The real const module (it has no imports), so constants added for
+        # new features are always there.
         if "nuki_otp_const" not in sys.modules:
-            const = types.ModuleType("nuki_otp_const")
-            const.DOMAIN = "nuki_otp"
-            const.DEFAULT_API_URL = "https://api.nuki.io"
-            const.DEFAULT_OTP_USERNAME = "OTP"
-            const.DEFAULT_OTP_LIFETIME_HOURS = 12
+            const_spec = importlib.util.spec_from_file_location(
+                "nuki_otp_const", repo_component / "const.py"
+            )
+            const = importlib.util.module_from_spec(const_spec)
+            const_spec.loader.exec_module(const)
             sys.modules["nuki_otp_const"] = const
 
-        repo_component = repo_root / "custom_components" / "nuki_otp"
-
-        pkg_name = "nuki_otp_pkg"
+        # Not "nuki_otp_pkg": the switch tests own that name and register a
+        # stub helpers module under it.
+        pkg_name = "nuki_otp_flow_pkg"
         if pkg_name not in sys.modules:
             pkg = types.ModuleType(pkg_name)
             pkg.__path__ = [str(repo_component)]
@@ -216,9 +266,19 @@ class ConfigFlowDiscoveryTest(unittest.TestCase):
         cls.cf = cf
         cls.helpers = _helpers
 
+    def setUp(self):
+        # Discovery results are cached in hass.data; each test gets its own.
+        self.hass = _FakeFlowHass()
+
     def _patch_list_smartlocks(self, result=None, exc=None):
-        """Patch NukiAPIClient.list_smartlocks for the duration of a test."""
+        """Patch NukiAPIClient.list_smartlocks for the duration of a test.
+
+        Returns the list of calls, one per request that reached the "cloud".
+        """
+        calls = []
+
         async def fake(self_client):
+            calls.append(self_client.config.api_token)
             if exc is not None:
                 raise exc
             return result if result is not None else []
@@ -228,6 +288,7 @@ class ConfigFlowDiscoveryTest(unittest.TestCase):
         self.addCleanup(
             setattr, self.helpers.NukiAPIClient, "list_smartlocks", original
         )
+        return calls
 
     def test_user_schema_only_has_connection_fields(self):
         """Step 1 must only ask for api_url + api_token (no nuki_name)."""
@@ -239,7 +300,7 @@ class ConfigFlowDiscoveryTest(unittest.TestCase):
             result=[{"name": "Front Door"}, {"name": "Back Door"}]
         )
         locks = _run(self.cf.discover_smartlocks(
-            None, {"api_url": "https://api.nuki.io", "api_token": "t"}
+            self.hass, {"api_url": "https://api.nuki.io", "api_token": "t"}
         ))
         self.assertEqual([l["name"] for l in locks], ["Front Door", "Back Door"])
 
@@ -247,20 +308,20 @@ class ConfigFlowDiscoveryTest(unittest.TestCase):
         self._patch_list_smartlocks(exc=self.helpers.NukiAuthError("401"))
         with self.assertRaises(self.cf.InvalidAuth):
             _run(self.cf.discover_smartlocks(
-                None, {"api_url": "https://api.nuki.io", "api_token": "bad"}
+                self.hass, {"api_url": "https://api.nuki.io", "api_token": "bad"}
             ))
 
     def test_discover_no_locks_raises_not_found(self):
         self._patch_list_smartlocks(result=[])
         with self.assertRaises(self.cf.NukiNotFound):
             _run(self.cf.discover_smartlocks(
-                None, {"api_url": "https://api.nuki.io", "api_token": "t"}
+                self.hass, {"api_url": "https://api.nuki.io", "api_token": "t"}
             ))
 
     def test_discover_bad_url(self):
         with self.assertRaises(self.cf.InvalidUrl):
             _run(self.cf.discover_smartlocks(
-                None, {"api_url": "not-a-url", "api_token": "t"}
+                self.hass, {"api_url": "not-a-url", "api_token": "t"}
             ))
 
     def test_lock_step_schema_is_a_dropdown_of_discovered_names(self):
@@ -282,7 +343,7 @@ class ConfigFlowDiscoveryTest(unittest.TestCase):
         """End-to-end: connection step discovers, select step creates entry."""
         self._patch_list_smartlocks(result=[{"name": "Front Door"}])
         flow = self.cf.NukiConfigFlow()
-        flow.hass = None  # real HA injects this; not used once list is patched
+        flow.hass = self.hass
 
         # Step 1: submit connection -> should advance to select_lock form.
         res1 = _run(flow.async_step_user(
@@ -302,10 +363,189 @@ class ConfigFlowDiscoveryTest(unittest.TestCase):
         self.assertEqual(res2["data"]["api_token"], "tok")
         self.assertIn("Front Door", res2["title"])
 
+    def _multi_lock_flow(self, configured=()):
+        """A flow past the connection step of an account with three locks."""
+        self._patch_list_smartlocks(result=[
+            {"name": "Front Door", "smartlockId": 1},
+            {"name": "Back Door", "smartlockId": 2},
+            {"name": "Garage", "smartlockId": 3},
+        ])
+        flow = self.cf.NukiConfigFlow()
+        flow._current_ids = {self.cf._lock_unique_id(n) for n in configured}
+        flow.hass = self.hass
+        res = _run(flow.async_step_user(
+            {"api_url": "https://api.nuki.io", "api_token": "tok"}
+        ))
+        return flow, res
+
+    def _patch_fetch_auth_codes(self, exc=None):
+        calls = []
+
+        async def fake(self_client, active_at=None, deadline=None):
+            calls.append(self_client.smartlock_id)
+            if exc is not None:
+                raise exc
+            return []
+
+        original = self.helpers.NukiAPIClient.fetch_auth_codes
+        self.helpers.NukiAPIClient.fetch_auth_codes = fake
+        self.addCleanup(
+            setattr, self.helpers.NukiAPIClient, "fetch_auth_codes", original
+        )
+        return calls
+
+    def test_several_locks_offer_a_menu(self):
+        _, res = self._multi_lock_flow()
+        self.assertEqual(res["type"], "menu")
+        self.assertEqual(res["menu_options"], ["select_lock", "select_locks"])
+
+    def test_select_locks_creates_all_entries_from_one_discovery(self):
+        auth_checks = self._patch_fetch_auth_codes()
+        flow, _ = self._multi_lock_flow()
+        res = _run(flow.async_step_select_locks({
+            "nuki_names": ["Front Door", "Garage"],
+            "otp_username": "Guest",
+            "otp_lifetime_hours": 6,
+        }))
+        self.assertEqual(res["type"], "create_entry")
+        self.assertEqual(res["data"]["nuki_name"], "Front Door")
+        self.assertEqual(res["data"]["smartlock_id"], 1)
+        # One auth check for the token, against the per-lock endpoint.
+        self.assertEqual(auth_checks, [1])
+        # The other lock goes to an additional-lock flow with its entry data.
+        (source, data), = flow.hass.config_entries.flow.started
+        self.assertEqual(source, "additional_lock")
+        self.assertEqual(data["nuki_name"], "Garage")
+        self.assertEqual(data["smartlock_id"], 3)
+        self.assertEqual(data["api_token"], "tok")
+        self.assertEqual(data["otp_username"], "Guest")
+        # That flow validates against the cached discovery, without another
+        # cloud call, and creates the entry.
+        self._patch_list_smartlocks(exc=AssertionError("no cloud call"))
+        second = self.cf.NukiConfigFlow()
+        second.hass = flow.hass
+        res2 = _run(second.async_step_additional_lock(data))
+        self.assertEqual(res2["type"], "create_entry")
+        self.assertIn("Garage", res2["title"])
+
+    def test_additional_lock_rejects_unvalidated_data(self):
+        self._patch_fetch_auth_codes()
+        flow, _ = self._multi_lock_flow()
+        _run(flow.async_step_select_locks({
+            "nuki_names": ["Front Door", "Garage"],
+            "otp_username": "Guest",
+            "otp_lifetime_hours": 6,
+        }))
+        (_, data), = flow.hass.config_entries.flow.started
+        self._patch_list_smartlocks(exc=AssertionError("no cloud call"))
+        cases = {
+            "invalid_lock_data": {**data, "otp_lifetime_hours": 0},
+            "lock_not_found": {**data, "nuki_name": "Shed"},
+        }
+        for reason, bad in cases.items():
+            with self.subTest(reason=reason):
+                other = self.cf.NukiConfigFlow()
+                other.hass = flow.hass
+                res = _run(other.async_step_additional_lock(bad))
+                self.assertEqual(res["type"], "abort")
+                self.assertEqual(res["reason"], reason)
+
+    def test_select_locks_hides_configured_locks(self):
+        flow, _ = self._multi_lock_flow(configured=["Back Door"])
+        res = _run(flow.async_step_select_locks())
+        nuki_names = next(
+            v for k, v in res["data_schema"].schema.items() if str(k) == "nuki_names"
+        )
+        values = [opt["value"] for opt in nuki_names.config.options]
+        self.assertEqual(values, ["Front Door", "Garage"])
+
+    def test_select_locks_requires_a_selection(self):
+        flow, _ = self._multi_lock_flow()
+        res = _run(flow.async_step_select_locks({"nuki_names": []}))
+        self.assertEqual(res["errors"], {"base": "no_locks_selected"})
+
+    def test_select_locks_rejected_token_creates_nothing(self):
+        self._patch_fetch_auth_codes(exc=self.helpers.NukiAuthError("403"))
+        flow, _ = self._multi_lock_flow()
+        res = _run(flow.async_step_select_locks({
+            "nuki_names": ["Front Door", "Back Door"],
+        }))
+        self.assertEqual(res["errors"], {"base": "invalid_auth"})
+        self.assertEqual(flow.hass.config_entries.flow.started, [])
+
+    def test_discovery_is_cached_per_token(self):
+        calls = self._patch_list_smartlocks(result=[{"name": "Front Door"}])
+        conn = {"api_url": "https://api.nuki.io", "api_token": "t"}
+        _run(self.cf.discover_smartlocks(self.hass, conn))
+        _run(self.cf.discover_smartlocks(self.hass, dict(conn)))
+        self.assertEqual(calls, ["t"])
+        # A different token is never answered from another token's result.
+        _run(self.cf.discover_smartlocks(self.hass, {**conn, "api_token": "t2"}))
+        self.assertEqual(calls, ["t", "t2"])
+
+    def test_failed_discovery_is_not_cached(self):
+        calls = self._patch_list_smartlocks(exc=self.helpers.NukiAuthError("401"))
+        conn = {"api_url": "https://api.nuki.io", "api_token": "bad"}
+        for _ in range(2):
+            with self.assertRaises(self.cf.InvalidAuth):
+                _run(self.cf.discover_smartlocks(self.hass, conn))
+        self.assertEqual(len(calls), 2)
+
+    def test_failed_auth_check_is_not_cached(self):
+        calls = self._patch_fetch_auth_codes(
+            exc=self.helpers.NukiConnectionError("timeout")
+        )
+        conn = {"api_url": "https://api.nuki.io", "api_token": "t"}
+        for _ in range(2):
+            with self.assertRaises(self.cf.CannotConnect):
+                _run(self.cf.validate_auth_endpoint(self.hass, conn))
+        self.assertEqual(len(calls), 2)
+
+    def test_cache_is_kept_per_hass(self):
+        calls = self._patch_list_smartlocks(result=[{"name": "Front Door"}])
+        conn = {"api_url": "https://api.nuki.io", "api_token": "t"}
+        _run(self.cf.discover_smartlocks(self.hass, conn))
+        _run(self.cf.discover_smartlocks(_FakeFlowHass(), conn))
+        self.assertEqual(calls, ["t", "t"])
+
+    def test_cache_entries_expire(self):
+        now = [0.0]
+        cache = self.cf.DiscoveryCache(ttl=10, clock=lambda: now[0])
+        cache.set(["lock"], "locks", "url", "tok")
+        self.assertEqual(cache.get("locks", "url", "tok"), ["lock"])
+        self.assertIsNone(cache.get("locks", "url", "other"))
+        now[0] = 10.0
+        self.assertIsNone(cache.get("locks", "url", "tok"))
+
+    def test_reauth_resubmission_reuses_validation(self):
+        calls = self._patch_list_smartlocks(
+            result=[{"name": "Front Door", "smartlockId": 7}]
+        )
+        auth_checks = self._patch_fetch_auth_codes()
+        data = {
+            "api_url": "https://api.nuki.io",
+            "api_token": "new",
+            "nuki_name": "Front Door",
+        }
+        for _ in range(3):
+            info = _run(self.cf.validate_input(self.hass, data))
+        self.assertEqual(info["smartlock_id"], 7)
+        self.assertEqual(calls, ["new"])
+        self.assertEqual(auth_checks, [7])
+
+    def test_reauth_unknown_lock_raises_not_found(self):
+        self._patch_list_smartlocks(result=[{"name": "Back Door"}])
+        with self.assertRaises(self.cf.NukiNotFound):
+            _run(self.cf.validate_input(self.hass, {
+                "api_url": "https://api.nuki.io",
+                "api_token": "t",
+                "nuki_name": "Front Door",
+            }))
+
     def test_user_step_surfaces_no_smartlocks_error(self):
         self._patch_list_smartlocks(result=[])
         flow = self.cf.NukiConfigFlow()
-        flow.hass = None  # real HA injects this; not used once list is patched
+        flow.hass = self.hass
         res = _run(flow.async_step_user(
             {"api_url": "https://api.nuki.io", "api_token": "tok"}
         ))
@@ -168,18 +168,20 @@ class ConfigFlowSchemaSerializableTest(unittest.TestCase):
         # Stub the sibling modules config_flow imports so we don't drag in the
         # whole package __init__ / coordinator.
         if "nuki_otp_const" not in sys.modules:
-            const = types.ModuleType("nuki_otp_const")
-            const.DOMAIN = "nuki_otp"
-            const.DEFAULT_API_URL = "https://api.nuki.io"
-            const.DEFAULT_OTP_USERNAME = "OTP"
-            const.DEFAULT_OTP_LIFETIME_HOURS = 12
+            const_spec = importlib.util.spec_from_file_location(
+                "nuki_otp_const", repo_component / "const.py"
+            )
+            const = importlib.util.module_from_spec(const_spec)
+            const_spec.loader.exec_module(const)
             sys.modules["nuki_otp_const"] = const
 
         # config_flow.py does ``from .const import ...`` and
         # ``from .helpers import ...``; rewrite those by loading it as a module
         # whose package provides those names. Simplest: load by path after
         # injecting a fake package.
-        pkg_name = "nuki_otp_pkg"
+        # Not "nuki_otp_pkg": the switch tests own that name and register a
+        # stub helpers module under it.
+        pkg_name = "nuki_otp_flow_pkg"
         if pkg_name not in sys.modules:
             pkg = types.ModuleType(pkg_name)
             pkg.__path__ = [str(repo_component)]
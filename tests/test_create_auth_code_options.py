@@ -0,0 +1,79 @@
+"""Unit tests for the options ``create_auth_code`` takes from the service.
+
+``nuki_otp.generate_code`` returns the new code in its response and can set a
+custom lifetime, a name suffix, allowed weekdays and a time-of-day window.
+These tests check that the options reach the PUT body in the Web API's units
+and that the created code comes back to the caller.
+
+Reuses the stubs and by-path module load from ``test_make_request_retry``.
+"""
+import unittest
+from datetime import time, timedelta
+
+from test_make_request_retry import (
+    _FakeResponse,
+    _FakeSession,
+    _make_client,
+    _run,
+)
+
+_LOCKS = [{"name": "Front Door", "smartlockId": 42}]
+
+
+def _create(**kwargs):
+    session = _FakeSession([
+        _FakeResponse(status=200, payload=_LOCKS),  # lock lookup
+        _FakeResponse(status=204),  # PUT smartlock/auth
+    ])
+    client = _make_client(session)
+    issued = _run(client.create_auth_code(**kwargs))
+    return client, issued, session.bodies[-1]
+
+
+class CreateAuthCodeOptionsTest(unittest.TestCase):
+    def test_defaults_match_the_switch(self):
+        client, issued, body = _create()
+        # A short random tag makes every created auth name unique.
+        self.assertRegex(body["name"], r"^otpuser_code_[0-9a-f]{4}$")
+        self.assertEqual(issued.name, body["name"])
+        self.assertEqual(body["allowedWeekDays"], 127)
+        self.assertEqual((body["allowedFromTime"], body["allowedUntilTime"]), (0, 0))
+        self.assertEqual(issued.expiry - issued.valid_from, timedelta(hours=24))
+        self.assertEqual(str(body["code"]), issued.code)
+        # The secret is cached so the sensor can show it after the next poll.
+        self.assertEqual(client.get_cached_code(issued.name), issued.code)
+
+    def test_custom_lifetime_suffix_weekdays_and_window(self):
+        _, issued, body = _create(
+            lifetime_hours=3,
+            name_suffix="room12",
+            weekdays=["sat", "sun", "sat"],
+            allowed_from=time(8, 30),
+            allowed_until=time(20, 0),
+        )
+        self.assertRegex(body["name"], r"^otpuser_code_room12_[0-9a-f]{4}$")
+        self.assertEqual(issued.name, body["name"])
+        self.assertEqual(body["allowedWeekDays"], 2 + 1)
+        self.assertEqual(body["allowedFromTime"], 8 * 60 + 30)
+        self.assertEqual(body["allowedUntilTime"], 20 * 60)
+        self.assertEqual(issued.expiry - issued.valid_from, timedelta(hours=3))
+        self.assertTrue(body["allowedUntilDate"].endswith("Z"))
+
+    def test_open_ended_window_runs_to_midnight(self):
+        _, _, body = _create(allowed_from=time(18, 0))
+        self.assertEqual(body["allowedFromTime"], 18 * 60)
+        self.assertEqual(body["allowedUntilTime"], 23 * 60 + 59)
+
+    def test_failure_returns_none(self):
+        session = _FakeSession([
+            _FakeResponse(status=200, payload=_LOCKS),
+            _FakeResponse(status=500),
+        ])
+        client = _make_client(session)
+        self.assertIsNone(_run(client.create_auth_code()))
+        # A rejected create leaves no cached secret behind.
+        self.assertEqual(client._code_cache, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
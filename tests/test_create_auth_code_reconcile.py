@@ -0,0 +1,137 @@
+"""Unit tests for recovering from a create whose outcome is unknown.
+
+``_make_request`` never retries a PUT, so a timeout in ``create_auth_code``
+used to mean a failed press and possibly a phantom code on the lock. Every
+created auth now carries a unique name; after a timeout or connection error
+the client looks that name up on the lock, adopts the auth if it exists, and
+issues the identical create again only once its absence is confirmed.
+
+Reuses the stubs and by-path module load from ``test_make_request_retry``.
+"""
+import asyncio
+import unittest
+from unittest import mock
+
+import aiohttp  # stubbed by test_make_request_retry
+
+from test_make_request_retry import (
+    _FakeResponse,
+    _FakeSession,
+    _make_client,
+    _run,
+    helpers,
+)
+
+_LOCKS = [{"name": "Front Door", "smartlockId": 42}]
+
+
+class _EchoSession(_FakeSession):
+    """Scripted session whose auth lookups can echo the PUT's auth name."""
+
+    def __init__(self, outcomes, created=False):
+        super().__init__(outcomes)
+        self.created = created
+
+    def request(self, method, url, **kwargs):
+        outcome = super().request(method, url, **kwargs)
+        if outcome == "lookup":
+            put = next(body for body in self.bodies if isinstance(body, dict))
+            auths = [{"id": "a1", "name": put["name"]}] if self.created else []
+            return _FakeResponse(status=200, payload=auths)
+        return outcome
+
+
+def _create(session):
+    client = _make_client(session)
+    with mock.patch.object(helpers, "RETRY_DELAY", 0):
+        issued = _run(client.create_auth_code())
+    puts = [body for (method, _), body in zip(session.calls, session.bodies)
+            if method == "PUT"]
+    return client, issued, puts
+
+
+class CreateReconcileTest(unittest.TestCase):
+    def test_timed_out_create_that_landed_is_adopted(self):
+        session = _EchoSession([
+            _FakeResponse(status=200, payload=_LOCKS),
+            asyncio.TimeoutError(),  # PUT reached the server, response lost
+            "lookup",
+        ], created=True)
+        client, issued, puts = _create(session)
+        self.assertIsNotNone(issued)
+        self.assertEqual(len(puts), 1)
+        self.assertEqual(
+            session.calls[2],
+            ("GET", "https://api.example/test/smartlock/42/auth?types=13"),
+        )
+        self.assertEqual(client.get_cached_code(issued.name), issued.code)
+
+    def test_confirmed_absent_create_is_reissued_identically(self):
+        session = _EchoSession([
+            _FakeResponse(status=200, payload=_LOCKS),
+            aiohttp.ClientError("reset"),  # PUT never arrived
+            "lookup",  # confirmed absent
+            _FakeResponse(status=204),  # re-issued PUT
+        ])
+        _, issued, puts = _create(session)
+        self.assertIsNotNone(issued)
+        self.assertEqual(len(puts), 2)
+        # Same name and code: at most one of them can ever exist.
+        self.assertEqual(puts[0], puts[1])
+        self.assertEqual(str(puts[1]["code"]), issued.code)
+
+    def test_unconfirmable_create_is_not_reissued(self):
+        session = _EchoSession([
+            _FakeResponse(status=200, payload=_LOCKS),
+            asyncio.TimeoutError(),
+            asyncio.TimeoutError(),  # lookup fails too, with its retry
+        ])
+        client, issued, puts = _create(session)
+        self.assertIsNone(issued)
+        self.assertEqual(len(puts), 1)
+        # Kept, so the code shows if the auth turns up on a later poll.
+        self.assertEqual(len(client._code_cache), 1)
+
+    def test_rejected_reissue_frees_the_code(self):
+        session = _EchoSession([
+            _FakeResponse(status=200, payload=_LOCKS),
+            asyncio.TimeoutError(),
+            "lookup",  # confirmed absent
+            _FakeResponse(status=409),  # re-issued PUT rejected
+        ])
+        client, issued, puts = _create(session)
+        self.assertIsNone(issued)
+        self.assertEqual(len(puts), 2)
+        self.assertEqual(client._code_cache, {})
+        self.assertEqual(
+            client._issued_codes.codes(client._entry_id, client._smartlock_id),
+            set(),
+        )
+
+    def test_reissue_attempts_are_bounded(self):
+        session = _EchoSession([
+            _FakeResponse(status=200, payload=_LOCKS),
+            asyncio.TimeoutError(),
+            "lookup",
+            asyncio.TimeoutError(),
+            "lookup",
+            asyncio.TimeoutError(),
+        ])
+        _, issued, puts = _create(session)
+        self.assertIsNone(issued)
+        self.assertEqual(len(puts), 1 + helpers.CREATE_REISSUE_ATTEMPTS)
+
+    def test_names_are_unique_per_create(self):
+        names = set()
+        for _ in range(5):
+            session = _FakeSession([
+                _FakeResponse(status=200, payload=_LOCKS),
+                _FakeResponse(status=204),
+            ])
+            _, issued, _ = _create(session)
+            names.add(issued.name)
+        self.assertGreater(len(names), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+"""Unit tests for operation deadlines.
+
+Every request used to get its own 30-second timeout plus up to three retries,
+so one switch press (lookup, list, delete, create) could hang for minutes. An
+operation now carries a ``Deadline``: each request's timeouts come out of the
+remaining budget, and once it is spent the operation fails fast with
+``NukiDeadlineExceeded`` instead of starting another request or retry.
+
+Reuses the stubs and by-path module load from ``test_make_request_retry``.
+"""
+import asyncio
+import importlib.util
+import unittest
+from pathlib import Path
+
+from test_make_request_retry import (
+    _FakeResponse,
+    _FakeSession,
+    _make_client,
+    _run,
+    helpers,
+)
+
+_OUTBOX_PATH = (
+    Path(__file__).resolve().parents[1] / "custom_components" / "nuki_otp" / "outbox.py"
+)
+_spec = importlib.util.spec_from_file_location("nuki_otp_outbox", _OUTBOX_PATH)
+outbox_mod = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(outbox_mod)
+
+Deadline = helpers.Deadline
+NukiDeadlineExceeded = helpers.NukiDeadlineExceeded
+
+_LOCKS = [{"name": "Front Door", "smartlockId": 42}]
+
+
+class DeadlineTest(unittest.TestCase):
+    def test_request_timeouts_come_from_the_remaining_budget(self):
+        timeout = Deadline(12).client_timeout(helpers.DEFAULT_TIMEOUT)
+        self.assertLessEqual(timeout.total, 12)
+        self.assertGreater(timeout.total, 11)
+        self.assertEqual(timeout.connect, helpers.CONNECT_TIMEOUT)
+        self.assertEqual(timeout.sock_read, timeout.total)
+
+        roomy = Deadline(600).client_timeout(helpers.DEFAULT_TIMEOUT)
+        self.assertEqual(roomy.total, helpers.DEFAULT_TIMEOUT)
+
+    def test_spent_budget_sends_nothing(self):
+        session = _FakeSession([_FakeResponse(status=200, payload=[])])
+        client = _make_client(session)
+        with self.assertRaises(NukiDeadlineExceeded):
+            _run(client._make_request("GET", "smartlock", deadline=Deadline(0)))
+        self.assertEqual(session.calls, [])
+
+    def test_no_retry_delay_past_the_deadline(self):
+        """A retry that cannot fit in the budget is not waited for."""
+        session = _FakeSession([asyncio.TimeoutError()])
+        client = _make_client(session)
+        with self.assertRaises(NukiDeadlineExceeded):
+            _run(client._make_request(
+                "GET", "smartlock", deadline=Deadline(helpers.RETRY_DELAY / 2)
+            ))
+        self.assertEqual(len(session.calls), 1)
+
+    def test_without_deadline_timeouts_are_unchanged(self):
+        session = _FakeSession([_FakeResponse(status=200, payload=[])])
+        client = _make_client(session)
+        _run(client._make_request("GET", "smartlock"))
+        self.assertEqual(session.timeouts[0].total, helpers.DEFAULT_TIMEOUT)
+        self.assertIsNone(session.timeouts[0].connect)
+
+    def test_create_fails_fast_instead_of_returning_none(self):
+        session = _FakeSession([_FakeResponse(status=200, payload=_LOCKS)])
+        client = _make_client(session)
+        with self.assertRaises(NukiDeadlineExceeded):
+            _run(client.create_auth_code(deadline=Deadline(0)))
+        self.assertEqual(session.calls, [])
+
+    def test_reconciling_a_create_does_not_hide_a_spent_budget(self):
+        """A create that times out with no budget left to look it up raises."""
+        session = _FakeSession([
+            _FakeResponse(status=200, payload=_LOCKS),
+            asyncio.TimeoutError(),  # PUT
+        ])
+        client = _make_client(session)
+        outbox = outbox_mod.Outbox()
+        client.attach_outbox(outbox)
+        with self.assertRaises(NukiDeadlineExceeded):
+            _run(client.create_auth_code(deadline=Deadline(helpers.RETRY_DELAY / 2)))
+        self.assertEqual([method for method, _ in session.calls], ["GET", "PUT"])
+        self.assertFalse(outbox)
+
+    def test_get_auth_codes_does_not_hide_a_spent_budget(self):
+        client = _make_client(_FakeSession([_FakeResponse(status=200, payload=[])]))
+        with self.assertRaises(NukiDeadlineExceeded):
+            _run(client.get_auth_codes(deadline=Deadline(0)))
+
+    def test_delete_past_the_deadline_is_queued(self):
+        session = _FakeSession([_FakeResponse(status=204)])
+        client = _make_client(session)
+        outbox = outbox_mod.Outbox()
+        client.attach_outbox(outbox)
+        auth = helpers.AuthCode.from_api({"id": "a1", "name": "otpuser_code"}, 24)
+
+        self.assertFalse(_run(client.delete_auth_codes([auth], deadline=Deadline(0))))
+        self.assertEqual(session.calls, [])
+        self.assertEqual(outbox.delete_ids, ["a1"])
+
+    def test_operation_deadline_uses_the_configured_budget(self):
+        client = _make_client(_FakeSession([]))
+        client.config.operation_timeout = 15
+        self.assertEqual(client.operation_deadline().seconds, 15)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+"""Unit tests for the coordinator's expiry index.
+
+Expired codes used to linger for up to an hour until the periodic sweep ran,
+and every sweep re-checked every code. The coordinator now keeps the codes in a
+min-heap by expiry and arms one timer for the earliest; when it fires only the
+due codes are evicted. These tests cover the index itself (``expiry.py`` has
+no Home Assistant imports, so it is loaded directly by path).
+"""
+import importlib.util
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+_EXPIRY_PATH = (
+    Path(__file__).resolve().parents[1] / "custom_components" / "nuki_otp" / "expiry.py"
+)
+_spec = importlib.util.spec_from_file_location("nuki_otp_expiry", _EXPIRY_PATH)
+expiry = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(expiry)
+
+ExpiryIndex = expiry.ExpiryIndex
+
+T0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _at(minutes):
+    return T0 + timedelta(minutes=minutes)
+
+
+class ExpiryIndexTest(unittest.TestCase):
+    def test_next_expiry_is_earliest(self):
+        index = ExpiryIndex()
+        index.replace([("b", _at(30)), ("a", _at(10)), ("c", _at(20))])
+        self.assertEqual(index.next_expiry(), _at(10))
+        self.assertEqual(len(index), 3)
+
+    def test_pop_due_returns_only_due_codes_in_order(self):
+        index = ExpiryIndex()
+        index.replace([("b", _at(30)), ("a", _at(10)), ("c", _at(20))])
+        self.assertEqual(index.pop_due(_at(20)), ["a", "c"])
+        self.assertEqual(index.next_expiry(), _at(30))
+        self.assertEqual(index.pop_due(_at(25)), [])
+
+    def test_discarded_codes_are_skipped(self):
+        index = ExpiryIndex()
+        index.replace([("a", _at(10)), ("b", _at(20))])
+        index.discard("a")
+        self.assertEqual(index.next_expiry(), _at(20))
+        self.assertEqual(index.pop_due(_at(60)), ["b"])
+        self.assertIsNone(index.next_expiry())
+
+    def test_replace_drops_previous_snapshot(self):
+        index = ExpiryIndex()
+        index.replace([("a", _at(10))])
+        index.replace([("b", _at(40))])
+        self.assertEqual(index.pop_due(_at(30)), [])
+        self.assertEqual(index.next_expiry(), _at(40))
+
+    def test_empty_index(self):
+        index = ExpiryIndex()
+        self.assertIsNone(index.next_expiry())
+        self.assertEqual(index.pop_due(_at(0)), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
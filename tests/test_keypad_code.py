@@ -0,0 +1,101 @@
+"""Unit tests for keypad-code generation.
+
+Codes were drawn from the digits 1-9 with no further checks, so about one in
+81 started with "12" and was rejected by the Web API, and nothing kept a new
+code from matching one the integration already had on the lock. Codes are
+now checked against the keypad rules and against an index of the codes
+issued by every entry, keyed by entry and shared by entries on the same lock.
+
+Reuses the stubs and by-path module load from ``test_make_request_retry``.
+"""
+import itertools
+import unittest
+from unittest import mock
+
+from test_make_request_retry import (
+    _FakeResponse,
+    _FakeSession,
+    _make_client,
+    _run,
+    helpers,
+)
+
+_LOCKS = [{"name": "Front Door", "smartlockId": 42}]
+
+
+def _digits(*codes):
+    """Make secrets.choice return the digits of ``codes`` in order."""
+    stream = itertools.chain.from_iterable(codes)
+    return mock.patch.object(helpers.secrets, "choice", lambda _seq: next(stream))
+
+
+class KeypadCodeRulesTest(unittest.TestCase):
+    def test_rules(self):
+        self.assertTrue(helpers.is_valid_keypad_code("345678"))
+        self.assertTrue(helpers.is_valid_keypad_code("213456"))
+        self.assertFalse(helpers.is_valid_keypad_code("123456"))  # "12" prefix
+        self.assertFalse(helpers.is_valid_keypad_code("345078"))  # contains 0
+        self.assertFalse(helpers.is_valid_keypad_code("34567"))  # too short
+        self.assertFalse(helpers.is_valid_keypad_code("3456789"))
+
+
+class GenerateCodeTest(unittest.TestCase):
+    def setUp(self):
+        self.index = helpers.IssuedCodeIndex()
+
+    def _client(self, entry_id, outcomes=(), smartlock_id=42):
+        client = _make_client(_FakeSession(list(outcomes) or [_FakeResponse(204)]))
+        client._issued_codes = self.index
+        client._entry_id = entry_id
+        client._smartlock_id = smartlock_id
+        return client
+
+    def test_redraws_forbidden_prefix_and_codes_in_use(self):
+        self.index.add("other", 42, "other_code_aaaa", "345678")
+        client = self._client("entry")
+        with _digits("123456", "345678", "456789"):
+            self.assertEqual(client._generate_otp_code(), 456789)
+
+    def test_index_is_shared_per_lock_and_freed_on_delete(self):
+        first = self._client(
+            "first",
+            [_FakeResponse(status=200, payload=_LOCKS), _FakeResponse(status=204)],
+        )
+        second = self._client("second")
+        with _digits("345678"):
+            issued = _run(first.create_auth_code())
+        self.assertEqual(self.index.codes("first", 42), {"345678"})
+        # Another entry on the same lock does not reuse the code.
+        with _digits("345678", "567891"):
+            self.assertEqual(second._generate_otp_code(), 567891)
+        # An entry on a different lock is unaffected.
+        self.assertEqual(self.index.codes("third", 7), set())
+
+        auth = helpers.AuthCode.from_api({"id": "a1", "name": issued.name}, 24, None)
+        self.assertTrue(_run(first.delete_auth_codes([auth])))
+        self.assertEqual(self.index.codes("first", 42), set())
+
+    def test_unresolved_locks_do_not_share_codes(self):
+        """Entries whose lock id is unknown are not lumped together."""
+        self.index.add("first", None, "otpuser_code_aaaa", "345678")
+        self.assertEqual(self.index.codes("second", None), set())
+        self.assertEqual(self.index.codes("first", None), {"345678"})
+        # Once the first entry's lock resolves, entries on it see the code.
+        self.assertEqual(self.index.codes("first", 42), {"345678"})
+        self.assertEqual(self.index.codes("second", 42), {"345678"})
+
+    def test_removed_entry_frees_its_codes(self):
+        self.index.add("first", 42, "otpuser_code_aaaa", "345678")
+        self.index.remove_entry("first")
+        self.assertEqual(self.index.codes("second", 42), set())
+
+    def test_clients_without_a_shared_index_are_independent(self):
+        first, second = _make_client(_FakeSession([])), _make_client(_FakeSession([]))
+        first._remember_code("otpuser_code_aaaa", "345678")
+        self.assertEqual(
+            second._issued_codes.codes(second._entry_id, None), set()
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
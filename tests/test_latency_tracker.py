@@ -0,0 +1,53 @@
+"""Unit tests for the code-creation latency window.
+
+Nothing measured "time from tap to code visible". The coordinator now records
+each measurement in a bounded window, and diagnostic sensors expose its
+p50/p95/max. ``latency.py`` has no Home Assistant imports, so it is loaded
+directly by path.
+"""
+import importlib.util
+import unittest
+from pathlib import Path
+
+_LATENCY_PATH = (
+    Path(__file__).resolve().parents[1] / "custom_components" / "nuki_otp" / "latency.py"
+)
+_spec = importlib.util.spec_from_file_location("nuki_otp_latency", _LATENCY_PATH)
+latency = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(latency)
+
+LatencyTracker = latency.LatencyTracker
+
+
+class LatencyTrackerTest(unittest.TestCase):
+    def test_empty_window_has_no_statistics(self):
+        tracker = LatencyTracker()
+        self.assertEqual(len(tracker), 0)
+        self.assertIsNone(tracker.p50)
+        self.assertIsNone(tracker.p95)
+        self.assertIsNone(tracker.max)
+
+    def test_nearest_rank_percentiles(self):
+        tracker = LatencyTracker()
+        for seconds in range(1, 21):  # 1..20, recorded in order
+            tracker.record(float(seconds))
+        self.assertEqual(tracker.p50, 10.0)
+        self.assertEqual(tracker.p95, 19.0)
+        self.assertEqual(tracker.max, 20.0)
+
+    def test_single_sample(self):
+        tracker = LatencyTracker()
+        tracker.record(2.5)
+        self.assertEqual((tracker.p50, tracker.p95, tracker.max), (2.5, 2.5, 2.5))
+
+    def test_window_is_bounded(self):
+        tracker = LatencyTracker(window=3)
+        for seconds in (30.0, 1.0, 2.0, 3.0):
+            tracker.record(seconds)
+        # The 30 s outlier rolled out of the window.
+        self.assertEqual(len(tracker), 3)
+        self.assertEqual(tracker.max, 3.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -11,6 +11,7 @@ symbols ``helpers.py`` imports so the module can be loaded and its retry logic
 exercised in isolation, without a full Home Assistant install.
 """
 import asyncio
+import json
 import sys
 import types
 import unittest
@@ -28,8 +29,10 @@ def _install_stub_modules():
             """Stand-in for aiohttp.ClientError."""
 
         class ClientTimeout:  # noqa: D401 - simple data holder
-            def __init__(self, total=None):
+            def __init__(self, total=None, connect=None, sock_read=None):
                 self.total = total
+                self.connect = connect
+                self.sock_read = sock_read
 
         aiohttp.ClientError = ClientError
         aiohttp.ClientTimeout = ClientTimeout
@@ -85,6 +88,18 @@ def _install_stub_modules():
         sys.modules["homeassistant.util.dt"] = dt_mod
         util_pkg.dt = dt_mod
 
+    # homeassistant.util.json.json_loads (orjson-backed in Home Assistant).
+    # Added on its own, since other test modules may have stubbed the
+    # homeassistant package first.
+    if "homeassistant.util.json" not in sys.modules:
+        util_pkg = sys.modules.setdefault(
+            "homeassistant.util", types.ModuleType("homeassistant.util")
+        )
+        json_mod = types.ModuleType("homeassistant.util.json")
+        json_mod.json_loads = json.loads
+        sys.modules["homeassistant.util.json"] = json_mod
+        util_pkg.json = json_mod
+
 
 _install_stub_modules()
 
@@ -99,10 +114,21 @@ import aiohttp  # noqa: E402  (stubbed above)
 
 # Load helpers.py directly by path. Importing it as
 # ``custom_components.nuki_otp.helpers`` would execute the package __init__,
-# which pulls in many more Home Assistant modules we don't stub here.
-_HELPERS_PATH = _REPO_ROOT / "custom_components" / "nuki_otp" / "helpers.py"
-_spec = importlib.util.spec_from_file_location("nuki_otp_helpers", _HELPERS_PATH)
+# which pulls in many more Home Assistant modules we don't stub here. It is
+# loaded into a bare package over the component directory, so its
+# ``from .const import ...`` resolves to the real (HA-free) const.py.
+_COMPONENT_DIR = _REPO_ROOT / "custom_components" / "nuki_otp"
+_HELPERS_PATH = _COMPONENT_DIR / "helpers.py"
+_HELPERS_PKG = "nuki_otp_helpers_pkg"
+if _HELPERS_PKG not in sys.modules:
+    _pkg = types.ModuleType(_HELPERS_PKG)
+    _pkg.__path__ = [str(_COMPONENT_DIR)]
+    sys.modules[_HELPERS_PKG] = _pkg
+_spec = importlib.util.spec_from_file_location(
+    _HELPERS_PKG + ".helpers", _HELPERS_PATH
+)
 helpers = importlib.util.module_from_spec(_spec)
+sys.modules[_spec.name] = helpers
 _spec.loader.exec_module(helpers)
 
 NukiAPIClient = helpers.NukiAPIClient
@@ -115,6 +141,32 @@ class _FakeHass:
         self._session = session
 
 
+class _FakeStream:
+    """Mimics ``aiohttp.StreamReader.iter_chunked`` over a fixed body."""
+
+    def __init__(self, body):
+        self._body = body
+
+    def iter_chunked(self, size):
+        # A plain async iterator (like aiohttp's), not an async generator, so
+        # a consumer that stops early leaves nothing pending to finalize.
+        chunks = iter(
+            [self._body[i:i + size] for i in range(0, len(self._body), size)]
+        )
+
+        class _Iterator:
+            def __aiter__(self):
+                return self
+
+            async def __anext__(self):
+                try:
+                    return next(chunks)
+                except StopIteration:
+                    raise StopAsyncIteration from None
+
+        return _Iterator()
+
+
 class _FakeResponse:
     """Async context manager mimicking an aiohttp response."""
 
@@ -122,6 +174,10 @@ class _FakeResponse:
         self.status = status
         self._payload = payload if payload is not None else []
 
+    @property
+    def content(self):
+        return _FakeStream(json.dumps(self._payload).encode())
+
     async def __aenter__(self):
         return self
 
@@ -131,6 +187,9 @@ class _FakeResponse:
     async def json(self):
         return self._payload
 
+    async def read(self):
+        return json.dumps(self._payload).encode()
+
     async def text(self):
         return "error body"
 
@@ -146,9 +205,13 @@ class _FakeSession:
     def __init__(self, outcomes):
         self._outcomes = outcomes
         self.calls = []  # (method, url) per request attempt
+        self.bodies = []  # JSON body per request attempt
+        self.timeouts = []  # ClientTimeout per request attempt
 
     def request(self, method, url, **kwargs):
         self.calls.append((method, url))
+        self.bodies.append(kwargs.get("json"))
+        self.timeouts.append(kwargs.get("timeout"))
         idx = min(len(self.calls) - 1, len(self._outcomes) - 1)
         outcome = self._outcomes[idx]
         if isinstance(outcome, Exception):
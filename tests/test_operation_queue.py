@@ -0,0 +1,211 @@
+"""Unit tests for the per-lock operation queue.
+
+A double tap on the OTP switch used to start two generations at once: two
+rounds of delete + create, with the second code replacing the first a second
+later. Mutations now run one at a time through ``OperationQueue``, equal
+intents merge and a newer intent replaces the pending one. ``operations.py``
+has no Home Assistant imports, so it is loaded directly by path.
+"""
+import asyncio
+import gc
+import importlib.util
+import unittest
+from pathlib import Path
+
+_OPERATIONS_PATH = (
+    Path(__file__).resolve().parents[1] / "custom_components" / "nuki_otp" / "operations.py"
+)
+_spec = importlib.util.spec_from_file_location("nuki_otp_operations", _OPERATIONS_PATH)
+operations = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(operations)
+
+OperationQueue = operations.OperationQueue
+
+
+def _run(coro):
+    return asyncio.new_event_loop().run_until_complete(coro)
+
+
+class _Recorder:
+    """Builds operations that log start/end and wait on a gate to finish."""
+
+    def __init__(self):
+        self.log = []
+        self.active = 0
+        self.max_active = 0
+        self.gate = asyncio.Event()
+
+    def op(self, label, result=None, error=None):
+        async def _operation():
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            self.log.append(label)
+            await self.gate.wait()
+            self.active -= 1
+            if error is not None:
+                raise error
+            return label if result is None else result
+        return _operation
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+class OperationQueueTest(unittest.TestCase):
+    def test_plain_operations_are_serialized_in_order(self):
+        async def scenario():
+            queue, rec = OperationQueue(), _Recorder()
+            tasks = [asyncio.ensure_future(queue.submit(rec.op(n))) for n in "abc"]
+            await _settle()
+            rec.gate.set()
+            return await asyncio.gather(*tasks), rec
+
+        results, rec = _run(scenario())
+        self.assertEqual(results, ["a", "b", "c"])
+        self.assertEqual(rec.log, ["a", "b", "c"])
+        self.assertEqual(rec.max_active, 1)
+
+    def test_double_tap_joins_running_intent(self):
+        async def scenario():
+            queue, rec = OperationQueue(), _Recorder()
+            first = asyncio.ensure_future(queue.submit(rec.op("on1"), intent="on"))
+            await _settle()
+            second = asyncio.ensure_future(queue.submit(rec.op("on2"), intent="on"))
+            await _settle()
+            rec.gate.set()
+            return await asyncio.gather(first, second), rec
+
+        results, rec = _run(scenario())
+        self.assertEqual(rec.log, ["on1"])
+        self.assertEqual(results, ["on1", "on1"])
+
+    def test_latest_pending_intent_wins(self):
+        async def scenario():
+            queue, rec = OperationQueue(), _Recorder()
+            running = asyncio.ensure_future(queue.submit(rec.op("on1"), intent="on"))
+            await _settle()
+            burst = [
+                asyncio.ensure_future(queue.submit(rec.op(label), intent=intent))
+                for label, intent in (("off1", "off"), ("on2", "on"), ("off2", "off"))
+            ]
+            await _settle()
+            rec.gate.set()
+            return await asyncio.gather(running, *burst), rec
+
+        results, rec = _run(scenario())
+        # One operation for the whole burst behind the running one. "on2"
+        # went back to the running intent, so "off1" was dropped and its
+        # caller shares the running result; "off2" then queued afresh.
+        self.assertEqual(rec.log, ["on1", "off2"])
+        self.assertEqual(results, ["on1", "on1", "on1", "off2"])
+        self.assertEqual(rec.max_active, 1)
+
+    def test_return_to_running_intent_drops_pending(self):
+        """on running, off pending, on again: no second create is queued."""
+        async def scenario():
+            queue, rec = OperationQueue(), _Recorder()
+            running = asyncio.ensure_future(queue.submit(rec.op("on1"), intent="on"))
+            await _settle()
+            off = asyncio.ensure_future(queue.submit(rec.op("off"), intent="off"))
+            await _settle()
+            on_again = asyncio.ensure_future(queue.submit(rec.op("on2"), intent="on"))
+            await _settle()
+            rec.gate.set()
+            return await asyncio.gather(running, off, on_again), rec
+
+        results, rec = _run(scenario())
+        self.assertEqual(rec.log, ["on1"])
+        self.assertEqual(results, ["on1", "on1", "on1"])
+
+    def test_unshared_failure_is_not_logged_as_unretrieved(self):
+        async def scenario():
+            loop = asyncio.get_running_loop()
+            unhandled = []
+            loop.set_exception_handler(lambda _loop, context: unhandled.append(context))
+            queue, rec = OperationQueue(), _Recorder()
+            rec.gate.set()
+            with self.assertRaises(RuntimeError):
+                await queue.submit(rec.op("on", error=RuntimeError("down")), intent="on")
+            return unhandled
+
+        unhandled = _run(scenario())
+        gc.collect()
+        self.assertEqual(unhandled, [])
+
+    def test_cancelled_runner_releases_joined_callers(self):
+        async def scenario():
+            queue, rec = OperationQueue(), _Recorder()
+            owner = asyncio.ensure_future(queue.submit(rec.op("on"), intent="on"))
+            await _settle()
+            joined = asyncio.ensure_future(queue.submit(rec.op("on2"), intent="on"))
+            await _settle()
+            owner.cancel()
+            await _settle()
+            outcome = await asyncio.wait_for(
+                asyncio.gather(joined, return_exceptions=True), 1
+            )
+            rec.gate.set()
+            after = await queue.submit(rec.op("later"), intent="on")
+            return outcome, after
+
+        (joined,), after = _run(scenario())
+        self.assertIsInstance(joined, asyncio.CancelledError)
+        self.assertEqual(after, "later")
+
+    def test_plain_operations_are_never_dropped(self):
+        async def scenario():
+            queue, rec = OperationQueue(), _Recorder()
+            tasks = [
+                asyncio.ensure_future(queue.submit(rec.op("on"), intent="on")),
+                asyncio.ensure_future(queue.submit(rec.op("gen1"))),
+                asyncio.ensure_future(queue.submit(rec.op("gen2"))),
+            ]
+            await _settle()
+            rec.gate.set()
+            return await asyncio.gather(*tasks), rec
+
+        results, rec = _run(scenario())
+        self.assertEqual(rec.log, ["on", "gen1", "gen2"])
+
+    def test_error_reaches_merged_callers_and_queue_recovers(self):
+        async def scenario():
+            queue, rec = OperationQueue(), _Recorder()
+            first = asyncio.ensure_future(
+                queue.submit(rec.op("on", error=RuntimeError("down")), intent="on")
+            )
+            await _settle()
+            second = asyncio.ensure_future(queue.submit(rec.op("on2"), intent="on"))
+            await _settle()
+            rec.gate.set()
+            outcomes = await asyncio.gather(first, second, return_exceptions=True)
+            after = await queue.submit(rec.op("later"), intent="on")
+            return outcomes, after
+
+        outcomes, after = _run(scenario())
+        self.assertTrue(all(isinstance(o, RuntimeError) for o in outcomes))
+        self.assertEqual(after, "later")
+
+    def test_cancelled_waiter_releases_merged_callers(self):
+        async def scenario():
+            queue, rec = OperationQueue(), _Recorder()
+            running = asyncio.ensure_future(queue.submit(rec.op("on"), intent="on"))
+            await _settle()
+            owner = asyncio.ensure_future(queue.submit(rec.op("off"), intent="off"))
+            await _settle()
+            merged = asyncio.ensure_future(queue.submit(rec.op("off2"), intent="off"))
+            await _settle()
+            owner.cancel()
+            await _settle()
+            rec.gate.set()
+            await running
+            return await asyncio.gather(merged, return_exceptions=True), rec
+
+        (merged,), rec = _run(scenario())
+        self.assertIsInstance(merged, asyncio.CancelledError)
+        self.assertEqual(rec.log, ["on"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,142 @@
+"""Unit tests for the durable outbox of unreachable mutations.
+
+When the cloud was down, deletes were logged and dropped until the hourly
+cleanup, and a restart lost them for good. They are now queued in an
+``Outbox`` persisted through a ``Store`` and drained with backoff, all in one
+DELETE. Creates are never queued, since their body holds the plaintext code.
+``outbox.py`` is loaded by path; the client side reuses the stubs from
+``test_make_request_retry``.
+"""
+import asyncio
+import importlib.util
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from test_make_request_retry import (
+    _FakeResponse,
+    _FakeSession,
+    _make_client,
+    _run,
+    helpers,
+)
+
+_OUTBOX_PATH = (
+    Path(__file__).resolve().parents[1] / "custom_components" / "nuki_otp" / "outbox.py"
+)
+_spec = importlib.util.spec_from_file_location("nuki_otp_outbox", _OUTBOX_PATH)
+outbox_mod = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(outbox_mod)
+
+Outbox = outbox_mod.Outbox
+Backoff = outbox_mod.Backoff
+
+_LOCKS = [{"name": "Front Door", "smartlockId": 42}]
+_AUTH = helpers.AuthCode.from_api(
+    {"id": "a1", "name": "otpuser_code_beef"}, 24, None
+)
+
+
+class _FakeStore:
+    """In-memory stand-in for homeassistant.helpers.storage.Store."""
+
+    def __init__(self, saved=None):
+        self.saved = saved
+
+    async def async_load(self):
+        return self.saved
+
+    def async_delay_save(self, data_func, delay):
+        self.saved = data_func()
+
+
+class OutboxTest(unittest.TestCase):
+    def test_persists_and_restores(self):
+        store = _FakeStore()
+        box = Outbox(store)
+        box.add_deletes(["a1", "a2", "a1"], "t")
+        restored = Outbox(_FakeStore(store.saved))
+        _run(restored.async_load())
+        self.assertEqual(restored.delete_ids, ["a1", "a2"])
+        self.assertEqual(len(restored), 2)
+
+    def test_creates_saved_by_older_versions_are_purged(self):
+        store = _FakeStore({
+            "deletes": {"a1": {"queued_at": "t"}},
+            "creates": {"otpuser_code_beef": {"data": {"code": 123456}}},
+        })
+        box = Outbox(store)
+        _run(box.async_load())
+        self.assertEqual(box.delete_ids, ["a1"])
+        self.assertEqual(store.saved, {"deletes": {"a1": {"queued_at": "t"}}})
+
+    def test_listener_fires_only_when_queueing(self):
+        box = Outbox()
+        calls = []
+        box.listener = lambda: calls.append(len(box))
+        box.add_deletes(["a1"], "t")
+        box.complete_deletes(["a1"])
+        self.assertEqual(calls, [1])
+        self.assertFalse(box)
+
+    def test_backoff_doubles_to_the_cap_and_resets(self):
+        backoff = Backoff(initial=30, maximum=100)
+        self.assertEqual([backoff.next_delay() for _ in range(4)], [30, 60, 100, 100])
+        backoff.reset()
+        self.assertEqual(backoff.next_delay(), 30)
+
+
+class ClientOutboxTest(unittest.TestCase):
+    def _client(self, outcomes, box=None):
+        session = _FakeSession(outcomes)
+        client = _make_client(session)
+        client.attach_outbox(box if box is not None else Outbox(_FakeStore()))
+        return client, session
+
+    def test_unreachable_delete_is_queued_and_hidden(self):
+        client, session = self._client([
+            asyncio.TimeoutError(),  # DELETE
+            _FakeResponse(status=200, payload=_LOCKS),
+            _FakeResponse(
+                status=200, payload=[{"id": "a1", "name": "otpuser_code_beef"}]
+            ),
+        ])
+        self.assertFalse(_run(client.delete_auth_codes([_AUTH])))
+        self.assertEqual(client.outbox.delete_ids, ["a1"])
+        # A poll before the delete is sent no longer shows the revoked code.
+        self.assertEqual(_run(client.get_auth_codes()), [])
+
+    def test_drain_batches_deletes_into_one_call(self):
+        box = Outbox()
+        box.add_deletes(["a1", "a2"], "t")
+        box.add_deletes(["a3"], "t")
+        client, session = self._client([_FakeResponse(status=204)], box)
+        _run(client.drain_outbox())
+        self.assertEqual(
+            session.calls, [("DELETE", "https://api.example/test/smartlock/auth")]
+        )
+        self.assertEqual(session.bodies, [["a1", "a2", "a3"]])
+        self.assertFalse(box)
+
+    def test_drain_keeps_entries_while_unreachable(self):
+        box = Outbox()
+        box.add_deletes(["a1"], "t")
+        client, _ = self._client([asyncio.TimeoutError()], box)
+        with self.assertRaises(helpers.NukiConnectionError):
+            _run(client.drain_outbox())
+        self.assertEqual(box.delete_ids, ["a1"])
+
+    def test_unconfirmed_create_fails_and_is_not_persisted(self):
+        store = _FakeStore()
+        client, _ = self._client([
+            _FakeResponse(status=200, payload=_LOCKS),
+            asyncio.TimeoutError(),  # PUT, then every lookup
+        ], Outbox(store))
+        with mock.patch.object(helpers, "RETRY_DELAY", 0):
+            self.assertIsNone(_run(client.create_auth_code()))
+        self.assertFalse(client.outbox)
+        self.assertIsNone(store.saved)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+"""Unit tests for the websocket payloads pushed to the cards.
+
+The card used to depend on the state-machine broadcast for its entity and to
+re-parse the sensor's attributes for the expiry. ``nuki_otp/subscribe`` now
+pushes a compact payload, built by ``payloads.py``, only when it changes.
+``list_codes`` answers ``nuki_otp.list_codes`` for every entry at once. The
+module has no Home Assistant imports, so it is loaded directly by path.
+"""
+import importlib.util
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+_PAYLOADS_PATH = (
+    Path(__file__).resolve().parents[1] / "custom_components" / "nuki_otp" / "payloads.py"
+)
+_spec = importlib.util.spec_from_file_location("nuki_otp_payloads", _PAYLOADS_PATH)
+payloads = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(payloads)
+
+_CREATED = datetime(2026, 10, 1, 8, 0, tzinfo=timezone.utc)
+_EXPIRY = datetime(2026, 10, 2, 8, 0, tzinfo=timezone.utc)
+
+
+def _auth(code="345678"):
+    return SimpleNamespace(
+        id="a1", name="otpuser_code_beef", code=code,
+        creation_date=_CREATED, expiry=_EXPIRY,
+    )
+
+
+class EntryPayloadTest(unittest.TestCase):
+    def test_active_code(self):
+        data = {"current_code": _auth(), "stale_since": None}
+        self.assertEqual(
+            payloads.entry_payload("e1", "Front Door", data),
+            {
+                "entry_id": "e1",
+                "lock": "Front Door",
+                "state": "active",
+                "name": "otpuser_code_beef",
+                "code": "345678",
+                "created": "2026-10-01T08:00:00+00:00",
+                "expiry": "2026-10-02T08:00:00+00:00",
+                "stale_since": None,
+            },
+        )
+
+    def test_idle_and_unloaded(self):
+        for data in (None, {"current_code": None}):
+            payload = payloads.entry_payload("e1", "Front Door", data)
+            self.assertEqual(payload["state"], "idle")
+            self.assertIsNone(payload["code"])
+            self.assertIsNone(payload["expiry"])
+
+    def test_equal_data_gives_equal_payloads(self):
+        # The subscription only sends when the payload changes.
+        first = payloads.entry_payload("e1", "L", {"current_code": _auth()})
+        same = payloads.entry_payload("e1", "L", {"current_code": _auth()})
+        other = payloads.entry_payload("e1", "L", {"current_code": _auth("456789")})
+        self.assertEqual(first, same)
+        self.assertNotEqual(first, other)
+
+    def test_stale_since(self):
+        data = {"current_code": _auth(), "stale_since": _CREATED}
+        payload = payloads.entry_payload("e1", "L", data)
+        self.assertEqual(payload["stale_since"], "2026-10-01T08:00:00+00:00")
+
+
+_NOW = datetime(2026, 10, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def _listed(auth_id, name, hours_left, lock_count=0):
+    expiry = _NOW + timedelta(hours=hours_left)
+    return SimpleNamespace(
+        id=auth_id, name=name, code=None, enabled=True, remote_allowed=False,
+        lock_count=lock_count, creation_date=_CREATED, expiry=expiry,
+        is_expired=lambda now: now >= expiry,
+    )
+
+
+def _entry(lock, *auths, stale_since=None):
+    return {
+        "config": SimpleNamespace(nuki_name=lock),
+        "coordinator": SimpleNamespace(
+            data={"auth_codes": list(auths), "stale_since": stale_since}
+        ),
+    }
+
+
+class ListCodesTest(unittest.TestCase):
+    def setUp(self):
+        self.loaded = {
+            "e1": _entry(
+                "Front Door",
+                _listed("a1", "otpuser_code_1", 5, lock_count=2),
+                _listed("a2", "guest_code_2", 1),
+            ),
+            "e2": _entry("Back Door", _listed("b1", "otpuser_code_3", 3)),
+            "e3": _entry("Garage", _listed("c1", "otpuser_code_4", -1)),
+        }
+
+    def _ids(self, **filters):
+        return [c["id"] for c in payloads.list_codes(self.loaded, _NOW, **filters)]
+
+    def test_all_active_codes_soonest_first(self):
+        codes = payloads.list_codes(self.loaded, _NOW)
+        # Codes beyond the first of an entry are listed; expired ones are not.
+        self.assertEqual([c["id"] for c in codes], ["a2", "b1", "a1"])
+        self.assertEqual(codes[2]["lock"], "Front Door")
+        self.assertEqual(codes[2]["entry_id"], "e1")
+        self.assertEqual(codes[2]["lock_count"], 2)
+        self.assertEqual(codes[2]["expiry"], "2026-10-01T17:00:00+00:00")
+
+    def test_filters(self):
+        self.assertEqual(self._ids(entry_ids=["e2"]), ["b1"])
+        self.assertEqual(self._ids(locks=["front door"]), ["a2", "a1"])
+        self.assertEqual(self._ids(name_prefix="otpuser_"), ["b1", "a1"])
+        self.assertEqual(self._ids(expires_within=timedelta(hours=3)), ["a2", "b1"])
+        self.assertEqual(
+            self._ids(
+                expires_after=_NOW + timedelta(hours=2),
+                expires_before=_NOW + timedelta(hours=6),
+                expires_within=timedelta(hours=4),
+            ),
+            ["b1"],
+        )
+
+    def test_unrefreshed_entry_and_stale_data(self):
+        self.loaded["e4"] = {
+            "config": SimpleNamespace(nuki_name="Shed"),
+            "coordinator": SimpleNamespace(data=None),
+        }
+        self.loaded["e2"] = _entry(
+            "Back Door", _listed("b1", "otpuser_code_3", 3), stale_since=_CREATED
+        )
+        codes = payloads.list_codes(self.loaded, _NOW, entry_ids=["e2", "e4"])
+        self.assertEqual(len(codes), 1)
+        self.assertEqual(codes[0]["stale_since"], "2026-10-01T08:00:00+00:00")
+
+
+if __name__ == "__main__":
+    unittest.main()
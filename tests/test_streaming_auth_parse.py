@@ -0,0 +1,151 @@
+"""Unit tests for incremental parsing of the account-wide auth list.
+
+``GET smartlock/auth`` returns every keypad auth on every lock of the account,
+while an entry only cares about the few whose name starts with its prefix. The
+response is parsed element by element and non-matching records are dropped as
+they arrive, so a poll never holds the whole account's auths at once.
+
+These tests feed the parser bodies in deliberately tiny chunks so records (and
+multi-byte UTF-8 characters) straddle chunk boundaries.
+
+The per-lock list is small and is instead read in one go and decoded with
+Home Assistant's orjson-backed ``json_loads``, then filtered and turned into
+models in a single pass.
+
+Reuses the stubs and by-path module load from ``test_make_request_retry``.
+"""
+import json
+import unittest
+from datetime import datetime, timezone
+
+from test_make_request_retry import (
+    NukiAPIError,
+    _FakeResponse,
+    _FakeSession,
+    _FakeStream,
+    _make_client,
+    _run,
+    helpers,
+)
+
+
+def _collect(body, keep, chunk_size=7):
+    original = helpers.STREAM_CHUNK_SIZE
+    helpers.STREAM_CHUNK_SIZE = chunk_size
+    try:
+        return _run(helpers._collect_json_array(_FakeStream(body), keep))
+    finally:
+        helpers.STREAM_CHUNK_SIZE = original
+
+
+class StreamingParseTest(unittest.TestCase):
+    def test_keeps_only_matching_records_across_chunks(self):
+        records = [
+            {"id": str(i), "name": f"{'otpuser' if i % 3 == 0 else 'guest'}_{i}"}
+            for i in range(20)
+        ]
+        body = json.dumps(records, indent=2).encode()
+        kept = _collect(body, lambda r: r["name"].startswith("otpuser"))
+        self.assertEqual([r["id"] for r in kept], ["0", "3", "6", "9", "12", "15", "18"])
+
+    def test_multibyte_names_split_across_chunks(self):
+        records = [{"id": "a", "name": "otpuser_Tür"}, {"id": "b", "name": "Küche"}]
+        body = json.dumps(records, ensure_ascii=False).encode()
+        for size in range(1, 12):
+            with self.subTest(chunk_size=size):
+                kept = _collect(body, lambda r: r["name"].startswith("otpuser"), size)
+                self.assertEqual(kept, [records[0]])
+
+    def test_empty_array(self):
+        self.assertEqual(_collect(b" [ ] ", lambda r: True), [])
+
+    def test_non_array_body_yields_empty_list(self):
+        self.assertEqual(_collect(b'{"detail": "nope"}', lambda r: True), [])
+
+    def test_truncated_body_raises(self):
+        with self.assertRaises(NukiAPIError):
+            _collect(b'[{"id": "1"}, {"id": ', lambda r: True)
+
+    def test_get_auth_codes_filters_by_prefix(self):
+        payload = [
+            {"id": "1", "name": "otpuser_code"},
+            {"id": "2", "name": "Cleaner"},
+            {"id": "3"},
+        ]
+        session = _FakeSession([_FakeResponse(status=200, payload=payload)])
+        client = _make_client(session)
+        codes = _run(client.get_auth_codes())
+        self.assertEqual([(c.id, c.name) for c in codes], [("1", "otpuser_code")])
+
+    def test_per_lock_endpoint_once_lock_is_known(self):
+        """After one lookup, polls use smartlock/{id}/auth only."""
+        session = _FakeSession([
+            _FakeResponse(status=200, payload=[{"name": "Front Door", "smartlockId": 42}]),
+            _FakeResponse(status=200, payload=[]),
+        ])
+        client = _make_client(session)
+        _run(client.get_auth_codes())
+        _run(client.get_auth_codes())
+        urls = [url for _, url in session.calls]
+        self.assertTrue(urls[0].endswith("/smartlock"))
+        self.assertEqual(
+            [u.rsplit("/test/", 1)[1] for u in urls[1:]],
+            ["smartlock/42/auth?types=13", "smartlock/42/auth?types=13"],
+        )
+
+    def test_account_wide_endpoint_when_lock_unknown(self):
+        session = _FakeSession([
+            _FakeResponse(status=200, payload=[{"name": "Other", "smartlockId": 1}]),
+            _FakeResponse(status=200, payload=[]),
+        ])
+        client = _make_client(session)
+        _run(client.get_auth_codes())
+        self.assertTrue(session.calls[-1][1].endswith("/smartlock/auth?types=13"))
+
+    def test_per_lock_poll_filters_in_one_pass(self):
+        session = _FakeSession([
+            _FakeResponse(status=200, payload=[{"name": "Front Door", "smartlockId": 42}]),
+            _FakeResponse(status=200, payload=[
+                {"id": "1", "name": "otpuser_code_a",
+                 "allowedUntilDate": "2026-10-02T08:00:00.000Z"},
+                {"id": "2", "name": "otpuser_code_b",
+                 "allowedUntilDate": "2026-09-30T08:00:00.000Z"},
+                {"id": "3", "name": "Cleaner"},
+                "not a record",
+            ]),
+        ])
+        client = _make_client(session)
+        active_at = datetime(2026, 10, 1, tzinfo=timezone.utc)
+        codes = _run(client.fetch_auth_codes(active_at=active_at))
+        self.assertEqual([c.id for c in codes], ["1"])
+        # Without a time, expired codes are kept (cleanup needs them).
+        self.assertEqual([c.id for c in _run(client.fetch_auth_codes())], ["1", "2"])
+
+    def test_invalid_json_body_raises(self):
+        class _Garbled(_FakeResponse):
+            async def read(self):
+                return b"<html>gateway</html>"
+
+        client = _make_client(_FakeSession([_Garbled(status=200)]))
+        with self.assertRaises(NukiAPIError):
+            _run(client._make_request("GET", "smartlock"))
+
+    def test_empty_body_decodes_to_none(self):
+        class _Empty(_FakeResponse):
+            async def read(self):
+                return b""
+
+        client = _make_client(_FakeSession([_Empty(status=200)]))
+        self.assertIsNone(_run(client._make_request("GET", "smartlock")))
+
+    def test_log_lookup_is_limited_server_side(self):
+        session = _FakeSession([_FakeResponse(status=200, payload=[])])
+        client = _make_client(session)
+        _run(client.get_smartlock_logs("42", "auth1"))
+        _, url = session.calls[0]
+        self.assertIn("authId=auth1", url)
+        self.assertIn("limit=1", url)
+
+
+if __name__ == "__main__":
+    unittest.main()
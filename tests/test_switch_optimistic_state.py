@@ -46,6 +46,10 @@ def _install_switch_stubs():
         "HomeAssistant": type("HomeAssistant", (), {}),
         "callback": (lambda func: func),
     })
+    # homeassistant.exceptions.HomeAssistantError
+    _ensure("homeassistant.exceptions", {
+        "HomeAssistantError": type("HomeAssistantError", (Exception,), {}),
+    })
     # homeassistant.config_entries.ConfigEntry
     _ensure("homeassistant.config_entries", {
         "ConfigEntry": type("ConfigEntry", (), {}),
@@ -127,6 +131,7 @@ if _PKG not in sys.modules:
 
     _help = types.ModuleType(f"{_PKG}.helpers")
     _help.NukiAPIClient = type("NukiAPIClient", (), {})
+    _help.NukiDeadlineExceeded = type("NukiDeadlineExceeded", (Exception,), {})
     sys.modules[f"{_PKG}.helpers"] = _help
     pkg.helpers = _help
 
@@ -136,6 +141,15 @@ sys.modules[f"{_PKG}.switch"] = nuki_switch
 _spec.loader.exec_module(nuki_switch)
 
 NukiOTPSwitch = nuki_switch.NukiOTPSwitch
+NukiDeadlineExceeded = nuki_switch.NukiDeadlineExceeded
+HomeAssistantError = nuki_switch.HomeAssistantError
+
+# The real per-lock queue; switch.py reaches it through the coordinator.
+_ops_spec = importlib.util.spec_from_file_location(
+    "nuki_otp_operations", _PKG_DIR / "operations.py"
+)
+operations = importlib.util.module_from_spec(_ops_spec)
+_ops_spec.loader.exec_module(operations)
 
 
 def _run(coro):
@@ -143,12 +157,31 @@ def _run(coro):
 
 
 class _FakeCoordinator:
-    def __init__(self, data=None):
+    """``refreshed`` is the data a refresh publishes (unchanged if None)."""
+
+    def __init__(self, data=None, refreshed=None):
         self.data = data
+        self.refreshed = refreshed
         self.refresh_calls = 0
+        self.latency_events = []
+        self.operations = operations.OperationQueue()
+        self._latency_pending = False
 
-    async def async_request_refresh(self):
+    async def async_refresh(self):
         self.refresh_calls += 1
+        if self.refreshed is not None:
+            self.data = self.refreshed
+            self._latency_pending = False
+
+    def async_mark_code_requested(self):
+        # Like the coordinator, a pending measurement keeps its clock.
+        if not self._latency_pending:
+            self._latency_pending = True
+            self.latency_events.append("start")
+
+    def async_cancel_code_request(self):
+        self._latency_pending = False
+        self.latency_events.append("cancel")
 
 
 class _FakeApiClient:
@@ -159,16 +192,26 @@ class _FakeApiClient:
         self._create_ok = create_ok
         self.created = False
         self.deleted = False
+        self.create_calls = 0
+        self.deadlines = []
 
-    async def get_auth_codes(self):
+    def operation_deadline(self):
+        return object()
+
+    async def get_auth_codes(self, deadline=None):
+        self.deadlines.append(deadline)
         return list(self._existing)
 
-    async def delete_auth_codes(self, codes):
+    async def delete_auth_codes(self, codes, deadline=None):
+        self.deadlines.append(deadline)
         self.deleted = True
         return True
 
-    async def create_auth_code(self):
+    async def create_auth_code(self, deadline=None):
+        self.deadlines.append(deadline)
         self.created = True
+        self.create_calls += 1
+        await asyncio.sleep(0)  # yield, like the real round trip
         return self._create_ok
 
 
@@ -180,7 +223,9 @@ def _make_switch(coordinator, api):
 class SwitchOptimisticStateTest(unittest.TestCase):
     def test_turn_on_reports_on_immediately(self):
         """On press, is_on flips to True before the slow create returns."""
-        coord = _FakeCoordinator(data={"has_active_code": False})
+        coord = _FakeCoordinator(
+            data={"has_active_code": False}, refreshed={"has_active_code": True}
+        )
         api = _FakeApiClient(create_ok=True)
         sw = _make_switch(coord, api)
 
@@ -189,22 +234,22 @@ class SwitchOptimisticStateTest(unittest.TestCase):
 
         _run(sw.async_turn_on())
 
-        # Code was created and a refresh requested.
+        # Code was created and the data refreshed.
         self.assertTrue(api.created)
         self.assertEqual(coord.refresh_calls, 1)
+        self.assertEqual(coord.latency_events, ["start"])
         # The very first state write during turn-on must already be "on" — no
         # off-flap. (write_calls[0] is the optimistic write.)
         self.assertTrue(sw.write_calls[0])
-        # Still optimistic-on afterwards (coordinator hasn't confirmed yet).
+        # The press has finished, so the refreshed data is authoritative.
         self.assertTrue(sw.is_on)
-        self.assertTrue(sw.assumed_state)
+        self.assertFalse(sw.assumed_state)
 
     def test_optimistic_cleared_when_coordinator_confirms(self):
         """Once the poll reports has_active_code, the override is dropped."""
         coord = _FakeCoordinator(data={"has_active_code": False})
-        api = _FakeApiClient(create_ok=True)
-        sw = _make_switch(coord, api)
-        _run(sw.async_turn_on())
+        sw = _make_switch(coord, _FakeApiClient())
+        sw._optimistic_state = True  # a press still in flight
         self.assertTrue(sw.assumed_state)
 
         # Poll lands confirming the code now exists.
@@ -214,9 +259,22 @@ class SwitchOptimisticStateTest(unittest.TestCase):
         self.assertFalse(sw.assumed_state)  # override cleared
         self.assertTrue(sw.is_on)  # now from real data
 
+    def test_unchanged_data_still_ends_the_override(self):
+        """Turning off with no code leaves the data as is; no listener runs."""
+        coord = _FakeCoordinator(data={"has_active_code": False})
+        sw = _make_switch(coord, _FakeApiClient())
+
+        _run(sw.async_turn_off())
+
+        self.assertFalse(sw.assumed_state)
+        self.assertFalse(sw.is_on)
+        self.assertFalse(sw.write_calls[-1])
+
     def test_turn_off_reports_off_immediately(self):
         """Turn-off assumes off at once, then defers to confirming poll."""
-        coord = _FakeCoordinator(data={"has_active_code": True})
+        coord = _FakeCoordinator(
+            data={"has_active_code": True}, refreshed={"has_active_code": False}
+        )
         api = _FakeApiClient(existing_codes=[{"id": "a", "name": "x_code"}])
         sw = _make_switch(coord, api)
         self.assertTrue(sw.is_on)
@@ -227,12 +285,7 @@ class SwitchOptimisticStateTest(unittest.TestCase):
         self.assertEqual(coord.refresh_calls, 1)
         self.assertFalse(sw.write_calls[0])  # first write is "off"
         self.assertFalse(sw.is_on)
-        self.assertTrue(sw.assumed_state)
-
-        coord.data = {"has_active_code": False}
-        sw._handle_coordinator_update()
         self.assertFalse(sw.assumed_state)
-        self.assertFalse(sw.is_on)
 
     def test_failed_generation_reverts_state(self):
         """If create fails, the switch must not get stuck optimistically on."""
@@ -244,6 +297,8 @@ class SwitchOptimisticStateTest(unittest.TestCase):
 
         # No refresh requested (create failed), override cleared, reads false.
         self.assertEqual(coord.refresh_calls, 0)
+        # The latency clock was started and then abandoned, not recorded.
+        self.assertEqual(coord.latency_events, ["start", "cancel"])
         self.assertFalse(sw.assumed_state)
         self.assertFalse(sw.is_on)
 
@@ -252,7 +307,7 @@ class SwitchOptimisticStateTest(unittest.TestCase):
         coord = _FakeCoordinator(data={"has_active_code": False})
 
         class _Boom(_FakeApiClient):
-            async def create_auth_code(self):
+            async def create_auth_code(self, deadline=None):
                 raise RuntimeError("network down")
 
         sw = _make_switch(coord, _Boom(create_ok=True))
@@ -261,6 +316,53 @@ class SwitchOptimisticStateTest(unittest.TestCase):
         self.assertFalse(sw.assumed_state)
         self.assertFalse(sw.is_on)
 
+    def test_double_tap_generates_one_code(self):
+        """Two overlapping turn_on calls share one generation."""
+        coord = _FakeCoordinator(
+            data={"has_active_code": False}, refreshed={"has_active_code": True}
+        )
+        api = _FakeApiClient(create_ok=True)
+        sw = _make_switch(coord, api)
+
+        async def double_tap():
+            await asyncio.gather(sw.async_turn_on(), sw.async_turn_on())
+
+        _run(double_tap())
+
+        self.assertEqual(api.create_calls, 1)
+        self.assertEqual(coord.refresh_calls, 1)
+        # The second press joins the first one's clock instead of restarting it.
+        self.assertEqual(coord.latency_events, ["start"])
+        self.assertTrue(sw.is_on)
+
+    def test_press_shares_one_deadline(self):
+        """Every request of one press runs against the same time budget."""
+        coord = _FakeCoordinator(data={"has_active_code": True})
+        api = _FakeApiClient(existing_codes=[{"id": "a", "name": "x_code"}])
+        sw = _make_switch(coord, api)
+
+        _run(sw.async_turn_on())
+
+        self.assertEqual(len(api.deadlines), 3)  # list, delete, create
+        self.assertTrue(all(d is api.deadlines[0] for d in api.deadlines))
+        self.assertIsNotNone(api.deadlines[0])
+
+    def test_spent_deadline_fails_the_press(self):
+        """A spent budget surfaces as an error and reverts the state."""
+        coord = _FakeCoordinator(data={"has_active_code": False})
+
+        class _Slow(_FakeApiClient):
+            async def create_auth_code(self, deadline=None):
+                raise NukiDeadlineExceeded("Operation did not finish within 60s")
+
+        sw = _make_switch(coord, _Slow())
+        with self.assertRaises(HomeAssistantError):
+            _run(sw.async_turn_on())
+
+        self.assertEqual(coord.latency_events, ["start", "cancel"])
+        self.assertFalse(sw.assumed_state)
+        self.assertFalse(sw.is_on)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,227 @@
+"""Unit tests for the usage watcher (log-delta revocation of used codes).
+
+``is_auth_used`` only ran in the hourly cleanup, so a "one-time" code stayed
+valid for up to an hour after its first use. The watcher instead reads only
+the lock log entries newer than its cursor (one request per lock per cycle)
+and revokes any active code whose auth id shows up in an unlock. The cursor
+is taken from the server's log dates, never from Home Assistant's clock.
+
+These tests load ``watcher.py`` into a synthetic package with the real
+``helpers`` module (from the retry harness) and a stub coordinator, behind the
+shared homeassistant stubs.
+"""
+import asyncio
+import importlib.util
+import sys
+import types
+import unittest
+from pathlib import Path
+
+from test_make_request_retry import (
+    _FakeResponse,
+    _FakeSession,
+    _make_client,
+    _run,
+    helpers,
+)
+
+
+def _ensure(name, attrs):
+    """Create/extend a stub module additively (shared sys.modules safe)."""
+    mod = sys.modules.get(name)
+    if mod is None:
+        mod = types.ModuleType(name)
+        sys.modules[name] = mod
+    for key, value in attrs.items():
+        if not hasattr(mod, key):
+            setattr(mod, key, value)
+    return mod
+
+
+_ensure("homeassistant.core", {
+    "CALLBACK_TYPE": object,
+    "HomeAssistant": type("HomeAssistant", (), {}),
+    "callback": (lambda func: func),
+})
+_event = _ensure("homeassistant.helpers.event", {
+    "async_track_time_interval": (lambda hass, action, interval: (lambda: None)),
+})
+sys.modules["homeassistant.helpers"].event = _event
+
+_PKG_DIR = Path(__file__).resolve().parents[1] / "custom_components" / "nuki_otp"
+_PKG = "nuki_otp_watcher_pkg"
+if _PKG not in sys.modules:
+    _pkg = types.ModuleType(_PKG)
+    _pkg.__path__ = [str(_PKG_DIR)]
+    sys.modules[_PKG] = _pkg
+    sys.modules[f"{_PKG}.helpers"] = helpers
+    _coord = types.ModuleType(f"{_PKG}.coordinator")
+    _coord.NukiOTPDataCoordinator = type("NukiOTPDataCoordinator", (), {})
+    sys.modules[f"{_PKG}.coordinator"] = _coord
+
+_spec = importlib.util.spec_from_file_location(f"{_PKG}.watcher", _PKG_DIR / "watcher.py")
+watcher = importlib.util.module_from_spec(_spec)
+sys.modules[f"{_PKG}.watcher"] = watcher
+_spec.loader.exec_module(watcher)
+
+AuthCode = helpers.AuthCode
+LogCursor = watcher.LogCursor
+
+
+def _entry(log_id, date, auth_id, action=1):
+    return {"id": log_id, "date": date, "authId": auth_id, "action": action}
+
+
+class _FakeApiClient:
+    def __init__(self, pages):
+        self._pages = list(pages)
+        self.queries = []
+
+    async def get_log_delta(self, since):
+        self.queries.append(since)
+        page = self._pages.pop(0) if self._pages else []
+        if isinstance(page, Exception):
+            raise page
+        return page
+
+
+class _FakeCoordinator:
+    def __init__(self, codes, api_client):
+        self.data = {"auth_codes": codes}
+        self.api_client = api_client
+        self.evicted = []
+
+    async def async_evict_codes(self, codes):
+        self.evicted.extend(code.id for code in codes)
+
+
+class LogCursorTest(unittest.TestCase):
+    def test_entries_at_cursor_are_not_repeated(self):
+        cursor = LogCursor("2026-01-01T00:00:00.000Z")
+        first = [
+            _entry("l2", "2026-01-01T00:00:05.000Z", "a"),
+            _entry("l1", "2026-01-01T00:00:01.000Z", "b"),
+        ]
+        self.assertEqual(cursor.advance(first), first)
+        self.assertEqual(cursor.since, "2026-01-01T00:00:05.000Z")
+        # fromDate is inclusive: l2 comes back and must be skipped.
+        again = [_entry("l3", "2026-01-01T00:00:07.000Z", "c"), first[0]]
+        self.assertEqual([e["id"] for e in cursor.advance(again)], ["l3"])
+
+    def test_same_timestamp_entries_all_kept(self):
+        cursor = LogCursor()
+        same = [
+            _entry("x", "2026-01-01T00:00:05.000Z", "a"),
+            _entry("y", "2026-01-01T00:00:05.000Z", "b"),
+        ]
+        self.assertEqual(len(cursor.advance(same)), 2)
+        self.assertEqual(cursor.advance(same), [])
+
+
+class UsageWatcherTest(unittest.TestCase):
+    def _watcher(self, codes, pages):
+        api = _FakeApiClient(pages)
+        coordinator = _FakeCoordinator(codes, api)
+        w = watcher.UsageWatcher(None, coordinator)
+        w._cursor.reset("2026-01-01T00:00:00.000Z")
+        return w, coordinator, api
+
+    def test_used_code_is_revoked(self):
+        codes = [AuthCode(id="a", name="OTP_a"), AuthCode(id="b", name="OTP_b")]
+        w, coordinator, api = self._watcher(
+            codes,
+            [[_entry("l1", "2026-01-01T00:00:03.000Z", "b"),
+              _entry("l0", "2026-01-01T00:00:02.000Z", "someone-else")]],
+        )
+        _run(w._async_poll())
+        self.assertEqual(coordinator.evicted, ["b"])
+        self.assertEqual(len(api.queries), 1)
+
+    def test_one_request_per_cycle_regardless_of_code_count(self):
+        codes = [AuthCode(id=str(i), name=f"OTP_{i}") for i in range(50)]
+        w, coordinator, api = self._watcher(codes, [[], []])
+        _run(w._async_poll())
+        _run(w._async_poll())
+        self.assertEqual(len(api.queries), 2)
+        self.assertEqual(coordinator.evicted, [])
+
+    def test_no_request_without_active_codes(self):
+        w, coordinator, api = self._watcher([], [[]])
+        _run(w._async_poll())
+        self.assertEqual(api.queries, [])
+
+    def test_only_unlocks_count_as_use(self):
+        codes = [AuthCode(id="a", name="OTP_a")]
+        w, coordinator, _ = self._watcher(
+            codes, [[_entry("l1", "2026-01-01T00:00:03.000Z", "a", action=2)]]
+        )
+        _run(w._async_poll())
+        self.assertEqual(coordinator.evicted, [])
+
+    def test_cursor_follows_server_dates_not_the_local_clock(self):
+        """A server clock behind Home Assistant's must not hide a use."""
+        codes = [AuthCode(id="a", name="OTP_a")]
+        api = _FakeApiClient([
+            [_entry("l1", "2020-01-01T00:00:03.000Z", "a")],
+            [],
+        ])
+        coordinator = _FakeCoordinator(codes, api)
+        w = watcher.UsageWatcher(None, coordinator)
+        w.async_start()
+        _run(w._async_poll())
+        _run(w._async_poll())
+        self.assertEqual(coordinator.evicted, ["a"])
+        self.assertEqual(api.queries, [None, "2020-01-01T00:00:03.000Z"])
+
+    def test_tick_during_a_running_poll_is_skipped(self):
+        codes = [AuthCode(id="a", name="OTP_a")]
+        w, coordinator, api = self._watcher(
+            codes, [[_entry("l1", "2026-01-01T00:00:03.000Z", "a")], []]
+        )
+
+        async def overlapping_ticks():
+            release = asyncio.Event()
+
+            async def slow_evict(evicted):
+                await release.wait()
+
+            coordinator.async_evict_codes = slow_evict
+            first = asyncio.ensure_future(w._async_poll())
+            await asyncio.sleep(0)
+            await w._async_poll()  # the next tick, while the first revokes
+            self.assertEqual(len(api.queries), 1)
+            release.set()
+            await first
+            await w._async_poll()
+
+        _run(overlapping_ticks())
+        self.assertEqual(len(api.queries), 2)
+
+    def test_api_error_keeps_cursor(self):
+        codes = [AuthCode(id="a", name="OTP_a")]
+        w, coordinator, api = self._watcher(
+            codes,
+            [helpers.NukiAPIError("down"),
+             [_entry("l1", "2026-01-01T00:00:03.000Z", "a")]],
+        )
+        _run(w._async_poll())
+        _run(w._async_poll())
+        self.assertEqual(api.queries[0], api.queries[1])
+        self.assertEqual(coordinator.evicted, ["a"])
+
+
+class LogDeltaQueryTest(unittest.TestCase):
+    def test_query_asks_for_unlocks_from_the_cursor(self):
+        session = _FakeSession([_FakeResponse(status=200, payload=[])])
+        client = _make_client(session)
+        client._smartlock_id = 42
+        _run(client.get_log_delta("2026-01-01T00:00:00.000Z"))
+        self.assertEqual(
+            session.calls[0][1],
+            "https://api.example/test/smartlock/42/log"
+            "?action=1&limit=50&fromDate=2026-01-01T00:00:00.000Z",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
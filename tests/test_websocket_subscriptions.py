@@ -0,0 +1,234 @@
+"""Unit tests for the websocket subscriptions across an entry reload.
+
+Each subscription was bound to one coordinator. Reloading the entry (a manual
+reload, or reauth's reload) dropped that coordinator, and the subscription went
+silent without telling the card, which kept showing a frozen code. Now the
+entry's unload ends ``nuki_otp/subscribe`` with an ``ended`` message, and
+``nuki_otp/subscribe_entries`` drops the entry and picks it up again once it
+is set up.
+
+``websocket_api.py`` is loaded into a synthetic package with the real
+``const`` and ``payloads`` modules and minimal Home Assistant stubs, including
+a working dispatcher.
+"""
+import importlib.util
+import sys
+import types
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+import test_make_request_retry  # noqa: F401  (installs the base HA stubs)
+
+try:
+    import voluptuous  # noqa: F401
+    _HAVE_VOLUPTUOUS = True
+except ImportError:  # pragma: no cover - environment without voluptuous
+    _HAVE_VOLUPTUOUS = False
+
+_PKG_DIR = Path(__file__).resolve().parents[1] / "custom_components" / "nuki_otp"
+_PKG = "nuki_otp_ws_pkg"
+
+
+def _ensure(name, attrs):
+    """Create/extend a stub module additively (shared sys.modules safe)."""
+    mod = sys.modules.get(name)
+    if mod is None:
+        mod = types.ModuleType(name)
+        sys.modules[name] = mod
+    for key, value in attrs.items():
+        if not hasattr(mod, key):
+            setattr(mod, key, value)
+    return mod
+
+
+def _dispatcher_connect(hass, signal, target):
+    targets = hass.signals.setdefault(signal, [])
+    targets.append(target)
+    return lambda: targets.remove(target)
+
+
+def _dispatcher_send(hass, signal, *args):
+    for target in list(hass.signals.get(signal, [])):
+        target(*args)
+
+
+def _load_websocket_api():
+    _ensure("homeassistant.core", {
+        "HomeAssistant": type("HomeAssistant", (), {}),
+        "callback": (lambda func: func),
+    })
+    components = _ensure("homeassistant.components", {})
+    ws = _ensure("homeassistant.components.websocket_api", {
+        "ActiveConnection": type("ActiveConnection", (), {}),
+        "ERR_NOT_FOUND": "not_found",
+        "ERR_NOT_SUPPORTED": "not_supported",
+        "websocket_command": (lambda schema: (lambda func: func)),
+        "event_message": (lambda iden, event: {"id": iden, "event": event}),
+        "async_register_command": (lambda hass, handler: None),
+    })
+    components.websocket_api = ws
+    helpers_pkg = sys.modules["homeassistant.helpers"]
+    helpers_pkg.config_validation = _ensure(
+        "homeassistant.helpers.config_validation",
+        {"entity_id": str, "string": str},
+    )
+    helpers_pkg.entity_registry = _ensure(
+        "homeassistant.helpers.entity_registry",
+        {"async_get": (lambda hass: hass.registry)},
+    )
+    helpers_pkg.dispatcher = _ensure("homeassistant.helpers.dispatcher", {
+        "async_dispatcher_connect": _dispatcher_connect,
+        "async_dispatcher_send": _dispatcher_send,
+    })
+
+    if _PKG not in sys.modules:
+        pkg = types.ModuleType(_PKG)
+        pkg.__path__ = [str(_PKG_DIR)]
+        sys.modules[_PKG] = pkg
+        services = types.ModuleType(f"{_PKG}.services")
+        services.LIST_CODES_FIELDS = {}
+        services.async_list_codes = lambda hass, msg: []
+        sys.modules[f"{_PKG}.services"] = services
+    name = f"{_PKG}.websocket_api"
+    if name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(name, _PKG_DIR / "websocket_api.py")
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+    return sys.modules[name], sys.modules[f"{_PKG}.const"]
+
+
+class _FakeCoordinator:
+    def __init__(self, code=None):
+        self.data = {"current_code": code}
+        self.listeners = []
+
+    def async_add_listener(self, listener):
+        self.listeners.append(listener)
+        return lambda: self.listeners.remove(listener)
+
+    def publish(self, code):
+        self.data = {"current_code": code}
+        for listener in list(self.listeners):
+            listener()
+
+
+class _FakeRegistry:
+    def __init__(self, entities):
+        self._entities = entities
+
+    def async_get(self, entity_id):
+        return self._entities.get(entity_id)
+
+    def async_get_entity_id(self, domain, platform, unique_id):
+        return f"{domain}.{unique_id}"
+
+
+class _FakeConnection:
+    def __init__(self):
+        self.subscriptions = {}
+        self.events = []
+        self.results = []
+        self.errors = []
+
+    def send_message(self, message):
+        self.events.append((message["id"], message["event"]))
+
+    def send_result(self, iden, result=None):
+        self.results.append(iden)
+
+    def send_error(self, iden, code, message):
+        self.errors.append((iden, code))
+
+
+def _code(value):
+    return SimpleNamespace(
+        name="otpuser_code_beef", code=value, creation_date=None, expiry=None
+    )
+
+
+@unittest.skipUnless(_HAVE_VOLUPTUOUS, "voluptuous not installed")
+class SubscriptionReloadTest(unittest.TestCase):
+    def setUp(self):
+        self.ws, self.const = _load_websocket_api()
+        self.first = _FakeCoordinator(_code("345678"))
+        self.hass = SimpleNamespace(
+            data={self.const.DOMAIN: {"e1": self._data(self.first)}},
+            signals={},
+            registry=_FakeRegistry({
+                "sensor.front": SimpleNamespace(
+                    platform=self.const.DOMAIN, config_entry_id="e1"
+                ),
+                "sensor.other": SimpleNamespace(
+                    platform="demo", config_entry_id="x"
+                ),
+            }),
+        )
+        self.conn = _FakeConnection()
+
+    def _data(self, coordinator):
+        return {"coordinator": coordinator, "config": SimpleNamespace(nuki_name="Front")}
+
+    def _reload(self, coordinator):
+        """Unload entry e1 and set it up again with a new coordinator."""
+        self.hass.data[self.const.DOMAIN].pop("e1")
+        _dispatcher_send(self.hass, self.const.SIGNAL_ENTRY_UNLOADED, "e1")
+        self.hass.data[self.const.DOMAIN]["e1"] = self._data(coordinator)
+        _dispatcher_send(self.hass, self.const.SIGNAL_ENTRY_LOADED, "e1")
+
+    def test_reload_ends_the_entry_subscription(self):
+        self.ws.ws_subscribe(
+            self.hass, self.conn, {"id": 1, "type": "nuki_otp/subscribe",
+                                   "entity_id": "sensor.front"}
+        )
+        self.assertEqual(self.conn.events[-1][1]["code"], "345678")
+
+        second = _FakeCoordinator(_code("456789"))
+        self._reload(second)
+        self.assertEqual(self.conn.events[-1], (1, {"entry_id": "e1", "ended": True}))
+        self.assertEqual(self.first.listeners, [])
+        # Still registered, so the card's unsubscribe succeeds.
+        self.conn.subscriptions.pop(1)()
+
+        # Subscribing again follows the new coordinator.
+        self.ws.ws_subscribe(
+            self.hass, self.conn, {"id": 2, "type": "nuki_otp/subscribe",
+                                   "entity_id": "sensor.front"}
+        )
+        second.publish(_code("567891"))
+        self.assertEqual(self.conn.events[-1][0], 2)
+        self.assertEqual(self.conn.events[-1][1]["code"], "567891")
+
+    def test_unloaded_entry_is_not_found_and_other_entities_unsupported(self):
+        self.hass.data[self.const.DOMAIN].pop("e1")
+        for iden, entity in ((1, "sensor.front"), (2, "sensor.other")):
+            self.ws.ws_subscribe(
+                self.hass, self.conn, {"id": iden, "type": "nuki_otp/subscribe",
+                                       "entity_id": entity}
+            )
+        self.assertEqual(self.conn.errors, [(1, "not_found"), (2, "not_supported")])
+
+    def test_fleet_subscription_follows_the_reload(self):
+        self.ws.ws_subscribe_entries(
+            self.hass, self.conn, {"id": 1, "type": "nuki_otp/subscribe_entries"}
+        )
+        second = _FakeCoordinator(_code("456789"))
+        self._reload(second)
+        removed, added = self.conn.events[-2:]
+        self.assertEqual(removed, (1, {"entries": [], "removed": ["e1"]}))
+        self.assertEqual(added[1]["entries"][0]["code"], "456789")
+        self.assertEqual(self.first.listeners, [])
+
+        second.publish(_code("567891"))
+        self.assertEqual(self.conn.events[-1][1]["entries"][0]["code"], "567891")
+
+        self.conn.subscriptions.pop(1)()
+        self.assertEqual(second.listeners, [])
+        self.assertEqual(
+            [targets for targets in self.hass.signals.values() if targets], []
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()